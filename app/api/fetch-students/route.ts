@@ -1,9 +1,17 @@
 import { NextResponse } from "next/server"
 import { spawn } from "child_process"
 import { join } from "path"
+import { callAgentService } from "@/lib/agent-service"
 
 export async function GET() {
   try {
+    // Warm worker: no interpreter start-up or Google re-authentication
+    const serviceResponse = await callAgentService("/students")
+    if (serviceResponse) {
+      const result = await serviceResponse.json()
+      return NextResponse.json(result, { status: serviceResponse.ok ? 200 : 500 })
+    }
+
     const scriptPath = join(process.cwd(), "scripts", "fetch_from_sheets.py")
 
     return new Promise((resolve) => {
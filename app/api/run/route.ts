@@ -2,6 +2,7 @@ import { type NextRequest, NextResponse } from "next/server"
 import { spawn } from "child_process"
 import { join } from "path"
 import { existsSync } from "fs"
+import { callAgentService } from "@/lib/agent-service"
 
 export async function POST(request: NextRequest) {
   try {
@@ -9,11 +10,13 @@ export async function POST(request: NextRequest) {
 
     let scriptPath: string
     let pythonArgs: string[]
+    let serviceRequest: Record<string, unknown>
 
     if (mode === 'google-sheets') {
       // Use Google Sheets mode
       scriptPath = join(process.cwd(), "scripts", "profile_agent_agentic.py")
-      pythonArgs = [scriptPath, "--source", "google-sheets", "--dry-run"]
+      pythonArgs = [scriptPath, "--source", "google-sheets", "--dry-run", "--events", "jsonl"]
+      serviceRequest = { mode: "google-sheets", dry_run: true, events: true }
     } else {
       // Use uploaded file mode
       if (!file) {
@@ -26,7 +29,8 @@ export async function POST(request: NextRequest) {
       }
 
       scriptPath = join(process.cwd(), "scripts", "profile_agent_agentic.py")
-      pythonArgs = [scriptPath, "--file", filePath, "--dry-run"]
+      pythonArgs = [scriptPath, "--file", filePath, "--dry-run", "--events", "jsonl"]
+      serviceRequest = { file: filePath, dry_run: true, events: true }
     }
 
     if (!existsSync(scriptPath)) {
@@ -38,6 +42,107 @@ export async function POST(request: NextRequest) {
 
     const stream = new ReadableStream({
       async start(controller) {
+        const send = (type: string, content: string) => {
+          controller.enqueue(`data: ${JSON.stringify({ type, content })}\n\n`)
+        }
+
+        // Typed events from agent_events.py
+        const emitEvent = (event: Record<string, any>) => {
+          switch (event.type) {
+            case "agent_reasoning":
+              send("reasoning", event.text)
+              break
+            case "tool_call":
+              send("tool", `Calling ${event.name}`)
+              break
+            case "tool_result":
+              send(event.success ? "tool" : "error", `${event.name} ${event.success ? "finished" : "failed"} in ${Math.round(event.elapsed_ms)} ms`)
+              break
+            case "decisions":
+              send("decision", event.action === "schedule"
+                ? `Scheduled ${event.student_id} for ${event.scheduled_for}`
+                : `${event.student_id}: ${event.action}${event.tone ? ` (${event.tone}, ${event.urgency})` : ""}`)
+              break
+            case "communications_sent":
+              send("email", `Email to ${event.email}: ${event.subject}`)
+              break
+            case "error_log":
+              send("error", event.message)
+              break
+            case "run_started":
+              send("status", `Agent started on ${event.excel_file}`)
+              break
+            case "run_completed":
+              send("status", `Run complete: ${event.decisions} decisions, ${event.communications_sent} emails, ${event.errors} errors`)
+              break
+          }
+        }
+
+        const emitLine = (line: string) => {
+          if (line.trim()) {
+            const content = line.trim()
+
+            if (content.startsWith("{")) {
+              try {
+                emitEvent(JSON.parse(content))
+                return
+              } catch {
+                // Not an event; classify it as console output
+              }
+            }
+
+            let type = "status"
+            if (content.includes("💭") || content.includes("REASONING")) type = "reasoning"
+            if (content.includes("✅") || content.includes("DECISION")) type = "decision"
+            if (content.includes("🔧") || content.includes("Tool")) type = "tool"
+            if (content.includes("📧") || content.includes("Email")) type = "email"
+            if (content.includes("❌") || content.includes("Error")) type = "error"
+
+            const eventData = {
+              type,
+              content: content.replace(/^[🔧✅❌💭📧→]/gu, "").trim(),
+            }
+
+            controller.enqueue(`data: ${JSON.stringify(eventData)}\n\n`)
+          }
+        }
+
+        // Warm worker: stream its output instead of starting a new interpreter
+        const serviceResponse = await callAgentService("/run", {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify(serviceRequest),
+        })
+        if (serviceResponse && !serviceResponse.ok) {
+          // The service is running but refused the request; don't retry it outside the service's checks
+          const result = await serviceResponse.json().catch(() => ({}))
+          send("error", `Agent service rejected the run: ${result.error || serviceResponse.status}`)
+          controller.enqueue("data: [DONE]\n\n")
+          controller.close()
+          return
+        }
+        if (serviceResponse?.body) {
+          const reader = serviceResponse.body.getReader()
+          const decoder = new TextDecoder()
+          let buffer = ""
+          try {
+            while (true) {
+              const { done, value } = await reader.read()
+              if (done) break
+              buffer += decoder.decode(value, { stream: true })
+              const lines = buffer.split("\n")
+              buffer = lines.pop() || ""
+              lines.forEach(emitLine)
+            }
+            emitLine(buffer)
+          } catch (error) {
+            controller.enqueue(`data: ${JSON.stringify({ type: "error", content: "Agent service connection lost" })}\n\n`)
+          }
+          controller.enqueue("data: [DONE]\n\n")
+          controller.close()
+          return
+        }
+
         try {
           const python = spawn("python", pythonArgs, {
   cwd: process.cwd(),
@@ -55,37 +160,18 @@ export async function POST(request: NextRequest) {
             const lines = buffer.split("\n")
             buffer = lines.pop() || ""
 
-            for (const line of lines) {
-              if (line.trim()) {
-                const content = line.trim()
-
-                let type = "status"
-                if (content.includes("💭") || content.includes("REASONING")) type = "reasoning"
-                if (content.includes("✅") || content.includes("DECISION")) type = "decision"
-                if (content.includes("🔧") || content.includes("Tool")) type = "tool"
-                if (content.includes("📧") || content.includes("Email")) type = "email"
-                if (content.includes("❌") || content.includes("Error")) type = "error"
-
-                const eventData = {
-                  type,
-                  content: content.replace(/^[🔧✅❌💭📧→]/gu, "").trim(),
-                }
-
-                controller.enqueue(`data: ${JSON.stringify(eventData)}\n\n`)
-              }
-            }
+            lines.forEach(emitLine)
           })
 
+          // With --events the console output goes to stderr; keep it in the server log
           python.stderr.on("data", (data) => {
-            const content = data.toString().trim()
-            if (content) {
-              controller.enqueue(`data: ${JSON.stringify({ type: "error", content })}\n\n`)
-            }
+            process.stderr.write(data)
           })
 
           python.on("close", (code) => {
-            if (buffer.trim()) {
-              controller.enqueue(`data: ${JSON.stringify({ type: "status", content: buffer.trim() })}\n\n`)
+            emitLine(buffer)
+            if (code !== 0) {
+              send("error", `Agent exited with code ${code}`)
             }
             controller.enqueue("data: [DONE]\n\n")
             controller.close()
@@ -0,0 +1,22 @@
+// Client for the long-lived Python worker (scripts/agent_service.py).
+// Routes try the service first and fall back to spawning Python when it is not running.
+
+const AGENT_SERVICE_URL =
+  process.env.AGENT_SERVICE_URL || `http://127.0.0.1:${process.env.AGENT_SERVICE_PORT || "8799"}`
+
+// Shared secret the service requires on every request but /health
+const AGENT_SERVICE_TOKEN = process.env.AGENT_SERVICE_TOKEN
+
+export async function callAgentService(path: string, init?: RequestInit): Promise<Response | null> {
+  // Without a token the service would refuse the request; spawn Python instead
+  if (!AGENT_SERVICE_TOKEN) {
+    return null
+  }
+  try {
+    const headers = new Headers(init?.headers)
+    headers.set("X-Agent-Service-Token", AGENT_SERVICE_TOKEN)
+    return await fetch(`${AGENT_SERVICE_URL}${path}`, { ...init, headers, cache: "no-store" })
+  } catch {
+    return null
+  }
+}
@@ -0,0 +1,96 @@
+"""
+Agent Event Stream
+------------------
+Machine-readable JSON-lines events for consumers of an agent run
+(`--events jsonl`, the dashboard's /api/run route, the worker service).
+
+Each line is one JSON object with a `type`, a `ts` (unix seconds) and
+type-specific fields. Types follow the AgenticState fields they mirror:
+
+    run_started          excel_file, options, run_id
+    agent_reasoning      text
+    tool_call            id, name, input (summarized)
+    tool_result          id, name, success, elapsed_ms, result (summarized)
+    decisions            student_id, action, source, ...decision record
+    communications_sent  student_id, email, subject, sent, source
+    error_log            message
+    token_usage          input/output/cache token counts of one Claude call
+    timing               node, elapsed_ms
+    run_completed        run_id, counts of reasoning, decisions, communications
+                         and errors, token_usage totals
+    metrics              the run's latency/token/cost report (run_metrics)
+
+Tool inputs and results are summarized: a list or mapping of more than
+MAX_ITEMS entries becomes {count, ids} (student ids where the entries have
+them), so a roster read does not put the whole roster on one line. NaN and
+infinite numbers are written as null, keeping every line valid JSON.
+
+Emitting is a no-op until a stream is enabled.
+"""
+
+import json
+import math
+import time
+import threading
+
+
+_stream = None
+_lock = threading.Lock()
+
+# Lists and mappings longer than this are summarized in tool events
+MAX_ITEMS = 20
+
+
+def enable(stream):
+    """Send events to `stream` (a text file object), one JSON object per line."""
+    global _stream
+    _stream = stream
+
+
+def disable():
+    global _stream
+    _stream = None
+
+
+def enabled() -> bool:
+    return _stream is not None
+
+
+def summarize(value):
+    """`value` with every list or mapping of more than MAX_ITEMS entries replaced by {count, ids}."""
+    if isinstance(value, dict):
+        if len(value) > MAX_ITEMS:
+            return {'count': len(value), 'ids': [str(key) for key in value]}
+        return {key: summarize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) > MAX_ITEMS:
+            ids = [item.get('student_id') for item in value if isinstance(item, dict)]
+            summary = {'count': len(value)}
+            if ids and all(sid is not None for sid in ids):
+                summary['ids'] = ids
+            return summary
+        return [summarize(item) for item in value]
+    return value
+
+
+def _json_safe(value):
+    """`value` with NaN and infinite floats mapped to None, which JSON writes as null."""
+    if isinstance(value, float):
+        return None if math.isnan(value) or math.isinf(value) else value
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def emit(event_type: str, **fields):
+    """Write one event if a stream is enabled."""
+    stream = _stream
+    if stream is None:
+        return
+    event = _json_safe({'type': event_type, 'ts': round(time.time(), 3), **fields})
+    line = json.dumps(event, default=str, allow_nan=False)
+    with _lock:
+        stream.write(line + '\n')
+        stream.flush()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Agent Worker Service
+--------------------
+Long-lived local HTTP server for the dashboard API routes.
+
+Spawning a Python process per request re-imports pandas, langgraph and
+anthropic and re-authenticates with Google every time. This service pays
+those costs once: modules, the Anthropic client, the authenticated Sheets
+reader and its sync state stay warm between requests.
+
+Endpoints (bound to 127.0.0.1 only):
+    GET  /health     {"ok": true}
+    GET  /students   same JSON as fetch_from_sheets.py
+    POST /run        {"file": "...", "mode": "google-sheets", "dry_run": true, ...}
+                     streams the agent's console output line by line, or
+                     with "events": true its JSON-lines events (agent_events)
+
+Every endpoint but /health requires the shared secret from
+AGENT_SERVICE_TOKEN in the X-Agent-Service-Token header, and requests
+carrying an Origin header (i.e. sent by a browser) are refused. /run only
+accepts application/json bodies, and "file" must be the configured roster
+(EXCEL_FILE_PATH) or a file in the dashboard's upload directory
+(AGENT_SERVICE_UPLOAD_DIR, default public/uploads).
+
+Agent runs are serialized: a second /run waits for the first to finish.
+
+Usage:
+    AGENT_SERVICE_TOKEN=... python agent_service.py --port 8799
+"""
+
+import io
+import os
+import re
+import sys
+import hmac
+import json
+import argparse
+import threading
+import traceback
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import agent_events
+import fetch_from_sheets
+import profile_agent_agentic as agent
+
+
+DEFAULT_PORT = int(os.getenv('AGENT_SERVICE_PORT', '8799'))
+TOKEN_HEADER = 'X-Agent-Service-Token'
+UPLOAD_DIR = os.getenv('AGENT_SERVICE_UPLOAD_DIR',
+                       os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'public', 'uploads'))
+
+# Options a /run request may pass through to run_agentic_agent, with their types
+RUN_OPTIONS = {
+    'dry_run': bool, 'pretriage': bool, 'use_async': bool, 'checkpoint_run': bool,
+    'incremental': bool, 'decision_cache': bool,
+    'shard_size': int, 'max_workers': int, 'run_id': str,
+}
+RUN_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+_reader = None
+_reader_lock = threading.Lock()
+_run_lock = threading.Lock()
+
+
+@contextmanager
+def shared_reader():
+    """
+    The service's GoogleSheetsReader, authenticated on first use. Held
+    exclusively for the duration of the block: its sync state is not
+    thread-safe and /students and /run requests use it concurrently.
+    """
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            from google_sheets_reader import GoogleSheetsReader
+            _reader = GoogleSheetsReader()
+        yield _reader
+
+
+def resolve_roster_file(file: str) -> str:
+    """
+    The roster path a /run request may use: the configured roster, or a
+    file inside the upload directory. Raises ValueError for anything else.
+    """
+    configured = os.path.realpath(agent.CONFIG['excel_file'])
+    if not file:
+        return configured
+    path = os.path.realpath(file if os.path.isabs(file) else os.path.join(UPLOAD_DIR, file))
+    upload_dir = os.path.realpath(UPLOAD_DIR)
+    if path != configured and os.path.dirname(path) != upload_dir:
+        raise ValueError('file must be the configured roster or an uploaded file')
+    if not os.path.isfile(path):
+        raise ValueError('file not found')
+    return path
+
+
+def run_options(body: dict) -> dict:
+    """The run_agentic_agent options of a /run body. Raises ValueError on bad values."""
+    options = {}
+    for key, value in body.items():
+        expected = RUN_OPTIONS.get(key)
+        if expected is None or value is None:
+            continue
+        # bool is an int subclass; keep "shard_size": true out
+        if type(value) is not expected:
+            raise ValueError(f"{key} must be of type {expected.__name__}")
+        if expected is int and value < 1:
+            raise ValueError(f"{key} must be positive")
+        options[key] = value
+    if 'run_id' in options and not RUN_ID_PATTERN.match(options['run_id']):
+        raise ValueError('run_id may only contain letters, digits, "-" and "_"')
+    options.setdefault('dry_run', True)
+    return options
+
+
+class OutputRouter(io.TextIOBase):
+    """
+    Replacement for sys.stdout that sends each thread's prints where they belong.
+    A thread with its own target (a /students request) writes there; every
+    other thread, including the agent's tool and shard workers, writes to
+    the active run's stream, or to the real stdout when no run is active.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.local = threading.local()
+        self.run_target = None
+
+    def _target(self):
+        return getattr(self.local, 'target', None) or self.run_target or self.fallback
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+
+class ChunkedLineWriter(io.TextIOBase):
+    """Writes complete lines to an HTTP response as chunks."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.buffer = ''
+        self.connected = True
+
+    def write(self, text):
+        self.buffer += text
+        if '\n' in self.buffer:
+            lines, self.buffer = self.buffer.rsplit('\n', 1)
+            self._send(lines + '\n')
+        return len(text)
+
+    def _send(self, text):
+        if not self.connected or not text:
+            return
+        data = text.encode('utf-8')
+        try:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        except OSError:
+            # Client went away; the run still finishes and is tracked
+            self.connected = False
+
+    def close(self):
+        self._send(self.buffer)
+        self.buffer = ''
+        if self.connected:
+            try:
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except OSError:
+                pass
+
+
+def run_agent(body: dict, options: dict, output: ChunkedLineWriter):
+    """
+    Run the agent for one validated /run request, with all console output
+    sent to `output` - or, for an events request, only the event stream.
+    """
+    router = sys.stdout
+    with _run_lock:
+        if body.get('events'):
+            agent_events.enable(output)
+            router.run_target = open(os.devnull, 'w')
+        else:
+            router.run_target = output
+        try:
+            if body.get('mode') == 'google-sheets':
+                with shared_reader() as reader:
+                    excel_file = agent.load_google_sheets_roster(reader)
+            else:
+                excel_file = body['file']
+            agent.run_agentic_agent(excel_file, **options)
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            agent_events.emit('error_log', message=str(e))
+            traceback.print_exc(file=sys.stderr)
+        finally:
+            if router.run_target is not output:
+                router.run_target.close()
+            router.run_target = None
+            agent_events.disable()
+
+
+class AgentServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status >= 400:
+            # A rejected request's body may be unread; don't parse it as the next request
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        """
+        Check the shared secret and refuse browser requests, answering the
+        request when it is rejected.
+        """
+        if self.headers.get('Origin'):
+            self._send_json(403, {'error': 'Cross-origin requests are not allowed'})
+            return False
+        token = os.getenv('AGENT_SERVICE_TOKEN', '')
+        supplied = self.headers.get(TOKEN_HEADER, '')
+        if not token or not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+            self._send_json(401, {'error': 'Unauthorized'})
+            return False
+        return True
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'ok': True})
+        elif self.path == '/students':
+            if not self._authorized():
+                return
+            # Status prints from the reader must not end up in a run's stream
+            sys.stdout.local.target = io.StringIO()
+            try:
+                with shared_reader() as reader:
+                    students = fetch_from_sheets.fetch_students(reader)
+                self._send_json(200, students)
+            except Exception as e:
+                self._send_json(500, {'success': False, 'error': str(e)})
+            finally:
+                sys.stdout.local.target = None
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/run':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        if not self._authorized():
+            return
+
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self._send_json(415, {'error': 'Content-Type must be application/json'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            if not isinstance(body, dict):
+                raise ValueError('Invalid JSON body')
+            options = run_options(body)
+            if body.get('mode') != 'google-sheets':
+                body['file'] = resolve_roster_file(body.get('file'))
+        except ValueError as e:
+            message = 'Invalid JSON body' if isinstance(e, json.JSONDecodeError) else str(e)
+            self._send_json(400, {'error': message})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        output = ChunkedLineWriter(self.wfile)
+        run_agent(body, options, output)
+        output.close()
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"[agent-service] {format % args}\n")
+
+
+def serve(port: int = DEFAULT_PORT):
+    if not os.getenv('AGENT_SERVICE_TOKEN'):
+        sys.exit("❌ AGENT_SERVICE_TOKEN is not set; the dashboard must send it with every request")
+    sys.stdout = OutputRouter(sys.stdout)
+    server = ThreadingHTTPServer(('127.0.0.1', port), AgentServiceHandler)
+    server.daemon_threads = True
+    print(f"🚀 Agent service listening on http://127.0.0.1:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Long-lived worker for the dashboard API routes')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on (127.0.0.1)')
+    args = parser.parse_args()
+    serve(args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark
+---------------------
+Measures how long the agent's entry modules take to import, using
+`python -X importtime` in fresh interpreters, and fails when a module
+exceeds its budget or pulls in a heavy dependency at import time.
+
+The CLI, the dashboard's spawned subprocesses and `--help` all pay this
+cost before doing any work, so pandas, numpy, langgraph and anthropic are
+only imported where they are first used.
+
+Usage:
+    python bench_imports.py
+    python bench_imports.py --runs 7 --budget-ms 400
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Entry modules and their import budgets (cumulative, in ms)
+IMPORT_BUDGETS_MS = {
+    'profile_agent_agentic': 250,
+    'main_agentic': 250,
+}
+
+# Must not be imported just by importing an entry module
+LAZY_MODULES = ['pandas', 'numpy', 'langgraph', 'anthropic', 'httpx', 'openpyxl']
+
+
+def _run_python(args: list) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'},
+    )
+
+
+def parse_importtime(stderr: str) -> list:
+    """(module, depth, self_us, cumulative_us) for each line of -X importtime output."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure_import(module: str) -> dict:
+    """
+    Import `module` in a fresh interpreter.
+    Returns its cumulative import time, its slowest dependencies and
+    which LAZY_MODULES ended up loaded.
+    """
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    proc = _run_python(['-X', 'importtime', '-c', probe])
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    timings = parse_importtime(proc.stderr)
+    end = next(i for i, (name, depth, _, _) in enumerate(timings) if name == module and depth == 0)
+    start = max((i for i in range(end) if timings[i][1] == 0), default=-1) + 1
+    # Direct dependencies of the module, slowest first
+    children = sorted(
+        ((name, cumulative) for name, depth, _, cumulative in timings[start:end] if depth == 1),
+        key=lambda item: item[1],
+        reverse=True
+    )
+    loaded = proc.stdout.strip()
+    return {
+        'total_ms': timings[end][3] / 1000,
+        'slowest': [(name, us / 1000) for name, us in children[:5]],
+        'eager_heavy': loaded.split(',') if loaded else [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check agent import times against their budgets')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module (median is reported)')
+    parser.add_argument('--budget-ms', type=float, help='Override the budget for every module')
+    parser.add_argument('--module', action='append', help='Module to measure (default: all entry modules)')
+    args = parser.parse_args()
+
+    modules = args.module or list(IMPORT_BUDGETS_MS)
+    failed = False
+
+    print(f"\n⏱️  Import times ({args.runs} runs each, median)\n")
+    for module in modules:
+        budget = args.budget_ms or IMPORT_BUDGETS_MS.get(module, 250)
+        samples = [measure_import(module) for _ in range(max(1, args.runs))]
+        median = statistics.median(sample['total_ms'] for sample in samples)
+        eager = samples[-1]['eager_heavy']
+
+        ok = median <= budget and not eager
+        failed = failed or not ok
+        print(f"   {'✅' if ok else '❌'} {module:<24} {median:7.1f} ms  (budget {budget:.0f} ms)")
+        for name, ms in samples[-1]['slowest']:
+            print(f"        {name:<28} {ms:7.1f} ms")
+        if eager:
+            print(f"        imported eagerly: {', '.join(eager)}")
+
+    # What a user actually waits for
+    proc_times = []
+    for _ in range(max(1, args.runs)):
+        proc = _run_python(['-X', 'importtime', 'main_agentic.py', '--help'])
+        proc_times.append(sum(self_us for _, _, self_us, _ in parse_importtime(proc.stderr)) / 1000)
+    print(f"\n   main_agentic.py --help imports: {statistics.median(proc_times):.1f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
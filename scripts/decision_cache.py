@@ -0,0 +1,134 @@
+"""
+Decision Cache
+--------------
+Remembers the agent's decisions by the situation they were made in, so
+students in the same situation get the same decision without a Claude call.
+
+A situation is the normalized feature tuple the agent decides on:
+
+    (completion bucket, missing fields, deadline status, contact count,
+     contacted recently, dry run)
+
+with completion_percentage rounded down to AGENT_DECISION_CACHE_BUCKET
+points. "Contacted recently" is whether the last contact falls inside the
+minimum gap between contacts, so a send decided for a student contacted
+days ago is never replayed to one contacted minutes ago. Dry-run and live
+decisions are kept apart. Each entry stores the chosen action (send / schedule) with its tone
+and urgency, or the days to wait. Entries expire after a TTL and the least
+recently used ones are evicted beyond the size limit. The cache lives in
+the tracking database, so it carries over from one run to the next.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def decision_key(completion_percentage: float, missing_fields: list, deadline_status: str,
+                 contact_count: int, contacted_recently: bool, dry_run: bool,
+                 bucket_size: int = 10) -> str:
+    """Normalized cache key of a student's situation."""
+    bucket = int((completion_percentage or 0) // bucket_size * bucket_size)
+    return json.dumps([bucket, sorted(missing_fields or []), deadline_status, contact_count,
+                       bool(contacted_recently), bool(dry_run)])
+
+
+class DecisionCache:
+    """TTL + LRU cache of agent decisions by situation key."""
+
+    def __init__(self, db_path: str, ttl_hours: float = 24, max_entries: int = 1000):
+        self.db_path = db_path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS decision_cache (
+                key TEXT PRIMARY KEY,
+                action TEXT NOT NULL,
+                tone TEXT,
+                urgency TEXT,
+                days_to_wait INTEGER,
+                reasoning TEXT,
+                created_at TEXT NOT NULL,
+                last_used TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_decision_cache_last_used
+                ON decision_cache (last_used);
+        """)
+        self._conn.commit()
+
+    def lookup(self, keys: list) -> dict:
+        """
+        Unexpired decisions for the given keys, as {key: decision}.
+        Hits are marked as used; expired entries are dropped.
+        """
+        now = datetime.now()
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM decision_cache WHERE created_at <= ?", ((now - self.ttl).isoformat(),))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, action, tone, urgency, days_to_wait, reasoning FROM decision_cache "
+                    f"WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, action, tone, urgency, days_to_wait, reasoning in rows:
+                    found[key] = {'action': action, 'tone': tone, 'urgency': urgency,
+                                  'days_to_wait': days_to_wait, 'reasoning': reasoning}
+            self._conn.executemany(
+                "UPDATE decision_cache SET last_used = ? WHERE key = ?",
+                [(now.isoformat(), key) for key in found]
+            )
+        return found
+
+    def store_many(self, entries: dict):
+        """Add or replace decisions ({key: decision}), then evict beyond max_entries."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO decision_cache "
+                "(key, action, tone, urgency, days_to_wait, reasoning, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "action = excluded.action, tone = excluded.tone, urgency = excluded.urgency, "
+                "days_to_wait = excluded.days_to_wait, reasoning = excluded.reasoning, "
+                "created_at = excluded.created_at, last_used = excluded.last_used",
+                [
+                    (key, d['action'], d.get('tone'), d.get('urgency'), d.get('days_to_wait'),
+                     d.get('reasoning'), now, now)
+                    for key, d in entries.items()
+                ]
+            )
+            self._conn.execute(
+                "DELETE FROM decision_cache WHERE key NOT IN "
+                "(SELECT key FROM decision_cache ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM decision_cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_decision_cache(db_path: str, ttl_hours: float = 24, max_entries: int = 1000) -> DecisionCache:
+    """Shared cache per database path, opened on first use."""
+    key = os.path.abspath(db_path)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = DecisionCache(db_path, ttl_hours, max_entries)
+        return _caches[key]
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Outbound Email Delivery
+-----------------------
+Sends email over SMTP through a queue served by a small pool of worker
+threads. Each worker keeps its SMTP session open and sends many messages
+over it, so live sends to thousands of students do not pay a TCP + TLS +
+login handshake per message.
+
+    submit(message)     queue a message, returns a Future with the delivery result
+    send(message)       queue a message and wait for its result
+    send_many(messages) queue a batch and wait for all results
+
+A message is a dict with recipient, subject and body (and optionally
+student_id). Delivery is paced by a shared token-bucket rate limit.
+Temporary failures (4xx replies, dropped connections, timeouts) are
+retried with exponential backoff on a fresh session; permanent ones (5xx)
+fail immediately. Sessions are recycled after messages_per_connection
+messages.
+
+Successful deliveries can be handed to a `tracker` callable in batches
+of tracking_batch_size (and on flush/close), e.g. CommunicationStore.append_many.
+The agent records through its run cache instead, which batches the same way.
+
+Usage:
+    python email_delivery.py --fake-server --messages 2000 --workers 4
+    python email_delivery.py --check
+"""
+
+import os
+import time
+import queue
+import random
+import smtplib
+import argparse
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
+
+
+class RateLimiter:
+    """Token bucket shared by all workers; rate 0 means unlimited."""
+
+    def __init__(self, rate_per_second: float, burst: int = None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(1, int(rate_per_second))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_transient(error: Exception) -> bool:
+    """True if a failed send is worth retrying: 4xx replies, dropped or refused connections, timeouts."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, OSError)
+
+
+class OutboundMailer:
+    """Queue + worker pool delivering messages over persistent SMTP sessions."""
+
+    def __init__(self, host: str, port: int = 587, username: str = None, password: str = None,
+                 starttls: bool = True, use_ssl: bool = False, from_email: str = None, from_name: str = None,
+                 workers: int = 4, rate_per_second: float = 0, max_retries: int = 3,
+                 backoff_seconds: float = 1.0, messages_per_connection: int = 100, timeout: float = 30,
+                 tracker=None, tracking_batch_size: int = 50):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.from_email = from_email or username or 'noreply@localhost'
+        self.from_name = from_name
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.messages_per_connection = messages_per_connection
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(rate_per_second)
+
+        self.tracker = tracker
+        self.tracking_batch_size = tracking_batch_size
+        self._tracking = []
+        self._tracking_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._stats = {'sent': 0, 'failed': 0, 'retries': 0, 'connections': 0}
+        self._queue = queue.Queue()
+        self._closed = False
+        self._workers = [
+            threading.Thread(target=self._work, name=f"smtp-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    # Sessions --------------------------------------------------------------
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls and not self.use_ssl:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._count('connections')
+        return smtp
+
+    @staticmethod
+    def _disconnect(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def build_message(self, message: dict) -> EmailMessage:
+        email = EmailMessage()
+        email['From'] = formataddr((self.from_name, self.from_email)) if self.from_name else self.from_email
+        email['To'] = message['recipient']
+        email['Subject'] = message['subject']
+        email['Date'] = formatdate(localtime=True)
+        email['Message-ID'] = make_msgid()
+        email.set_content(message['body'])
+        return email
+
+    # Workers ---------------------------------------------------------------
+
+    def _deliver(self, session: dict, message: dict) -> dict:
+        """Send one message over the worker's session, retrying temporary failures."""
+        email = self.build_message(message)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                if session['smtp'] is None:
+                    session['smtp'] = self._connect()
+                    session['sent'] = 0
+                session['smtp'].send_message(email)
+                session['sent'] += 1
+                return {'delivered': True, 'attempts': attempt + 1, 'timestamp': datetime.now().isoformat()}
+            except Exception as e:
+                # The session may be in any state after an error - start a new one
+                if session['smtp'] is not None:
+                    self._disconnect(session['smtp'])
+                    session['smtp'] = None
+                if attempt >= self.max_retries or not is_transient(e):
+                    return {'delivered': False, 'attempts': attempt + 1, 'error': str(e) or type(e).__name__}
+                self._count('retries')
+                time.sleep(self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2))
+                attempt += 1
+
+    def _work(self):
+        session = {'smtp': None, 'sent': 0}
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            message, future = job
+            try:
+                result = self._deliver(session, message)
+            except Exception as e:
+                # e.g. a message that cannot be built - never leave the caller waiting
+                result = {'delivered': False, 'attempts': 0, 'error': str(e)}
+
+            if session['smtp'] is not None and session['sent'] >= self.messages_per_connection:
+                self._disconnect(session['smtp'])
+                session['smtp'] = None
+
+            self._count('sent' if result['delivered'] else 'failed')
+            if result['delivered']:
+                self._track(message, result)
+            future.set_result(result)
+
+        if session['smtp'] is not None:
+            self._disconnect(session['smtp'])
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    # Tracking --------------------------------------------------------------
+
+    def _track(self, message: dict, result: dict):
+        if self.tracker is None:
+            return
+        with self._tracking_lock:
+            self._tracking.append((message.get('student_id'), {
+                'timestamp': result['timestamp'],
+                'subject': message['subject'],
+                'status': 'sent',
+                'recipient': message['recipient']
+            }))
+            if len(self._tracking) >= self.tracking_batch_size:
+                self._flush_tracking()
+
+    def _flush_tracking(self):
+        batch, self._tracking = self._tracking, []
+        if batch:
+            self.tracker(batch)
+
+    def flush(self):
+        """Hand buffered deliveries to the tracker."""
+        with self._tracking_lock:
+            self._flush_tracking()
+
+    # Public API ------------------------------------------------------------
+
+    def submit(self, message: dict) -> Future:
+        """Queue a message; the Future resolves to {'delivered', 'attempts', 'timestamp' | 'error'}."""
+        if self._closed:
+            raise RuntimeError('Mailer is closed')
+        future = Future()
+        self._queue.put((message, future))
+        return future
+
+    def send(self, message: dict) -> dict:
+        return self.submit(message).result()
+
+    def send_many(self, messages: list) -> list:
+        futures = [self.submit(message) for message in messages]
+        return [future.result() for future in futures]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def close(self):
+        """Finish queued messages, close all sessions and flush tracking."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self.flush()
+
+
+def mailer_from_env(**overrides) -> OutboundMailer:
+    """Mailer configured from SMTP_* variables (GMAIL_* as a fallback), or None without a host."""
+    gmail = os.getenv('GMAIL_ADDRESS')
+    host = os.getenv('SMTP_HOST') or ('smtp.gmail.com' if gmail else None)
+    if not host:
+        return None
+    settings = {
+        'host': host,
+        'port': int(os.getenv('SMTP_PORT', '587')),
+        'username': os.getenv('SMTP_USERNAME') or gmail,
+        'password': os.getenv('SMTP_PASSWORD') or os.getenv('GMAIL_APP_PASSWORD'),
+        'starttls': os.getenv('SMTP_STARTTLS', 'true').lower() != 'false',
+        'use_ssl': os.getenv('SMTP_SSL', 'false').lower() == 'true',
+        'from_email': os.getenv('FROM_EMAIL') or os.getenv('SMTP_USERNAME') or gmail,
+        'from_name': os.getenv('FROM_NAME'),
+        'workers': int(os.getenv('SMTP_WORKERS', '4')),
+        'rate_per_second': float(os.getenv('SMTP_RATE_PER_SECOND', '10')),
+        'max_retries': int(os.getenv('SMTP_MAX_RETRIES', '3')),
+        'backoff_seconds': float(os.getenv('SMTP_BACKOFF_SECONDS', '1')),
+        'messages_per_connection': int(os.getenv('SMTP_MESSAGES_PER_CONNECTION', '100')),
+    }
+    settings.update(overrides)
+    return OutboundMailer(**settings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Outbound SMTP delivery check and throughput test')
+    parser.add_argument('--check', action='store_true', help='Connect and log in to the configured SMTP server, send nothing')
+    parser.add_argument('--fake-server', action='store_true', help='Send to an in-process fake SMTP server')
+    parser.add_argument('--messages', type=int, default=1000, help='Messages to send to the fake server')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent SMTP sessions')
+    parser.add_argument('--rate', type=float, default=0, help='Messages per second (0 = unlimited)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Fake server delay per message, seconds')
+    parser.add_argument('--fail-every', type=int, default=0, help='Fake server answers every n-th message with 451')
+    args = parser.parse_args()
+
+    if args.check:
+        from dotenv import load_dotenv
+        load_dotenv()
+        mailer = mailer_from_env(workers=1)
+        if mailer is None:
+            print("❌ SMTP_HOST (or GMAIL_ADDRESS) is not set")
+            raise SystemExit(1)
+        smtp = mailer._connect()
+        smtp.noop()
+        mailer._disconnect(smtp)
+        mailer.close()
+        print(f"✅ Connected to {mailer.host}:{mailer.port}{' and logged in' if mailer.username else ''}")
+        return
+
+    if not args.fake_server:
+        parser.error('use --fake-server (throughput test) or --check (configured server)')
+
+    from fake_smtp import FakeSMTPServer
+
+    tracked = []
+    with FakeSMTPServer(latency=args.latency, fail_every=args.fail_every) as server:
+        mailer = OutboundMailer(server.host, server.port, starttls=False, from_email='noreply@example.edu',
+                                workers=args.workers, rate_per_second=args.rate, backoff_seconds=0.01,
+                                tracker=tracked.extend)
+        messages = [
+            {'student_id': f"student_{i}", 'recipient': f"student{i}@example.edu",
+             'subject': 'Complete Your Profile', 'body': 'x' * 1000}
+            for i in range(args.messages)
+        ]
+        start = time.perf_counter()
+        results = mailer.send_many(messages)
+        elapsed = time.perf_counter() - start
+        mailer.close()
+
+    stats = mailer.stats()
+    print(f"\n📬 {sum(r['delivered'] for r in results)} of {len(messages)} delivered in {elapsed:.2f}s "
+          f"({len(messages) / elapsed:,.0f} msg/s)")
+    print(f"   SMTP sessions opened: {stats['connections']} (server saw {server.connections})")
+    print(f"   Retries: {stats['retries']}, failed: {stats['failed']}")
+    print(f"   Tracking entries handed over: {len(tracked)}")
+
+
+if __name__ == "__main__":
+    main()
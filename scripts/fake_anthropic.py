@@ -0,0 +1,227 @@
+"""
+Scripted Fake Anthropic Client
+------------------------------
+Deterministic stand-in for the Anthropic client that drives agent_node
+without network access or API credits. Every call returns a real
+anthropic.types.Message whose tool_use follows a fixed per-student script:
+
+    check_communication_history -> analyze_profile_status
+        -> draft_message -> send_email
+
+Students are worked on in batches (parallel tool calls in one turn), and
+students contacted before are scheduled for later instead of emailed.
+The next step is derived from the conversation itself (the roster in the
+task or the read_student_data result, and the last tool call), so the
+script replays the same way in plain, sharded, compacted and resumed runs.
+
+Usage:
+    import profile_agent_agentic as agent
+    agent.client = ScriptedAnthropic()
+"""
+
+import re
+import json
+import time
+import threading
+
+
+DEFAULT_SCRIPT = ['check_communication_history', 'analyze_profile_status', 'draft_message', 'send_email']
+
+# Tools after which the agent is done with a student
+FINAL_STEPS = {'send_email', 'schedule_for_later'}
+
+
+def _field(block, name: str, default=None):
+    if isinstance(block, dict):
+        return block.get(name, default)
+    return getattr(block, name, default)
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return '\n'.join(_field(block, 'text', '') or '' for block in content)
+
+
+def _tool_student_id(tool_input: dict):
+    if 'student_id' in tool_input:
+        return tool_input['student_id']
+    return (tool_input.get('student_data') or {}).get('student_id')
+
+
+def _load_json(content) -> dict:
+    try:
+        parsed = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def tone_for(student: dict) -> tuple:
+    """(tone, urgency) the scripted agent picks for a student."""
+    completion = student.get('completion_percentage', 0) or 0
+    if completion < 40:
+        return 'urgent', 'high'
+    if completion < 70:
+        return 'professional', 'medium'
+    return 'friendly', 'low'
+
+
+class ScriptedMessages:
+    """`client.messages` of the fake: create() replays the script."""
+
+    def __init__(self, script: list = None, schedule_contacted: bool = True, latency: float = 0.0,
+                 batch_size: int = 10):
+        self.script = list(script or DEFAULT_SCRIPT)
+        self.schedule_contacted = schedule_contacted
+        self.batch_size = max(1, batch_size)
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    # Reading the conversation ----------------------------------------------
+
+    def _roster(self, messages: list):
+        """Students of this conversation: embedded in the task, or from read_student_data."""
+        task = _text(messages[0]['content'])
+        embedded = re.search(r'STUDENTS:\n(.+)', task)
+        if embedded:
+            return json.loads(embedded.group(1))
+
+        calls = {}
+        for message in messages:
+            if isinstance(message['content'], str):
+                continue
+            for block in message['content']:
+                if _field(block, 'type') == 'tool_use':
+                    calls[_field(block, 'id')] = _field(block, 'name')
+                elif _field(block, 'type') == 'tool_result' and calls.get(_field(block, 'tool_use_id')) == 'read_student_data':
+                    result = _load_json(_field(block, 'content'))
+                    if 'students' in result:
+                        return result['students']
+        return None
+
+    def _last_calls(self, messages: list) -> list:
+        """(tool name, input, result) for each call of the newest tool exchange."""
+        if len(messages) < 3 or isinstance(messages[-1]['content'], str):
+            return []
+        results = {_field(b, 'tool_use_id'): b for b in messages[-1]['content']}
+        return [
+            (_field(b, 'name'), _field(b, 'input') or {}, _load_json(_field(results.get(_field(b, 'id'), {}), 'content')))
+            for b in messages[-2]['content'] if _field(b, 'type') == 'tool_use'
+        ]
+
+    # Choosing the next step ----------------------------------------------
+
+    def _next_calls(self, messages: list) -> list:
+        """(tool name, input) for each call of the next turn; empty when done."""
+        roster = self._roster(messages)
+        last = self._last_calls(messages)
+        # Live runs: pass dry_run=false to send_email and schedule_for_later, as the task asks
+        dry_run = 'Dry run mode: DISABLED' not in _text(messages[0]['content'])
+
+        if roster is None:
+            excel_file = re.search(r'Excel file: (.+)', _text(messages[0]['content']))
+            return [('read_student_data', {'file_path': excel_file.group(1).strip() if excel_file else ''})]
+
+        positions = {s.get('student_id'): i for i, s in enumerate(roster)}
+        if not last or last[0][0] == 'read_student_data':
+            return [self._step(student, 0, {}, dry_run) for student in roster[:self.batch_size]]
+
+        calls = []
+        furthest = -1
+        for name, tool_input, result in last:
+            position = positions.get(_tool_student_id(tool_input))
+            if position is None:
+                continue
+            furthest = max(furthest, position)
+            if name in FINAL_STEPS:
+                continue
+            if name == 'check_communication_history' and self.schedule_contacted and result.get('contacted_before'):
+                calls.append(('schedule_for_later', {
+                    'student_id': roster[position].get('student_id'),
+                    'days_to_wait': 3,
+                    'reason': 'Contacted recently; give them time to respond',
+                    'dry_run': dry_run
+                }))
+                continue
+            step = self.script.index(name) + 1 if name in self.script else len(self.script)
+            if step < len(self.script):
+                calls.append(self._step(roster[position], step, result, dry_run))
+
+        if calls or furthest < 0:
+            return calls
+        # Batch finished: start the next one
+        return [self._step(student, 0, {}, dry_run)
+                for student in roster[furthest + 1:furthest + 1 + self.batch_size]]
+
+    def _step(self, student: dict, step: int, previous: dict, dry_run: bool = True) -> tuple:
+        name = self.script[step]
+        student_id = student.get('student_id')
+        if name == 'check_communication_history':
+            return name, {'student_id': student_id}
+        if name == 'analyze_profile_status':
+            return name, {'student_data': student}
+        if name == 'draft_message':
+            tone, urgency = tone_for(student)
+            return name, {
+                'student_name': student.get('student_name', 'Student'),
+                'student_data': student,
+                'tone': tone,
+                'urgency': urgency,
+                'reasoning': f"{student.get('completion_percentage', 0)}% complete"
+            }
+        if name == 'send_email':
+            return name, {
+                'student_email': student.get('email', ''),
+                'subject': previous.get('subject', 'Complete Your Profile'),
+                'message_body': previous.get('message_body', ''),
+                'student_id': student_id,
+                'dry_run': dry_run
+            }
+        return name, {'student_id': student_id}
+
+    # Messages API ----------------------------------------------------------
+
+    def create(self, **kwargs):
+        from anthropic.types import Message, TextBlock, ToolUseBlock, Usage
+
+        messages = kwargs['messages']
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        calls = self._next_calls(messages)
+        if not calls:
+            content = [TextBlock(type='text', text='All students processed. Summary: script complete.')]
+            stop_reason = 'end_turn'
+        else:
+            content = [TextBlock(type='text', text=f"Next: {', '.join(sorted({name for name, _ in calls}))}")]
+            content += [
+                ToolUseBlock(type='tool_use', id=f"toolu_{_tool_student_id(tool_input) or 'roster'}_{name}",
+                             name=name, input=tool_input)
+                for name, tool_input in calls
+            ]
+            stop_reason = 'tool_use'
+
+        # Rough token counts, so cost reports have something to add up
+        prompt_chars = len(json.dumps(messages, default=str))
+        return Message(
+            id=f"msg_scripted_{len(messages)}",
+            type='message',
+            role='assistant',
+            model=kwargs.get('model', 'scripted'),
+            content=content,
+            stop_reason=stop_reason,
+            stop_sequence=None,
+            usage=Usage(input_tokens=prompt_chars // 4, output_tokens=40)
+        )
+
+
+class ScriptedAnthropic:
+    """Drop-in for anthropic.Anthropic in profile_agent_agentic (agent.client = ScriptedAnthropic())."""
+
+    def __init__(self, script: list = None, schedule_contacted: bool = True, latency: float = 0.0,
+                 batch_size: int = 10):
+        self.messages = ScriptedMessages(script, schedule_contacted, latency, batch_size)
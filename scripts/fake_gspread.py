@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Fake gspread Client
+-------------------
+In-memory stand-in for the parts of gspread that GoogleSheetsReader uses,
+so sheet reads and incremental syncs can be exercised offline without
+credentials. Every worksheet counts the requests and cells it served.
+
+Usage:
+    from fake_gspread import FakeGspreadClient, make_form_responses
+    client = FakeGspreadClient({'sheet-id': make_form_responses(1000)})
+    reader = GoogleSheetsReader(client=client, sheet_id='sheet-id')
+
+    python fake_gspread.py --rows 20000 --appended 50 --edited 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timezone
+
+from gspread.utils import a1_range_to_grid_range, numericise_all
+
+
+FORM_HEADER = [
+    'Timestamp', 'Student Name', 'Roll Number', 'Institute Name', 'Enrolled program',
+    'Stream', 'Date of birth', 'Gender', 'email address',
+    'previous education qualification', 'primary language', 'Nationality'
+]
+
+
+class FakeWorksheet:
+    """A grid of string cells, returned the way the Sheets API formats values."""
+
+    def __init__(self, spreadsheet, title: str, rows: list):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.rows = [[str(value) for value in row] for row in rows]
+        self.requests = 0
+        self.cells_fetched = 0
+
+    def get(self, range_name: str = None, pad_values: bool = False, **kwargs) -> list:
+        self.requests += 1
+        grid = a1_range_to_grid_range(range_name) if range_name else {}
+        rows = self.rows[grid.get('startRowIndex', 0):grid.get('endRowIndex', len(self.rows))]
+        start_col = grid.get('startColumnIndex', 0)
+        end_col = grid.get('endColumnIndex')
+        values = [row[start_col:end_col] for row in rows]
+
+        # Like the API: no trailing empty cells or rows
+        values = [self._trim(row) for row in values]
+        while values and not values[-1]:
+            values.pop()
+        if pad_values and values:
+            width = max(len(row) for row in values)
+            values = [row + [''] * (width - len(row)) for row in values]
+
+        self.cells_fetched += sum(len(row) for row in values)
+        return values or [[]]
+
+    @staticmethod
+    def _trim(row: list) -> list:
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        return row
+
+    def get_all_records(self) -> list:
+        entire = self.get(pad_values=True)
+        if entire == [[]]:
+            return []
+        header = entire[0]
+        return [dict(zip(header, numericise_all(row))) for row in entire[1:]]
+
+    # Edits, as a form or a person would make them -------------------------
+
+    def append_row(self, values: list):
+        self.rows.append([str(value) for value in values])
+        self.spreadsheet.touch()
+
+    def update_row(self, row_number: int, values: list):
+        """Replace a row (1-based, header is row 1)."""
+        self.rows[row_number - 1] = [str(value) for value in values]
+        self.spreadsheet.touch()
+
+    def delete_rows(self, row_number: int):
+        del self.rows[row_number - 1]
+        self.spreadsheet.touch()
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheet_id: str, worksheets: dict):
+        self.id = sheet_id
+        self._modified = 0
+        self._worksheets = {
+            title: FakeWorksheet(self, title, rows) for title, rows in worksheets.items()
+        }
+        self.touch()
+
+    def touch(self):
+        """Advance the Drive modifiedTime."""
+        self._modified += 1
+        self._modified_time = datetime.fromtimestamp(self._modified, timezone.utc).isoformat()
+
+    def get_lastUpdateTime(self) -> str:
+        return self._modified_time
+
+    @property
+    def sheet1(self) -> FakeWorksheet:
+        return next(iter(self._worksheets.values()))
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        return self._worksheets[title]
+
+
+class FakeGspreadClient:
+    """Client whose spreadsheets are given as {sheet_id: rows} or {sheet_id: {title: rows}}."""
+
+    def __init__(self, sheets: dict):
+        self.spreadsheets = {
+            sheet_id: FakeSpreadsheet(sheet_id, data if isinstance(data, dict) else {'Form Responses 1': data})
+            for sheet_id, data in sheets.items()
+        }
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        return self.spreadsheets[key]
+
+
+def form_response_row(i: int) -> list:
+    """One synthetic form response; every third one leaves a few fields blank."""
+    incomplete = i % 3 == 0
+    return [
+        f"2025-11-{1 + i % 28:02d} 10:{i % 60:02d}:00",
+        f"Student {i}",
+        f"R{i:06d}",
+        'IIIT Dharwad',
+        'B.Tech',
+        '' if incomplete else 'CSE',
+        '2004-01-01',
+        '' if incomplete else 'Female',
+        f"student{i}@example.edu",
+        '' if incomplete else '12th CBSE',
+        'English',
+        '' if i % 6 == 0 else 'Indian',
+    ]
+
+
+def make_form_responses(count: int) -> list:
+    """Header plus `count` response rows."""
+    return [FORM_HEADER] + [form_response_row(i) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full and incremental sheet syncs offline')
+    parser.add_argument('--rows', type=int, default=20000, help='Responses already in the sheet')
+    parser.add_argument('--appended', type=int, default=50, help='Responses added before the refresh')
+    parser.add_argument('--edited', type=int, default=10, help='Existing responses edited before the refresh')
+    args = parser.parse_args()
+
+    os.environ['ROSTER_CACHE_DIR'] = tempfile.mkdtemp(prefix='fake-gspread-')
+    import google_sheets_reader
+    from google_sheets_reader import GoogleSheetsReader
+
+    client = FakeGspreadClient({'fake-sheet': make_form_responses(args.rows)})
+    sheet = client.open_by_key('fake-sheet').sheet1
+    reader = GoogleSheetsReader(client=client, sheet_id='fake-sheet')
+
+    start = time.perf_counter()
+    first = reader.sync_sheet_data()
+    first_time = time.perf_counter() - start
+    first_cells = sheet.cells_fetched
+
+    for i in range(args.rows, args.rows + args.appended):
+        sheet.append_row(form_response_row(i))
+
+    start = time.perf_counter()
+    second = reader.sync_sheet_data()
+    second_time = time.perf_counter() - start
+    second_cells = sheet.cells_fetched - first_cells
+
+    # Fix the email address of a few existing responses; in-place edits
+    # are seen at the next whole-sheet read, due here as if
+    # SHEETS_FULL_SYNC_HOURS had passed
+    edited = range(0, args.rows, max(args.rows // max(args.edited, 1), 1))[:args.edited]
+    for i in edited:
+        row = form_response_row(i)
+        row[8] = f"student{i}@mail.example.edu"
+        sheet.update_row(i + 2, row)
+    google_sheets_reader.FULL_SYNC_HOURS = 0
+
+    start = time.perf_counter()
+    third = reader.sync_sheet_data()
+    third_time = time.perf_counter() - start
+    third_cells = sheet.cells_fetched - first_cells - second_cells
+
+    appended = list(range(args.rows, args.rows + args.appended))
+    ok = (
+        second['changed_rows'] == appended
+        and third['changed_rows'] == list(edited)
+        and third['records'] == sheet.get_all_records()
+        and len(first['records']) == args.rows
+    )
+    print(f"\n   Initial sync:      {first_time:6.3f}s, {first_cells} cells fetched")
+    print(f"   Appended rows:     {second_time:6.3f}s, {second_cells} cells fetched, "
+          f"{len(second['changed_rows'])} rows changed")
+    print(f"   Whole-sheet diff:  {third_time:6.3f}s, {third_cells} cells fetched, "
+          f"{len(third['changed_rows'])} rows changed")
+    print(f"   Changed rows are the appended, then the edited ones; records match get_all_records: {ok}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+In-Process Fake SMTP Server
+---------------------------
+Minimal SMTP server on a local port, for exercising email_delivery without
+a mail provider. It speaks enough of RFC 5321 for smtplib (EHLO/HELO,
+MAIL, RCPT, DATA, RSET, NOOP, QUIT), keeps every accepted message in
+memory and counts connections, so tests can check that sessions are reused.
+
+Failures can be injected to exercise retries:
+    fail_every      every n-th DATA is answered with a temporary 451
+    drop_every      every n-th DATA closes the connection instead of answering
+
+Usage:
+    with FakeSMTPServer() as server:
+        mailer = OutboundMailer(host=server.host, port=server.port, starttls=False)
+        ...
+        print(len(server.messages), server.connections)
+
+Python's own debugging server works too, if aiosmtpd is installed:
+    python -m aiosmtpd -n -l 127.0.0.1:1025
+"""
+
+import time
+import threading
+import socketserver
+from email import message_from_bytes, policy
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server.fake
+        with server.lock:
+            server.connections += 1
+        self._reply('220 fake-smtp ready')
+
+        sender = None
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+
+            if verb in ('EHLO', 'HELO'):
+                if verb == 'EHLO':
+                    self._reply('250-fake-smtp')
+                    self._reply('250-8BITMIME')
+                    self._reply('250 SMTPUTF8')
+                else:
+                    self._reply('250 fake-smtp')
+            elif verb == 'MAIL':
+                sender = command[10:].strip().strip('<>').split('>')[0]
+                recipients = []
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip().strip('<>').split('>')[0])
+                self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk:
+                        return
+                    if chunk in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b'..') else chunk)
+
+                outcome = server._next_outcome()
+                if outcome == 'drop':
+                    return
+                if outcome == 'fail':
+                    self._reply('451 Temporary failure, try again later')
+                else:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    with server.lock:
+                        server.messages.append({
+                            'sender': sender,
+                            'recipients': list(recipients),
+                            'message': message_from_bytes(b''.join(data), policy=policy.default),
+                        })
+                    self._reply('250 OK queued')
+                sender = None
+                recipients = []
+            elif verb == 'RSET':
+                sender = None
+                recipients = []
+                self._reply('250 OK')
+            elif verb == 'NOOP':
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeSMTPServer:
+    """Threaded SMTP sink on 127.0.0.1; port 0 picks a free port."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 fail_every: int = 0, drop_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.drop_every = drop_every
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self._data_commands = 0
+
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.fake = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def _next_outcome(self) -> str:
+        with self.lock:
+            self._data_commands += 1
+            count = self._data_commands
+        if self.drop_every and count % self.drop_every == 0:
+            return 'drop'
+        if self.fail_every and count % self.fail_every == 0:
+            return 'fail'
+        return 'accept'
+
+    def start(self) -> 'FakeSMTPServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-smtp', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -4,75 +4,108 @@ Fetch student data from Google Sheets and analyze missing fields.
 Outputs JSON for the API.
 """
 
+import os
 import json
 import sys
-from google_sheets_reader import GoogleSheetsReader
+import hashlib
+from google_sheets_reader import GoogleSheetsReader, DELTA_SYNC_ENABLED
+from profile_fields import MANDATORY_FIELDS, completion_summary, row_values
+from run_cache import atomic_write_json
+import numpy as np
 import pandas as pd
 
 def analyze_students(df):
     """Analyze student data and identify missing fields."""
     
-    # Define mandatory fields
-    mandatory_fields = [
-        'student_name', 'roll_number', 'institute_name',
-        'enrolled_program', 'stream', 'date_of_birth',
-        'gender', 'email', 'previous_education',
-        'primary_language', 'nationality'
+    # Vectorized missing-field detection over all mandatory columns
+    summary = completion_summary(df, MANDATORY_FIELDS)
+    
+    output_fields = [
+        'student_name', 'roll_number', 'email', 'institute_name',
+        'enrolled_program', 'stream', 'date_of_birth', 'gender',
+        'previous_education', 'primary_language', 'nationality'
     ]
+    values = row_values(df, np.arange(len(df)), {field: '' for field in output_fields})
+    columns = {field: [str(v) for v in values[field]] for field in output_fields}
     
     students = []
     
-    for idx, row in df.iterrows():
-        # Find missing fields
-        missing = []
-        for field in mandatory_fields:
-            value = row.get(field)
-            if pd.isna(value) or value is None or (isinstance(value, str) and value.strip() == ''):
-                missing.append(field)
-        
-        # Calculate completion percentage
-        completion_pct = round((len(mandatory_fields) - len(missing)) / len(mandatory_fields) * 100, 1)
-        
-        student = {
-            'student_name': str(row.get('student_name', '')),
-            'roll_number': str(row.get('roll_number', '')),
-            'email': str(row.get('email', '')),
-            'institute_name': str(row.get('institute_name', '')),
-            'enrolled_program': str(row.get('enrolled_program', '')),
-            'stream': str(row.get('stream', '')),
-            'date_of_birth': str(row.get('date_of_birth', '')),
-            'gender': str(row.get('gender', '')),
-            'previous_education': str(row.get('previous_education', '')),
-            'primary_language': str(row.get('primary_language', '')),
-            'nationality': str(row.get('nationality', '')),
-            'missing_fields': missing,
-            'completion_percentage': completion_pct
-        }
+    for i in range(len(df)):
+        student = {field: columns[field][i] for field in output_fields}
+        student['missing_fields'] = summary['missing_fields'][i]
+        student['completion_percentage'] = summary['completion_percentage'][i]
         
         students.append(student)
     
     return students
 
-def main():
+def normalize_columns(df):
+    """Lower-case, underscore-separated column names."""
+    df.columns = df.columns.str.lower().str.replace(' ', '_')
+    return df
+
+
+def analyze_changed_students(df, row_hashes, cache_path):
+    """
+    Analyze only rows whose content is not in the analysis cache.
+    The cache maps row hashes to analyzed students and is rebuilt from
+    scratch whenever the sheet's columns change.
+    """
+    columns_key = hashlib.sha1(json.dumps(list(df.columns)).encode()).hexdigest()
     try:
-        # Read from Google Sheets
-        reader = GoogleSheetsReader()
-        df = reader.get_sheet_as_dataframe()
-        
-        # Normalize column names
-        df.columns = df.columns.str.lower().str.replace(' ', '_')
-        
-        # Analyze students
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+        if cache.get('columns') != columns_key:
+            cache = None
+    except (OSError, ValueError):
+        cache = None
+    analyzed = cache['students'] if cache else {}
+    
+    pending = [i for i, h in enumerate(row_hashes) if h not in analyzed]
+    if pending:
+        fresh = analyze_students(df.iloc[pending])
+        analyzed.update({row_hashes[i]: student for i, student in zip(pending, fresh)})
+    
+    students = [analyzed[h] for h in row_hashes]
+    
+    # Keep only rows that are still in the sheet
+    atomic_write_json(cache_path, {
+        'columns': columns_key,
+        'students': {h: analyzed[h] for h in row_hashes},
+    }, indent=None)
+    
+    return students
+
+
+def fetch_students(reader=None):
+    """
+    Read the sheet and analyze every student.
+    `reader` lets a long-lived caller reuse an authenticated GoogleSheetsReader.
+    """
+    # Read from Google Sheets
+    reader = reader or GoogleSheetsReader()
+    
+    if DELTA_SYNC_ENABLED:
+        # Only new or edited rows are re-analyzed
+        sync = reader.sync_sheet_data()
+        df = normalize_columns(pd.DataFrame(sync['records']))
+        cache_path = os.path.join(reader.snapshot_dir, f"analysis-{reader.sheet_id}.json")
+        students = analyze_changed_students(df, sync['row_hashes'], cache_path)
+    else:
+        df = normalize_columns(reader.get_sheet_as_dataframe())
         students = analyze_students(df)
-        
+    
+    return {
+        'success': True,
+        'total_students': len(students),
+        'students': students
+    }
+
+
+def main():
+    try:
         # Output as JSON
-        result = {
-            'success': True,
-            'total_students': len(students),
-            'students': students
-        }
-        
-        print(json.dumps(result))
+        print(json.dumps(fetch_students()))
         
     except Exception as e:
         error_result = {
@@ -2,23 +2,59 @@
 Google Sheets Data Reader
 -------------------------
 Reads student data from Google Sheets (Google Form responses)
+
+sync_sheet_data() keeps a local copy of the sheet with a hash per row.
+When the sheet was modified, only the rows after the last synced one are
+fetched (form responses are appended). The whole sheet is fetched and
+diffed against the stored hashes when the header or the last known row
+changed, and at least every SHEETS_FULL_SYNC_HOURS, which is when edits to
+earlier rows are picked up.
 """
 
 import os
+import json
+import hashlib
 import gspread
+from datetime import datetime, timedelta
+from gspread.utils import numericise_all, rowcol_to_a1
 from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
 
+from roster_snapshot import SNAPSHOT_DIR, SNAPSHOTS_ENABLED, load_snapshot, save_snapshot
+from run_cache import atomic_write_json
+
 load_dotenv()
 
+DELTA_SYNC_ENABLED = os.getenv('SHEETS_DELTA_SYNC', 'true').lower() != 'false'
+FULL_SYNC_HOURS = float(os.getenv('SHEETS_FULL_SYNC_HOURS', '24'))
+
+
+def row_hash(row: list) -> str:
+    """Content hash of one raw sheet row."""
+    return hashlib.sha1(json.dumps(row).encode()).hexdigest()
+
+
+def _pad(row: list, width: int) -> list:
+    return list(row[:width]) + [''] * (width - len(row))
+
+
 class GoogleSheetsReader:
     """Read data from Google Sheets."""
     
-    def __init__(self):
-        self.sheet_id = os.getenv('GOOGLE_SHEET_ID')
+    def __init__(self, client=None, sheet_id: str = None):
+        """
+        Args:
+            client: Authorized gspread client to use instead of the service
+                    account (e.g. fake_gspread.FakeGspreadClient offline)
+            sheet_id: Spreadsheet key (default: GOOGLE_SHEET_ID)
+        """
+        self.sheet_id = sheet_id or os.getenv('GOOGLE_SHEET_ID')
         self.creds_file = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
-        self.client = None
-        self._authenticate()
+        self.client = client
+        self.spreadsheet = None
+        self.snapshot_dir = os.getenv('ROSTER_CACHE_DIR', SNAPSHOT_DIR)
+        if self.client is None:
+            self._authenticate()
     
     def _authenticate(self):
         """Authenticate with Google Sheets API."""
@@ -40,6 +76,16 @@ class GoogleSheetsReader:
             print(f"❌ Failed to authenticate with Google Sheets: {e}")
             raise
     
+    def _open_spreadsheet(self):
+        """Open the spreadsheet once per reader."""
+        if self.spreadsheet is None:
+            self.spreadsheet = self.client.open_by_key(self.sheet_id)
+        return self.spreadsheet
+    
+    def _worksheet(self, sheet_name: str = None):
+        spreadsheet = self._open_spreadsheet()
+        return spreadsheet.worksheet(sheet_name) if sheet_name else spreadsheet.sheet1
+    
     def read_sheet_data(self, sheet_name: str = None):
         """
         Read all data from Google Sheet.
@@ -52,13 +98,10 @@ class GoogleSheetsReader:
         """
         try:
             # Open the spreadsheet
-            spreadsheet = self.client.open_by_key(self.sheet_id)
+            spreadsheet = self._open_spreadsheet()
             
             # Get the first sheet or specified sheet
-            if sheet_name:
-                sheet = spreadsheet.worksheet(sheet_name)
-            else:
-                sheet = spreadsheet.sheet1
+            sheet = self._worksheet(sheet_name)
             
             # Get all records as list of dictionaries
             records = sheet.get_all_records()
@@ -71,15 +114,161 @@ class GoogleSheetsReader:
             print(f"❌ Error reading Google Sheets: {e}")
             raise
     
-    def get_sheet_as_dataframe(self):
-        """Get sheet data as pandas DataFrame."""
+    def _sheet_version(self) -> dict:
+        """Drive modifiedTime of the spreadsheet, or None if it cannot be read."""
+        try:
+            return {'modified_time': self._open_spreadsheet().get_lastUpdateTime()}
+        except Exception:
+            return None
+    
+    def get_sheet_as_dataframe(self, sheet_name: str = None, use_snapshot: bool = SNAPSHOTS_ENABLED):
+        """
+        Get sheet data as pandas DataFrame.
+        
+        Unless the spreadsheet was modified since the last download, the
+        cached snapshot is returned and the sheet is not downloaded again.
+        """
         import pandas as pd
         
-        records = self.read_sheet_data()
+        key = f"gsheet:{self.sheet_id}:{sheet_name or 'sheet1'}"
+        version = self._sheet_version() if use_snapshot else None
+        if version:
+            df = load_snapshot(self.snapshot_dir, key, version)
+            if df is not None:
+                print(f"✅ Loaded {len(df)} records from snapshot (sheet unchanged since {version['modified_time']})")
+                return df
+        
+        if DELTA_SYNC_ENABLED:
+            records = self.sync_sheet_data(sheet_name)['records']
+        else:
+            records = self.read_sheet_data(sheet_name)
         df = pd.DataFrame(records)
         
+        if version:
+            save_snapshot(self.snapshot_dir, key, version, df)
+        
         return df
     
+    def _sync_state_path(self, sheet_name: str = None) -> str:
+        key = f"gsheet:{self.sheet_id}:{sheet_name or 'sheet1'}"
+        return os.path.join(self.snapshot_dir, f"sync-{hashlib.sha1(key.encode()).hexdigest()[:16]}.json")
+    
+    def _load_sync_state(self, path: str) -> dict:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def sync_sheet_data(self, sheet_name: str = None, full: bool = False) -> dict:
+        """
+        Bring the local copy of the sheet up to date and return it.
+        
+        Unchanged sheets (same Drive modifiedTime) are not fetched at all.
+        Otherwise only the rows after the last synced one are downloaded,
+        plus the last known row to check that nothing above it moved, so a
+        new form submission costs a read of the new rows only.
+        
+        The whole sheet is fetched and each row's hash compared with the
+        stored one when the header or the last known row changed (rows were
+        inserted or deleted) and when the last whole-sheet read is older
+        than SHEETS_FULL_SYNC_HOURS. Only new or edited rows are parsed
+        again and reported as changed. An edit to an earlier row that moves
+        nothing is only seen at that next whole-sheet read.
+        full=True ignores the stored copy and parses every row.
+        
+        Returns:
+            dict with 'records' (as get_all_records), 'row_hashes',
+            'changed_rows' (record positions that are new or changed),
+            'full_sync' and 'rows_fetched'
+        """
+        try:
+            state_path = self._sync_state_path(sheet_name)
+            state = self._load_sync_state(state_path)
+            sheet = self._worksheet(sheet_name)
+            version = self._sheet_version()
+            now = datetime.now()
+            
+            if not full and state and version and state.get('modified_time') == version['modified_time']:
+                header, values, hashes = state['header'], state['values'], state['hashes']
+                changed, fetched, full_sync, mode = [], 0, False, 'unchanged'
+            else:
+                header = sheet.get('1:1', pad_values=True)
+                header = header[0] if header and header[0] else []
+                width = len(header)
+                
+                full_sync = full or state is None or state['header'] != header
+                full_read_due = (
+                    full_sync
+                    or not state['hashes']
+                    or not state.get('full_read_at')
+                    or now - datetime.fromisoformat(state['full_read_at']) >= timedelta(hours=FULL_SYNC_HOURS)
+                )
+                
+                tail = None
+                if not full_read_due:
+                    # Re-read the last known row together with everything after it
+                    known = len(state['hashes'])
+                    last_col = rowcol_to_a1(1, max(width, 1)).rstrip('0123456789')
+                    tail = [_pad(row, width) for row in sheet.get(f"A{known + 1}:{last_col}", pad_values=True)]
+                    if not tail or row_hash(tail[0]) != state['hashes'][-1]:
+                        tail = None
+                
+                if tail is not None:
+                    new_rows = tail[1:]
+                    hashes = state['hashes'] + [row_hash(row) for row in new_rows]
+                    values = state['values'] + [numericise_all(row) for row in new_rows]
+                    changed = list(range(known, len(hashes)))
+                    fetched = len(tail)
+                    full_read_at = state['full_read_at']
+                    mode = 'appended'
+                else:
+                    entire = sheet.get(pad_values=True)
+                    rows = [_pad(row, width) for row in entire[1:]] if width else []
+                    hashes = [row_hash(row) for row in rows]
+                    
+                    # Parsed values of rows already synced, by content hash
+                    known_values = {} if full_sync else dict(zip(state['hashes'], state['values']))
+                    old_hashes = [] if full_sync else state['hashes']
+                    values = [
+                        known_values[h] if h in known_values else numericise_all(row)
+                        for h, row in zip(hashes, rows)
+                    ]
+                    changed = [
+                        i for i, h in enumerate(hashes)
+                        if i >= len(old_hashes) or old_hashes[i] != h
+                    ]
+                    fetched = len(rows)
+                    full_read_at = now.isoformat()
+                    mode = 'full' if full_sync else 'diffed'
+                
+                # Rows are stored numericised, as get_all_records returns them
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                atomic_write_json(state_path, {
+                    'header': header,
+                    'values': values,
+                    'hashes': hashes,
+                    'modified_time': version['modified_time'] if version else None,
+                    'full_read_at': full_read_at,
+                }, indent=None)
+            
+            records = [dict(zip(header, row)) for row in values]
+            
+            print(f"✅ Synced {len(records)} records from Google Sheets "
+                  f"({mode}, {fetched} rows fetched, {len(changed)} new or changed)")
+            
+            return {
+                'records': records,
+                'row_hashes': hashes,
+                'changed_rows': changed,
+                'full_sync': full_sync,
+                'rows_fetched': fetched,
+            }
+            
+        except Exception as e:
+            print(f"❌ Error syncing Google Sheets: {e}")
+            raise
+    
     def export_to_excel(self, output_file: str = 'student_data.xlsx'):
         """Export Google Sheets data to Excel file."""
         df = self.get_sheet_as_dataframe()
@@ -25,7 +25,8 @@ from datetime import datetime
 from dotenv import load_dotenv
 
 # Import the agentic agent
-from profile_agent_agentic import run_agentic_agent, CONFIG
+from profile_agent_agentic import run_agentic_agent, resume_agentic_agent, CONFIG
+from run_checkpoints import get_run_ledger
 
 load_dotenv()
 
@@ -96,6 +97,61 @@ Key Differences from Old System:
         help='Live mode: Agent actually sends emails (requires confirmation)'
     )
     
+    parser.add_argument(
+        '--pretriage',
+        action='store_true',
+        help='Resolve clear-cut students with local rules and only send ambiguous ones to the agent'
+    )
+    
+    parser.add_argument(
+        '--shard-size',
+        type=int,
+        help='Process students in concurrent sub-conversations of this size'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Concurrency limit for sharded execution (default: AGENT_MAX_WORKERS or 4)'
+    )
+    
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Use the async Claude client so concurrent conversations share one connection pool'
+    )
+    
+    parser.add_argument(
+        '--checkpoint',
+        action='store_true',
+        help='Save agent state after every step so an interrupted run can be resumed'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Skip students whose profile and contact history are unchanged since their last, still-valid decision'
+    )
+    
+    parser.add_argument(
+        '--decision-cache',
+        action='store_true',
+        help='Reuse the agent\'s decision for students in the same situation (completion, missing fields, deadline, contacts)'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        metavar='RUN_ID',
+        help='Continue a checkpointed run, skipping students it already handled'
+    )
+    
+    parser.add_argument(
+        '--metrics-report',
+        metavar='PATH',
+        help='Write per-node/per-tool latency, token usage and cost estimate for the run as JSON'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -178,9 +234,47 @@ def display_comparison():
     print("="*80)
 
 
+def agent_options(args):
+    """Collect agent execution options from the command line."""
+    return {
+        'pretriage': args.pretriage,
+        'shard_size': args.shard_size,
+        'max_workers': args.workers,
+        'use_async': args.use_async,
+        'checkpoint_run': args.checkpoint,
+        'metrics_report': args.metrics_report,
+        'incremental': args.incremental,
+        'decision_cache': args.decision_cache,
+    }
+
+
+def confirm_live_mode() -> bool:
+    """Warn that real emails will be sent and ask the user to type 'yes'."""
+    print("\n⚠️  LIVE MODE - REAL EMAILS WILL BE SENT!")
+    print("="*80)
+    print("The agent will make decisions and ACTUALLY send emails.")
+    print("This will affect real students!")
+    print("="*80)
+    
+    response = input("\nAre you sure you want to continue? (type 'yes' to proceed): ")
+    if response.lower() != 'yes':
+        print("❌ Cancelled by user")
+        return False
+    return True
+
+
 def run_with_mode(args):
     """Run the agent with specified mode."""
     
+    if args.resume:
+        # The run keeps the mode and options it was started with, so a
+        # resumed live run needs the same confirmation as a new one
+        run = get_run_ledger(CONFIG['checkpoint_db']).get_run(args.resume)
+        if run is not None and not run['options'].get('dry_run', True):
+            if not confirm_live_mode():
+                return None
+        return resume_agentic_agent(args.resume, args.metrics_report)
+    
     if args.preview:
         print("\n👁️  PREVIEW MODE")
         print("="*80)
@@ -190,7 +284,7 @@ def run_with_mode(args):
         # In preview mode, we'd need to modify the agent to not execute tools
         # For now, we'll use dry-run
         print("\n⚠️  Preview mode implementation pending. Using dry-run instead.")
-        return run_agentic_agent(args.file, dry_run=True)
+        return run_agentic_agent(args.file, dry_run=True, **agent_options(args))
     
     elif args.dry_run:
         print("\n🔄 DRY RUN MODE")
@@ -199,27 +293,19 @@ def run_with_mode(args):
         print("but emails will be SIMULATED (not actually sent).")
         print("="*80)
         input("\nPress ENTER to start agent... ")
-        return run_agentic_agent(args.file, dry_run=True)
+        return run_agentic_agent(args.file, dry_run=True, **agent_options(args))
     
     elif args.send:
-        print("\n⚠️  LIVE MODE - REAL EMAILS WILL BE SENT!")
-        print("="*80)
-        print("The agent will make decisions and ACTUALLY send emails.")
-        print("This will affect real students!")
-        print("="*80)
-        
-        response = input("\nAre you sure you want to continue? (type 'yes' to proceed): ")
-        if response.lower() != 'yes':
-            print("❌ Cancelled by user")
+        if not confirm_live_mode():
             return None
         
-        return run_agentic_agent(args.file, dry_run=False)
+        return run_agentic_agent(args.file, dry_run=False, **agent_options(args))
     
     else:
         # Default to dry-run
         print("\n🔄 No mode specified, using DRY RUN MODE")
         print("   Use --preview, --dry-run, or --send to specify mode")
-        return run_agentic_agent(args.file, dry_run=True)
+        return run_agentic_agent(args.file, dry_run=True, **agent_options(args))
 
 
 def display_results_summary(final_state):
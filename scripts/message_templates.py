@@ -0,0 +1,224 @@
+"""
+Message Templates
+-----------------
+Precompiled email templates for draft_message_impl.
+
+Every tone x urgency combination is compiled once: the greeting and
+urgency paragraph are spliced into the body, and the values that are the
+same for every student (deadline, form URL, support address, institute)
+are folded in. What is left is a %-format string with only the per-student
+fields, so rendering a message is a single % operation on a dict.
+
+Templates use $name placeholders (string.Template syntax, $$ for a literal
+dollar sign):
+
+    per student     $student_name  $completion_pct  $missing_list
+                    $missing_count  $reasoning
+    per run         $deadline  $form_url  $support_email  $institute_name
+    per tone        $greeting        (GREETINGS, may use $student_name)
+    per urgency     $urgency_text    (URGENCY_MESSAGES, may use $completion_pct, $deadline)
+                    $subject_prefix  (SUBJECT_PREFIXES)
+
+Templates can be overridden from a directory (MESSAGE_TEMPLATES_DIR):
+
+    <tone>_<urgency>.txt    one combination, e.g. urgent_high.txt
+    <tone>.txt              every urgency of a tone
+    default.txt             every combination
+
+The first line of a file may be "Subject: ..." to override the subject too.
+Unknown placeholders are rejected when the templates are loaded.
+"""
+
+import os
+import re
+
+
+# Field display names
+FIELD_NAMES = {
+    'student_name': 'Student Name',
+    'roll_number': 'Roll Number',
+    'institute_name': 'Institute Name',
+    'enrolled_program': 'Enrolled Program',
+    'stream': 'Stream',
+    'date_of_birth': 'Date of Birth',
+    'gender': 'Gender',
+    'email': 'Email Address',
+    'previous_education': 'Previous Education Qualification',
+    'primary_language': 'Primary Language',
+    'nationality': 'Nationality'
+}
+
+# Tone variations
+GREETINGS = {
+    'friendly': "Dear $student_name,\n\nI hope this message finds you well!",
+    'professional': "Dear $student_name,",
+    'urgent': "Dear $student_name,\n\nThis is an important reminder.",
+    'gentle': "Hello $student_name,\n\nHope you're doing great!"
+}
+
+URGENCY_MESSAGES = {
+    'high': "Your profile is currently at $completion_pct% completion with only $deadline as the deadline. Immediate action is required.",
+    'medium': "Your profile is $completion_pct% complete. We kindly request you to update the remaining information soon.",
+    'low': "We noticed your profile is $completion_pct% complete. When you have a moment, please consider completing the remaining fields."
+}
+
+SUBJECT_PREFIXES = {
+    'high': '🔴 URGENT',
+    'medium': '⚠️ Action Required',
+    'low': '📋 Reminder'
+}
+
+DEFAULT_TONE = 'professional'
+DEFAULT_URGENCY = 'medium'
+
+# Subject prefix for urgencies without a template
+FALLBACK_SUBJECT_PREFIX = 'Action Required'
+
+DEFAULT_SUBJECT = "$subject_prefix: Complete Your Profile - $missing_count Fields Missing"
+
+DEFAULT_BODY = """$greeting
+
+$urgency_text
+
+To ensure you have seamless access to all university services and resources, please update the following information:
+
+$missing_list
+
+You can complete your profile here:
+$form_url
+
+If you encounter any issues or have questions, please don't hesitate to contact our support team at $support_email.
+
+Best regards,
+$institute_name Administration
+
+---
+Agent's Reasoning: $reasoning"""
+
+STUDENT_FIELDS = ('student_name', 'completion_pct', 'missing_list', 'missing_count', 'reasoning')
+RUN_FIELDS = ('deadline', 'form_url', 'support_email', 'institute_name')
+
+_PLACEHOLDER = re.compile(r'\$(?:(\$)|(\w+)|\{(\w+)\})')
+
+
+def compile_template(text: str, static: dict) -> str:
+    """
+    Turn a $placeholder template into a %-format string: static values
+    are inlined, per-student fields become %(field)s.
+    """
+    parts = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(text):
+        parts.append(text[position:match.start()].replace('%', '%%'))
+        position = match.end()
+        if match.group(1):
+            parts.append('$')
+            continue
+        name = match.group(2) or match.group(3)
+        if name in static:
+            parts.append(str(static[name]).replace('%', '%%'))
+        elif name in STUDENT_FIELDS:
+            parts.append(f"%({name})s")
+        else:
+            raise ValueError(f"Unknown template placeholder: ${name}")
+    parts.append(text[position:].replace('%', '%%'))
+    return ''.join(parts)
+
+
+def _expand(text: str, snippets: dict) -> str:
+    """Splice $greeting / $urgency_text / $subject_prefix template text into `text`."""
+    def replace(match):
+        name = match.group(2) or match.group(3)
+        return snippets.get(name, match.group(0))
+    return _PLACEHOLDER.sub(replace, text)
+
+
+def load_template_files(directory: str) -> dict:
+    """Template files of a directory, as {file stem: (subject or None, body)}."""
+    templates = {}
+    if not directory or not os.path.isdir(directory):
+        return templates
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        if extension != '.txt':
+            continue
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            text = f.read()
+        subject = None
+        if text.startswith('Subject:'):
+            first_line, _, text = text.partition('\n')
+            subject = first_line[len('Subject:'):].strip()
+        templates[stem] = (subject, text.strip('\n'))
+    return templates
+
+
+class MessageTemplates:
+    """All tone x urgency combinations, compiled for one set of run values."""
+
+    def __init__(self, static: dict, templates_dir: str = None):
+        missing = [name for name in RUN_FIELDS if name not in static]
+        if missing:
+            raise ValueError(f"Missing template values: {', '.join(missing)}")
+        self.static = dict(static)
+        self.templates_dir = templates_dir
+        overrides = load_template_files(templates_dir)
+
+        self._compiled = {}
+        for tone, greeting in GREETINGS.items():
+            for urgency in list(URGENCY_MESSAGES) + [None]:
+                subject, body = (
+                    overrides.get(f"{tone}_{urgency}") or overrides.get(tone)
+                    or overrides.get('default') or (None, DEFAULT_BODY)
+                )
+                snippets = {
+                    'greeting': greeting,
+                    'urgency_text': URGENCY_MESSAGES[urgency or DEFAULT_URGENCY],
+                    'subject_prefix': SUBJECT_PREFIXES[urgency] if urgency else FALLBACK_SUBJECT_PREFIX,
+                }
+                self._compiled[(tone, urgency)] = (
+                    compile_template(_expand(subject or DEFAULT_SUBJECT, snippets), self.static),
+                    compile_template(_expand(body, snippets), self.static),
+                )
+        self._missing_lists = {}
+
+    def _lookup(self, tone: str, urgency: str) -> tuple:
+        tone = tone.lower()
+        urgency = urgency.lower()
+        return self._compiled[(
+            tone if tone in GREETINGS else DEFAULT_TONE,
+            urgency if urgency in URGENCY_MESSAGES else None,
+        )]
+
+    def missing_list(self, missing_fields: list) -> str:
+        """Bulleted display names; memoized, as many students share the same set."""
+        key = tuple(missing_fields)
+        text = self._missing_lists.get(key)
+        if text is None:
+            text = '\n'.join(f"  • {FIELD_NAMES.get(f, f)}" for f in missing_fields)
+            self._missing_lists[key] = text
+        return text
+
+    def render(self, student_name: str, student_data: dict, tone: str, urgency: str, reasoning: str) -> tuple:
+        """(subject, body) of one message."""
+        subject, body = self._lookup(tone, urgency)
+        missing_fields = student_data.get('missing_fields', [])
+        values = {
+            'student_name': student_name,
+            'completion_pct': student_data.get('completion_percentage', 0),
+            'missing_list': self.missing_list(missing_fields),
+            'missing_count': len(missing_fields),
+            'reasoning': reasoning,
+        }
+        return subject % values, body % values
+
+
+_templates = None
+
+
+def get_message_templates(static: dict, templates_dir: str = None) -> MessageTemplates:
+    """Templates compiled for these run values; recompiled only when they change."""
+    global _templates
+    templates = _templates
+    if templates is None or templates.static != static or templates.templates_dir != templates_dir:
+        templates = _templates = MessageTemplates(static, templates_dir)
+    return templates
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Mock Anthropic Server
+---------------------
+Local stand-in for the Messages API that returns canned tool_use responses
+after an injected delay. Used to measure the sync vs async agent paths
+offline, without an API key or network access.
+
+Usage:
+    python mock_anthropic_server.py --serve --port 8765 --latency 0.5
+    python mock_anthropic_server.py --students 20 --latency 0.2 --workers 10
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockAnthropicHandler(BaseHTTPRequestHandler):
+    """
+    Answers POST /v1/messages with a two-step script per conversation:
+    first a check_communication_history tool_use, then a final text turn.
+    """
+
+    latency = 0.2
+    # Keep-alive, so pooled clients can reuse their connections
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        messages = request.get('messages', [])
+
+        time.sleep(self.latency)
+
+        if len(messages) <= 1:
+            # First turn: pick the first student mentioned in the task
+            task = messages[0]['content'] if messages else ''
+            match = re.search(r'student_\d+', task if isinstance(task, str) else json.dumps(task))
+            content = [
+                {"type": "text", "text": "Checking this student's history first."},
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{len(messages)}_{threading.get_ident()}",
+                    "name": "check_communication_history",
+                    "input": {"student_id": match.group(0) if match else "student_0"}
+                }
+            ]
+            stop_reason = "tool_use"
+        else:
+            content = [{"type": "text", "text": "Student processed. Summary: no action needed."}]
+            stop_reason = "end_turn"
+
+        body = json.dumps({
+            "id": "msg_mock",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get('model', 'mock'),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": 100, "output_tokens": 20}
+        }).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+
+class MockAnthropicServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops connects under concurrent load
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def start_mock_server(port: int = 0, latency: float = 0.2) -> ThreadingHTTPServer:
+    """Start the mock server on a background thread and return it."""
+    handler = type('ConfiguredHandler', (MockAnthropicHandler,), {'latency': latency})
+    server = MockAnthropicServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_students(count: int) -> list:
+    """Synthetic incomplete-profile records in read_student_data_impl's shape."""
+    return [
+        {
+            'student_id': f"student_{i}",
+            'student_name': f"Student {i}",
+            'roll_number': f"R{i:05d}",
+            'email': f"student{i}@example.edu",
+            'missing_fields': ['gender', 'nationality'],
+            'completion_percentage': 81.8,
+            'total_fields': 11,
+            'row_index': i
+        }
+        for i in range(count)
+    ]
+
+
+def run_benchmark(students: int = 20, latency: float = 0.2, workers: int = 10):
+    """Compare sequential sync shards with concurrent async shards against the mock."""
+    server = start_mock_server(latency=latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ['ANTHROPIC_BASE_URL'] = base_url
+    os.environ.setdefault('ANTHROPIC_API_KEY', 'mock-key')
+
+    import profile_agent_agentic as agent
+    from anthropic import Anthropic
+
+    agent.client = Anthropic(api_key='mock-key', base_url=base_url)
+    roster = make_students(students)
+
+    print(f"🧪 Mock server at {base_url} ({latency}s latency per call)")
+    print(f"   {students} students, 1 student per shard, 2 calls per shard\n")
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        start = time.perf_counter()
+        sync_states = agent.run_sharded_workflow('mock.xlsx', roster, True, 1, 1)
+        sync_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async_states = asyncio.run(
+            agent.run_sharded_workflow_async('mock.xlsx', roster, True, 1, workers)
+        )
+        async_time = time.perf_counter() - start
+
+    server.shutdown()
+
+    failures = sum(len(s['error_log']) for s in sync_states + list(async_states))
+    print(f"   Sync, sequential:          {sync_time:6.2f}s")
+    print(f"   Async, {workers:>3} concurrent:     {async_time:6.2f}s")
+    print(f"   Speedup:                   {sync_time / async_time:6.1f}x")
+    print(f"   Shard errors:              {failures}")
+
+    return {'sync_seconds': sync_time, 'async_seconds': async_time, 'errors': failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Anthropic Messages API for offline testing')
+    parser.add_argument('--serve', action='store_true', help='Only run the server until interrupted')
+    parser.add_argument('--port', type=int, default=8765, help='Port for --serve')
+    parser.add_argument('--latency', type=float, default=0.2, help='Injected delay per call (seconds)')
+    parser.add_argument('--students', type=int, default=20, help='Students in the benchmark roster')
+    parser.add_argument('--workers', type=int, default=10, help='Concurrent async conversations')
+    args = parser.parse_args()
+
+    if args.serve:
+        server = start_mock_server(args.port, args.latency)
+        print(f"🧪 Mock Anthropic server on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    result = run_benchmark(args.students, args.latency, args.workers)
+    sys.exit(1 if result['errors'] else 0)
+
+
+if __name__ == "__main__":
+    main()
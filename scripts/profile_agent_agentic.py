@@ -25,19 +25,37 @@ Date: November 2025
 
 import os
 import json
-import pandas as pd
+import time
+import atexit
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import TypedDict, List, Dict, Annotated, Literal
-from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode
-from anthropic import Anthropic
+from typing import TYPE_CHECKING, TypedDict, List, Dict, Annotated, Literal, Iterable
 from dotenv import load_dotenv
 
+import agent_events
+import run_metrics
+from run_cache import atomic_write_json, cached_io, checkpoint, run_cache_scope
+from message_templates import get_message_templates
+from decision_cache import decision_key, get_decision_cache
+from student_fingerprints import get_fingerprint_store, student_fingerprint
+from run_checkpoints import (get_checkpointer, get_run_ledger, new_run_id, open_async_checkpointer,
+                             pending_threads, thread_key)
+
+# pandas (via roster_stream), numpy, langgraph, anthropic and smtplib are imported
+# where they are first needed, so the CLI starts without loading them
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
+
 
 load_dotenv()
 
-# Initialize Claude
-client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+# Claude client, created on first use (see get_client)
+client = None
+
+# SMTP mailer, created on the first live send (see get_mailer)
+mailer = None
 
 # Configuration
 CONFIG = {
@@ -46,6 +64,22 @@ CONFIG = {
     "form_url": os.getenv('GOOGLE_FORM_URL', 'https://forms.google.com/your-form'),
     "institute_name": "IIIT Dharwad / IIIT Raichur",
     "support_email": os.getenv('SUPPORT_EMAIL', 'support@iiitdwd.ac.in'),
+    "max_workers": int(os.getenv('AGENT_MAX_WORKERS', '4')),
+    "http_max_connections": int(os.getenv('AGENT_HTTP_MAX_CONNECTIONS', '20')),
+    "prompt_caching": os.getenv('AGENT_PROMPT_CACHING', 'true').lower() != 'false',
+    "compact_history": os.getenv('AGENT_COMPACT_HISTORY', 'true').lower() != 'false',
+    "tracking_db": os.getenv('TRACKING_DB_PATH', 'email_tracking.db'),
+    "schedule_file": os.getenv('SCHEDULE_FILE_PATH', 'scheduled_contacts.json'),
+    "cache_flush_every": int(os.getenv('AGENT_CACHE_FLUSH_EVERY', '50')),
+    "tool_workers": int(os.getenv('AGENT_TOOL_WORKERS', '8')),
+    "tool_log": os.getenv('AGENT_TOOL_LOG', 'compact'),  # full | compact | off
+    "checkpoint_db": os.getenv('AGENT_CHECKPOINT_DB', 'agent_checkpoints.db'),
+    "metrics_report": os.getenv('AGENT_METRICS_REPORT'),  # JSON path for the per-run metrics report
+    "incremental_valid_days": int(os.getenv('AGENT_INCREMENTAL_VALID_DAYS', '7')),
+    "decision_cache_ttl_hours": float(os.getenv('AGENT_DECISION_CACHE_TTL_HOURS', '24')),
+    "decision_cache_size": int(os.getenv('AGENT_DECISION_CACHE_SIZE', '1000')),
+    "decision_cache_bucket": int(os.getenv('AGENT_DECISION_CACHE_BUCKET', '10')),  # completion % per bucket
+    "message_templates_dir": os.getenv('MESSAGE_TEMPLATES_DIR'),  # optional template overrides
 }
 
 
@@ -63,6 +97,9 @@ class AgenticState(TypedDict):
     agent_reasoning: List[str]  # Agent's explanations
     should_continue: bool  # Whether to process more students
     error_log: List[str]  # Any errors encountered
+    pretriage_summary: dict  # Students resolved by rules before the agent ran
+    token_usage: List[dict]  # Token and cache statistics per Claude call
+    run_id: str  # Checkpointed run this conversation belongs to ('' if none)
 
 
 # ============================================================================
@@ -71,72 +108,23 @@ class AgenticState(TypedDict):
 
 def read_student_data_impl(file_path: str) -> dict:
     """
-    Read student data from Excel file.
+    Read student data from an Excel, CSV or Parquet file, or from an
+    in-memory roster registered under that name (e.g. Google Sheets data).
     Returns student records and metadata.
     """
+    from roster_stream import RosterStream
+    
     try:
-        df = pd.read_excel(file_path, engine='openpyxl')
-        
-        # Column mapping
-        column_map = {
-            'Student Name': 'student_name',
-            'Roll Number': 'roll_number',
-            'Institute Name': 'institute_name',
-            'Enrolled program': 'enrolled_program',
-            'Stream': 'stream',
-            'Date of birth': 'date_of_birth',
-            'Gender': 'gender',
-            'email address': 'email',
-            'Email': 'email',
-            'previous education qualification': 'previous_education',
-            'primary language': 'primary_language',
-            'Nationality': 'nationality',
-        }
-        
-        df = df.rename(columns=column_map)
-        
-        # Define mandatory fields
-        mandatory_fields = [
-            'student_name', 'roll_number', 'institute_name', 
-            'enrolled_program', 'stream', 'date_of_birth',
-            'gender', 'email', 'previous_education', 
-            'primary_language', 'nationality'
-        ]
-        
-        students = []
-        for idx, row in df.iterrows():
-            # Calculate missing fields
-            missing = []
-            for field in mandatory_fields:
-                value = row.get(field)
-                if pd.isna(value) or value is None or (isinstance(value, str) and value.strip() == ''):
-                    missing.append(field)
-            
-            # Only include students with missing fields
-            if missing:
-                completion_pct = round((len(mandatory_fields) - len(missing)) / len(mandatory_fields) * 100, 1)
-                
-                student = {
-                    'student_id': f"student_{idx}",
-                    'student_name': row.get('student_name', 'Unknown'),
-                    'roll_number': row.get('roll_number', 'N/A'),
-                    'email': row.get('email', ''),
-                    'institute_name': row.get('institute_name', ''),
-                    'enrolled_program': row.get('enrolled_program', ''),
-                    'stream': row.get('stream', ''),
-                    'missing_fields': missing,
-                    'completion_percentage': completion_pct,
-                    'total_fields': len(mandatory_fields),
-                    'row_index': idx
-                }
-                students.append(student)
+        # Parsed in chunks; only incomplete profiles are kept
+        roster = RosterStream(file_path)
+        students = list(roster)
         
         return {
             'success': True,
-            'total_students': len(df),
+            'total_students': roster.total_rows,
             'incomplete_profiles': len(students),
             'students': students,
-            'message': f"Found {len(students)} students with incomplete profiles out of {len(df)} total"
+            'message': f"Found {len(students)} students with incomplete profiles out of {roster.total_rows} total"
         }
         
     except Exception as e:
@@ -147,42 +135,40 @@ def read_student_data_impl(file_path: str) -> dict:
         }
 
 
+def summarize_history(history: List[dict], now: datetime = None) -> dict:
+    """Turn a student's raw communication log into the history tool result."""
+    if not history:
+        return {
+            'contacted_before': False,
+            'last_contact': None,
+            'contact_count': 0,
+            'message': 'No previous communications found'
+        }
+    
+    last_contact = max(history, key=lambda x: x['timestamp'])
+    last_time = datetime.fromisoformat(last_contact['timestamp'])
+    hours_since = ((now or datetime.now()) - last_time).total_seconds() / 3600
+    
+    return {
+        'contacted_before': True,
+        'last_contact': last_contact['timestamp'],
+        'hours_since_last_contact': round(hours_since, 1),
+        'contact_count': len(history),
+        'recent_subjects': [h['subject'] for h in history[-3:]],
+        'message': f"Contacted {len(history)} times, last {round(hours_since, 1)} hours ago"
+    }
+
+
 def check_communication_history_impl(student_id: str) -> dict:
     """
     Check past communications with a student.
     Returns history of when and what was sent.
     """
-    tracking_file = 'email_tracking.json'
-    
     try:
-        if os.path.exists(tracking_file):
-            with open(tracking_file, 'r') as f:
-                tracking_data = json.load(f)
-        else:
-            tracking_data = {}
+        with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+            history = cache.history(student_id)
         
-        history = tracking_data.get(student_id, [])
-        
-        if not history:
-            return {
-                'contacted_before': False,
-                'last_contact': None,
-                'contact_count': 0,
-                'message': 'No previous communications found'
-            }
-        
-        last_contact = max(history, key=lambda x: x['timestamp'])
-        last_time = datetime.fromisoformat(last_contact['timestamp'])
-        hours_since = (datetime.now() - last_time).total_seconds() / 3600
-        
-        return {
-            'contacted_before': True,
-            'last_contact': last_contact['timestamp'],
-            'hours_since_last_contact': round(hours_since, 1),
-            'contact_count': len(history),
-            'recent_subjects': [h['subject'] for h in history[-3:]],
-            'message': f"Contacted {len(history)} times, last {round(hours_since, 1)} hours ago"
-        }
+        return summarize_history(history)
         
     except Exception as e:
         return {
@@ -191,7 +177,16 @@ def check_communication_history_impl(student_id: str) -> dict:
         }
 
 
-def analyze_profile_status_impl(student_data: dict) -> dict:
+def days_to_deadline() -> int:
+    """Whole days left until the profile completion deadline."""
+    try:
+        deadline = datetime.strptime(CONFIG['deadline'], '%Y-%m-%d')
+        return (deadline - datetime.now()).days
+    except:
+        return 30
+
+
+def analyze_profile_status_impl(student_data: dict, days_remaining: int = None) -> dict:
     """
     Deep analysis of a student's profile completion status.
     Provides context for agent decision-making.
@@ -201,11 +196,8 @@ def analyze_profile_status_impl(student_data: dict) -> dict:
         missing_count = len(student_data.get('missing_fields', []))
         
         # Calculate days to deadline
-        try:
-            deadline = datetime.strptime(CONFIG['deadline'], '%Y-%m-%d')
-            days_remaining = (deadline - datetime.now()).days
-        except:
-            days_remaining = 30
+        if days_remaining is None:
+            days_remaining = days_to_deadline()
         
         # Critical missing fields (most important)
         critical_fields = ['email', 'roll_number', 'student_name']
@@ -230,84 +222,159 @@ def analyze_profile_status_impl(student_data: dict) -> dict:
         return {'error': str(e)}
 
 
+def message_templates():
+    """Email templates compiled for the current CONFIG (see message_templates.py)."""
+    return get_message_templates(
+        {
+            'deadline': CONFIG['deadline'],
+            'form_url': CONFIG['form_url'],
+            'support_email': CONFIG['support_email'],
+            'institute_name': CONFIG['institute_name'],
+        },
+        CONFIG['message_templates_dir']
+    )
+
+
 def draft_message_impl(student_name: str, student_data: dict, tone: str, urgency: str, reasoning: str) -> dict:
     """
     Draft a personalized message based on agent's strategic decision.
     The agent has already decided tone and urgency - we just format it nicely.
     """
     try:
-        missing_fields = student_data.get('missing_fields', [])
-        completion_pct = student_data.get('completion_percentage', 0)
+        subject, message_body = message_templates().render(student_name, student_data, tone, urgency, reasoning)
         
-        # Field display names
-        field_names = {
-            'student_name': 'Student Name',
-            'roll_number': 'Roll Number',
-            'institute_name': 'Institute Name',
-            'enrolled_program': 'Enrolled Program',
-            'stream': 'Stream',
-            'date_of_birth': 'Date of Birth',
-            'gender': 'Gender',
-            'email': 'Email Address',
-            'previous_education': 'Previous Education Qualification',
-            'primary_language': 'Primary Language',
-            'nationality': 'Nationality'
-        }
-        
-        missing_display = [field_names.get(f, f) for f in missing_fields]
-        missing_list = '\n'.join([f"  • {field}" for field in missing_display])
-        
-        # Tone variations
-        greeting_map = {
-            'friendly': f"Dear {student_name},\n\nI hope this message finds you well!",
-            'professional': f"Dear {student_name},",
-            'urgent': f"Dear {student_name},\n\nThis is an important reminder.",
-            'gentle': f"Hello {student_name},\n\nHope you're doing great!"
+        return {
+            'success': True,
+            'subject': subject,
+            'message_body': message_body,
+            'tone_used': tone,
+            'urgency_used': urgency,
+            'character_count': len(message_body)
         }
         
-        urgency_message = {
-            'high': f"Your profile is currently at {completion_pct}% completion with only {CONFIG['deadline']} as the deadline. Immediate action is required.",
-            'medium': f"Your profile is {completion_pct}% complete. We kindly request you to update the remaining information soon.",
-            'low': f"We noticed your profile is {completion_pct}% complete. When you have a moment, please consider completing the remaining fields."
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
         }
-        
-        greeting = greeting_map.get(tone.lower(), greeting_map['professional'])
-        urgency_text = urgency_message.get(urgency.lower(), urgency_message['medium'])
-        
-        message_body = f"""{greeting}
 
-{urgency_text}
 
-To ensure you have seamless access to all university services and resources, please update the following information:
+_mailer_lock = threading.Lock()
+_mailer_configured = False
 
-{missing_list}
 
-You can complete your profile here:
-{CONFIG['form_url']}
+def get_mailer():
+    """
+    The shared SMTP mailer (or `mailer` if already set), configured once
+    from SMTP_* / GMAIL_* variables. None if no SMTP server is configured.
+    """
+    global mailer, _mailer_configured
+    
+    if mailer is None and not _mailer_configured:
+        with _mailer_lock:
+            if not _mailer_configured:
+                from email_delivery import mailer_from_env
+                mailer = mailer_from_env()
+                if mailer is not None:
+                    atexit.register(mailer.close)
+                _mailer_configured = True
+    return mailer
 
-If you encounter any issues or have questions, please don't hesitate to contact our support team at {CONFIG['support_email']}.
 
-Best regards,
-{CONFIG['institute_name']} Administration
+def send_email_impl(student_email: str, subject: str, message_body: str, student_id: str, dry_run: bool = True) -> dict:
+    """
+    Send email to student or simulate sending in dry-run mode.
+    Live sends go through the pooled SMTP mailer; without an SMTP server
+    configured they are simulated.
+    """
+    return _finish_email(_start_email(student_email, subject, message_body, student_id, dry_run))
 
----
-Agent's Reasoning: {reasoning}"""
-        
-        subject_urgency = {
-            'high': '🔴 URGENT',
-            'medium': '⚠️ Action Required',
-            'low': '📋 Reminder'
+
+def send_emails_impl(emails: List[dict]) -> List[dict]:
+    """
+    Send several emails (send_email inputs) at once: every live delivery is
+    queued on the mailer before any is waited for, so the mailer's workers
+    deliver them concurrently. Results and tracking writes keep input order.
+    """
+    started = []
+    for email in emails:
+        try:
+            started.append(_start_email(email['student_email'], email['subject'], email['message_body'],
+                                        email['student_id'], email.get('dry_run', True)))
+        except Exception as e:
+            started.append({'error': f"Tool execution failed: {str(e)}"})
+    return [_finish_email(send) for send in started]
+
+
+def _start_email(student_email: str, subject: str, message_body: str, student_id: str, dry_run: bool) -> dict:
+    """
+    Validate a send and queue its live delivery without waiting for it.
+    Returns the final result, or a pending send (with 'delivery') for _finish_email.
+    """
+    if not student_email:
+        return {
+            'success': False,
+            'error': 'No email address provided'
+        }
+    
+    if dry_run:
+        return {
+            'success': True,
+            'sent': False,
+            'dry_run': True,
+            'message': f'[DRY RUN] Would send email to {student_email}',
+            'subject': subject
+        }
+    
+    try:
+        smtp = get_mailer()
+        delivery = smtp.submit({
+            'student_id': student_id,
+            'recipient': student_email,
+            'subject': subject,
+            'body': message_body
+        }) if smtp is not None else None
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
         }
+    
+    return {'delivery': delivery, 'student_email': student_email, 'subject': subject, 'student_id': student_id}
+
+
+def _finish_email(send: dict) -> dict:
+    """Wait for a pending send's delivery and log it; other results pass through."""
+    if 'delivery' not in send:
+        return send
+    
+    student_email = send['student_email']
+    try:
+        if send['delivery'] is not None:
+            delivery = send['delivery'].result()
+            if not delivery['delivered']:
+                return {
+                    'success': False,
+                    'sent': False,
+                    'error': f"Delivery to {student_email} failed after {delivery['attempts']} attempts: {delivery['error']}"
+                }
         
-        subject = f"{subject_urgency.get(urgency.lower(), 'Action Required')}: Complete Your Profile - {len(missing_fields)} Fields Missing"
+        # Log the communication (batched with the run's other tracking writes)
+        with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+            cache.record_communication(send['student_id'], {
+                'timestamp': datetime.now().isoformat(),
+                'subject': send['subject'],
+                'status': 'sent',
+                'recipient': student_email
+            })
         
         return {
             'success': True,
-            'subject': subject,
-            'message_body': message_body,
-            'tone_used': tone,
-            'urgency_used': urgency,
-            'character_count': len(message_body)
+            'sent': True,
+            'dry_run': False,
+            'message': (f'Email sent successfully to {student_email}' if send['delivery'] is not None
+                        else f'Email to {student_email} simulated (no SMTP server configured)'),
+            'timestamp': datetime.now().isoformat()
         }
         
     except Exception as e:
@@ -317,9 +384,33 @@ Agent's Reasoning: {reasoning}"""
         }
 
 
+_mailer_lock = threading.Lock()
+_mailer_configured = False
+
+
+def get_mailer():
+    """
+    The shared SMTP mailer (or `mailer` if already set), configured once
+    from SMTP_* / GMAIL_* variables. None if no SMTP server is configured.
+    """
+    global mailer, _mailer_configured
+    
+    if mailer is None and not _mailer_configured:
+        with _mailer_lock:
+            if not _mailer_configured:
+                from email_delivery import mailer_from_env
+                mailer = mailer_from_env()
+                if mailer is not None:
+                    atexit.register(mailer.close)
+                _mailer_configured = True
+    return mailer
+
+
 def send_email_impl(student_email: str, subject: str, message_body: str, student_id: str, dry_run: bool = True) -> dict:
     """
     Send email to student or simulate sending in dry-run mode.
+    Live sends go through the pooled SMTP mailer; without an SMTP server
+    configured they are simulated.
     """
     if not student_email:
         return {
@@ -336,36 +427,37 @@ def send_email_impl(student_email: str, subject: str, message_body: str, student
             'subject': subject
         }
     
-    # In production, this would actually send via SendGrid or Gmail
-    # For now, we'll simulate success
     try:
-        # Log the communication
-        tracking_file = 'email_tracking.json'
-        
-        if os.path.exists(tracking_file):
-            with open(tracking_file, 'r') as f:
-                tracking_data = json.load(f)
-        else:
-            tracking_data = {}
-        
-        if student_id not in tracking_data:
-            tracking_data[student_id] = []
-        
-        tracking_data[student_id].append({
-            'timestamp': datetime.now().isoformat(),
-            'subject': subject,
-            'status': 'sent',
-            'recipient': student_email
-        })
+        smtp = get_mailer()
+        if smtp is not None:
+            delivery = smtp.send({
+                'student_id': student_id,
+                'recipient': student_email,
+                'subject': subject,
+                'body': message_body
+            })
+            if not delivery['delivered']:
+                return {
+                    'success': False,
+                    'sent': False,
+                    'error': f"Delivery to {student_email} failed after {delivery['attempts']} attempts: {delivery['error']}"
+                }
         
-        with open(tracking_file, 'w') as f:
-            json.dump(tracking_data, f, indent=2)
+        # Log the communication (batched with the run's other tracking writes)
+        with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+            cache.record_communication(student_id, {
+                'timestamp': datetime.now().isoformat(),
+                'subject': subject,
+                'status': 'sent',
+                'recipient': student_email
+            })
         
         return {
             'success': True,
             'sent': True,
             'dry_run': False,
-            'message': f'Email sent successfully to {student_email}',
+            'message': (f'Email sent successfully to {student_email}' if smtp is not None
+                        else f'Email to {student_email} simulated (no SMTP server configured)'),
             'timestamp': datetime.now().isoformat()
         }
         
@@ -376,30 +468,31 @@ def send_email_impl(student_email: str, subject: str, message_body: str, student
         }
 
 
-def schedule_for_later_impl(student_id: str, days_to_wait: int, reason: str) -> dict:
+def schedule_for_later_impl(student_id: str, days_to_wait: int, reason: str, dry_run: bool = True) -> dict:
     """
     Schedule a student to be contacted later.
+    In dry-run mode the contact date is worked out but not stored, so a
+    preview never moves an existing scheduled contact.
     """
     try:
-        schedule_file = 'scheduled_contacts.json'
-        
-        if os.path.exists(schedule_file):
-            with open(schedule_file, 'r') as f:
-                scheduled = json.load(f)
-        else:
-            scheduled = []
-        
         contact_date = datetime.now() + timedelta(days=days_to_wait)
         
-        scheduled.append({
-            'student_id': student_id,
-            'scheduled_for': contact_date.isoformat(),
-            'reason': reason,
-            'created_at': datetime.now().isoformat()
-        })
+        if dry_run:
+            return {
+                'success': True,
+                'dry_run': True,
+                'scheduled_for': contact_date.strftime('%Y-%m-%d'),
+                'days_to_wait': days_to_wait,
+                'message': f'[DRY RUN] Would schedule contact for {days_to_wait} days from now'
+            }
         
-        with open(schedule_file, 'w') as f:
-            json.dump(scheduled, f, indent=2)
+        with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+            cache.add_scheduled({
+                'student_id': student_id,
+                'scheduled_for': contact_date.isoformat(),
+                'reason': reason,
+                'created_at': datetime.now().isoformat()
+            })
         
         return {
             'success': True,
@@ -415,6 +508,125 @@ def schedule_for_later_impl(student_id: str, days_to_wait: int, reason: str) ->
         }
 
 
+# ============================================================================
+# BULK TOOL IMPLEMENTATIONS
+# ============================================================================
+
+def analyze_profiles_bulk_impl(students: List[dict]) -> dict:
+    """
+    Analyze many students in one call.
+    The deadline is evaluated once, each derived field is computed as a
+    column, and the columns are zipped into per-student dicts in one pass.
+    """
+    try:
+        days_remaining = days_to_deadline()
+        deadline_status = 'critical' if days_remaining < 7 else 'urgent' if days_remaining < 14 else 'normal'
+        
+        import numpy as np
+        
+        critical_fields = {'email', 'roll_number', 'student_name'}
+        missing = [s.get('missing_fields', []) for s in students]
+        completion_pct = [s.get('completion_percentage', 0) for s in students]
+        completion = np.array([pct or 0 for pct in completion_pct], dtype=float)
+        completion_status = np.select(
+            [completion < 40, completion < 70],
+            ['critical', 'needs_attention'],
+            default='almost_complete'
+        ).tolist()
+        critical_missing = [[f for f in m if f in critical_fields] for m in missing]
+        has_email = [bool(s.get('email')) for s in students]
+        
+        results = [
+            {
+                'student_id': student.get('student_id'),
+                'completion_percentage': pct,
+                'missing_fields_count': len(fields),
+                'missing_fields': fields,
+                'critical_missing': critical,
+                'days_to_deadline': days_remaining,
+                'deadline_status': deadline_status,
+                'completion_status': status,
+                'has_email': email,
+            }
+            for student, pct, fields, critical, status, email
+            in zip(students, completion_pct, missing, critical_missing, completion_status, has_email)
+        ]
+        
+        return {
+            'success': True,
+            'count': len(results),
+            'days_to_deadline': days_remaining,
+            'results': results,
+            'message': f"Analyzed {len(results)} students, {days_remaining} days remaining"
+        }
+        
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def check_histories_bulk_impl(student_ids: List[str]) -> dict:
+    """Check communication history for many students with a single store lookup."""
+    try:
+        with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+            histories = cache.histories(student_ids)
+        
+        now = datetime.now()
+        results = {sid: summarize_history(history, now) for sid, history in histories.items()}
+        contacted = sum(1 for r in results.values() if r['contacted_before'])
+        
+        return {
+            'success': True,
+            'count': len(results),
+            'results': results,
+            'message': f"{contacted} of {len(results)} students contacted before"
+        }
+        
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def draft_messages_bulk_impl(drafts: List[dict]) -> dict:
+    """
+    Draft messages for many students in one call.
+    Each item carries the student data plus the tone, urgency and reasoning chosen for them.
+    An item that cannot be drafted gets its own error result; the rest are still drafted.
+    """
+    try:
+        render = message_templates().render
+        results = []
+        for item in drafts:
+            student = item.get('student_data') or {}
+            try:
+                subject, message_body = render(
+                    item.get('student_name') or student.get('student_name', 'Student'), student,
+                    item.get('tone', 'professional'), item.get('urgency', 'medium'), item.get('reasoning', '')
+                )
+            except Exception as e:
+                results.append({'success': False, 'student_id': student.get('student_id'), 'error': str(e)})
+                continue
+            results.append({
+                'success': True,
+                'subject': subject,
+                'message_body': message_body,
+                'tone_used': item.get('tone', 'professional'),
+                'urgency_used': item.get('urgency', 'medium'),
+                'character_count': len(message_body),
+                'student_id': student.get('student_id'),
+                'student_email': student.get('email')
+            })
+        
+        drafted = sum(1 for r in results if r['success'])
+        return {
+            'success': drafted > 0 or not results,
+            'count': len(results),
+            'results': results,
+            'message': f"Drafted {drafted} of {len(results)} messages"
+        }
+        
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
 # ============================================================================
 # TOOL DEFINITIONS FOR CLAUDE
 # ============================================================================
@@ -541,10 +753,69 @@ TOOLS = [
                 "reason": {
                     "type": "string",
                     "description": "Your reasoning for scheduling later"
+                },
+                "dry_run": {
+                    "type": "boolean",
+                    "description": "If true, simulate scheduling without storing it"
                 }
             },
             "required": ["student_id", "days_to_wait", "reason"]
         }
+    },
+    {
+        "name": "analyze_profiles_bulk",
+        "description": "Analyze the profile status of many students in one call. Same analysis as analyze_profile_status, returned as a list. Prefer this when triaging a batch of students.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "students": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "Student data objects from read_student_data"
+                }
+            },
+            "required": ["students"]
+        }
+    },
+    {
+        "name": "check_histories_bulk",
+        "description": "Check the communication history of many students in one call. Returns the same information as check_communication_history, keyed by student_id.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "student_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Student identifiers"
+                }
+            },
+            "required": ["student_ids"]
+        }
+    },
+    {
+        "name": "draft_messages_bulk",
+        "description": "Draft personalized messages for many students in one call. Give each student the tone and urgency you decided on, with your reasoning.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "drafts": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "student_name": {"type": "string"},
+                            "student_data": {"type": "object"},
+                            "tone": {"type": "string", "enum": ["friendly", "professional", "urgent", "gentle"]},
+                            "urgency": {"type": "string", "enum": ["low", "medium", "high"]},
+                            "reasoning": {"type": "string"}
+                        },
+                        "required": ["student_data", "tone", "urgency", "reasoning"]
+                    },
+                    "description": "One entry per student to draft for"
+                }
+            },
+            "required": ["drafts"]
+        }
     }
 ]
 
@@ -577,8 +848,12 @@ def execute_tool(tool_name: str, tool_input: dict) -> dict:
         'schedule_for_later': lambda inp: schedule_for_later_impl(
             inp['student_id'],
             inp['days_to_wait'],
-            inp['reason']
-        )
+            inp['reason'],
+            inp.get('dry_run', True)
+        ),
+        'analyze_profiles_bulk': lambda inp: analyze_profiles_bulk_impl(inp['students']),
+        'check_histories_bulk': lambda inp: check_histories_bulk_impl(inp['student_ids']),
+        'draft_messages_bulk': lambda inp: draft_messages_bulk_impl(inp['drafts'])
     }
     
     if tool_name in tool_map:
@@ -607,6 +882,9 @@ YOUR CAPABILITIES (Tools Available):
 4. draft_message - Create personalized messages
 5. send_email - Send messages to students
 6. schedule_for_later - Delay contact for strategic reasons
+7. analyze_profiles_bulk - Analyze many students in one call
+8. check_histories_bulk - Check history for many students in one call
+9. draft_messages_bulk - Draft messages for many students in one call
 
 YOUR DECISION-MAKING FRAMEWORK:
 
@@ -654,6 +932,9 @@ YOUR WORKFLOW:
    d. Execute your decision with tools
 3. Keep track of your decisions and reasoning
 
+With many students, use the bulk tools to analyze, check and draft for the
+whole batch in a few turns, then send or schedule each student individually.
+
 IMPORTANT:
 - You are autonomous - make decisions, don't ask for permission
 - ALWAYS explain your reasoning
@@ -670,91 +951,1021 @@ Begin by reading the student data, then process each student strategically!"""
 
 
 # ============================================================================
-# AGENT NODE - THE BRAIN
+# PRE-TRIAGE - DETERMINISTIC RULES
 # ============================================================================
 
-def agent_node(state: AgenticState) -> AgenticState:
+# The clear-cut rules from AGENT_SYSTEM_PROMPT, evaluated locally
+PRETRIAGE_RULES = {
+    "min_hours_between_contacts": 48,
+    "reschedule_days": 3,
+    "urgent_completion_below": 30,
+    "urgent_days_remaining_below": 7,
+    "urgent_max_previous_contacts": 2,
+}
+
+# Agent round-trips a student typically costs for each action
+# (analyze -> check history -> draft -> send / schedule). Savings reported
+# from these are estimates, not measured calls.
+LLM_CALLS_PER_ACTION = {
+    'skip': 2,
+    'schedule': 3,
+    'send': 4,
+}
+
+
+def triage_student(student: dict, dry_run: bool = True) -> dict:
     """
-    The agent reasoning node - where Claude makes decisions.
-    This is where the REAL agentic behavior happens!
+    Resolve a student with the unambiguous rules, without calling Claude.
+    Returns a decision record, or None if the agent should decide.
     """
+    student_id = student['student_id']
+    email = student.get('email')
     
-    messages = state["messages"]
+    # If no email address → Skip (can't contact)
+    if 'email' in student.get('missing_fields', []) or not isinstance(email, str) or not email.strip():
+        return {
+            'student_id': student_id,
+            'action': 'skip',
+            'rule': 'no_email',
+            'reasoning': 'No email address on file - cannot contact',
+            'source': 'pretriage'
+        }
     
-    # Call Claude with tools
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=8000,
-        system=AGENT_SYSTEM_PROMPT.format(
-            deadline=CONFIG['deadline'],
-            form_url=CONFIG['form_url'],
-            institute=CONFIG['institute_name']
-        ),
-        tools=TOOLS,
-        messages=messages
-    )
+    history = check_communication_history_impl(student_id)
+    if 'error' in history:
+        return None
     
-    # Add response to messages
-    state["messages"].append({
-        "role": "assistant",
-        "content": response.content
-    })
+    # If contacted <48 hours ago → Schedule for later
+    hours_since = history.get('hours_since_last_contact')
+    if history['contacted_before'] and hours_since < PRETRIAGE_RULES['min_hours_between_contacts']:
+        reason = f"Contacted {hours_since} hours ago - too soon to follow up"
+        result = schedule_for_later_impl(student_id, PRETRIAGE_RULES['reschedule_days'], reason, dry_run)
+        if not result.get('success'):
+            return None
+        return {
+            'student_id': student_id,
+            'action': 'schedule',
+            'rule': 'recent_contact',
+            'reasoning': reason,
+            'scheduled_for': result['scheduled_for'],
+            'source': 'pretriage'
+        }
     
-    # Extract any reasoning from the response
-    for content in response.content:
-        if hasattr(content, 'type') and content.type == 'text':
-            state["agent_reasoning"].append(content.text)
+    # If <30% complete + deadline <7 days → High priority, urgent tone
+    analysis = analyze_profile_status_impl(student)
+    if 'error' in analysis:
+        return None
     
-    return state
-
+    if (analysis['completion_percentage'] < PRETRIAGE_RULES['urgent_completion_below']
+            and analysis['days_to_deadline'] < PRETRIAGE_RULES['urgent_days_remaining_below']
+            and history['contact_count'] <= PRETRIAGE_RULES['urgent_max_previous_contacts']):
+        reasoning = (f"{analysis['completion_percentage']}% complete with "
+                     f"{analysis['days_to_deadline']} days to deadline - urgent reminder")
+        draft = draft_message_impl(student.get('student_name', 'Student'), student, 'urgent', 'high', reasoning)
+        if not draft.get('success'):
+            return None
+        sent = send_email_impl(email, draft['subject'], draft['message_body'], student_id, dry_run)
+        if not sent.get('success'):
+            return None
+        return {
+            'student_id': student_id,
+            'action': 'send',
+            'rule': 'urgent_deadline',
+            'reasoning': reasoning,
+            'tone': 'urgent',
+            'urgency': 'high',
+            'subject': draft['subject'],
+            'email': email,
+            'sent': sent.get('sent', False),
+            'source': 'pretriage'
+        }
+    
+    # Anything else needs the agent's judgement
+    return None
 
-# ============================================================================
-# TOOL EXECUTION NODE
-# ============================================================================
 
-def tool_execution_node(state: AgenticState) -> AgenticState:
+def pretriage_students(students: Iterable[dict], dry_run: bool = True) -> dict:
     """
-    Execute the tools that the agent decided to use.
+    Run the rule tier over all students before the LangGraph workflow.
+    Clear-cut students are handled directly; the rest are forwarded.
+    `students` may be a stream (e.g. a RosterStream) consumed as it is read.
     """
+    decisions = []
+    communications = []
+    forwarded = []
     
-    last_message = state["messages"][-1]
-    tool_results = []
-    
-    # Execute all tool calls in the last message
-    for content in last_message["content"]:
-        if hasattr(content, 'type') and content.type == 'tool_use':
-            tool_name = content.name
-            tool_input = content.input
-            
-            print(f"\n🔧 Agent using tool: {tool_name}")
-            print(f"   Input: {json.dumps(tool_input, indent=2)}")
-            
-            # Execute the tool
-            result = execute_tool(tool_name, tool_input)
-            
-            print(f"   Result: {json.dumps(result, indent=2)[:200]}...")
-            
-            tool_results.append({
-                "type": "tool_result",
-                "tool_use_id": content.id,
-                "content": json.dumps(result)
+    for student in students:
+        decision = triage_student(student, dry_run)
+        if decision is None:
+            forwarded.append(student)
+            continue
+        
+        decisions.append(decision)
+        emit_decision_events(decision)
+        if decision['action'] == 'send':
+            communications.append({
+                'student_id': decision['student_id'],
+                'email': decision['email'],
+                'subject': decision['subject'],
+                'sent': decision['sent'],
+                'source': 'pretriage'
             })
     
-    # Add tool results to messages
-    if tool_results:
-        state["messages"].append({
-            "role": "user",
-            "content": tool_results
-        })
-    
-    return state
+    return {
+        'decisions': decisions,
+        'communications_sent': communications,
+        'forwarded': forwarded,
+        'resolved_count': len(decisions),
+        'forwarded_count': len(forwarded),
+        'llm_calls_saved': sum(LLM_CALLS_PER_ACTION[d['action']] for d in decisions)
+    }
 
 
 # ============================================================================
-# DECISION ROUTER
+# INCREMENTAL RUNS
 # ============================================================================
 
-def should_continue(state: AgenticState) -> Literal["tools", "end"]:
+def _last_contacts(student_ids: List[str]) -> Dict[str, str]:
+    with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+        histories = cache.histories(student_ids)
+    return {sid: summarize_history(history)['last_contact'] for sid, history in histories.items()}
+
+
+def skip_unchanged_students(students: Iterable[dict], dry_run: bool, seen: Dict[str, dict],
+                            stats: dict, chunk_size: int = 500) -> Iterable[dict]:
+    """
+    Yield only the students whose fingerprint changed since their last
+    decision, or whose decision expired. Every student yielded is added
+    to `seen`; stats['skipped'] counts the others and stats['unchanged']
+    lists their ids.
+    """
+    store = get_fingerprint_store(CONFIG['tracking_db'])
+    stats.setdefault('skipped', 0)
+    stats.setdefault('unchanged', [])
+    
+    def changed(chunk):
+        last_contacts = _last_contacts([s['student_id'] for s in chunk])
+        fingerprints = {s['student_id']: student_fingerprint(s, last_contacts[s['student_id']]) for s in chunk}
+        unchanged = store.unchanged(fingerprints, dry_run)
+        stats['skipped'] += len(unchanged)
+        stats['unchanged'].extend(s['student_id'] for s in chunk if s['student_id'] in unchanged)
+        for student in chunk:
+            if student['student_id'] not in unchanged:
+                seen[student['student_id']] = student
+                yield student
+    
+    chunk = []
+    for student in students:
+        chunk.append(student)
+        if len(chunk) >= chunk_size:
+            yield from changed(chunk)
+            chunk = []
+    if chunk:
+        yield from changed(chunk)
+
+
+def record_student_fingerprints(decisions: List[dict], students: Dict[str, dict], dry_run: bool) -> int:
+    """
+    Store the fingerprint of every decided student, taken after the run so
+    the contact made in it is part of it. Returns the number recorded.
+    """
+    decided = {d['student_id']: d for d in decisions if d.get('student_id') in students}
+    if not decided:
+        return 0
+    
+    now = datetime.now()
+    default_valid_until = (now + timedelta(days=CONFIG['incremental_valid_days'])).isoformat()
+    last_contacts = _last_contacts(list(decided))
+    entries = []
+    for student_id, decision in decided.items():
+        valid_until = decision.get('scheduled_for') if decision['action'] == 'schedule' else None
+        entries.append((
+            student_id,
+            student_fingerprint(students[student_id], last_contacts[student_id]),
+            decision['action'],
+            valid_until or default_valid_until,
+            dry_run
+        ))
+    get_fingerprint_store(CONFIG['tracking_db']).record_many(entries)
+    return len(entries)
+
+
+# ============================================================================
+# DECISION CACHE
+# ============================================================================
+
+def _decision_cache():
+    return get_decision_cache(CONFIG['tracking_db'], CONFIG['decision_cache_ttl_hours'],
+                              CONFIG['decision_cache_size'])
+
+
+def apply_cached_decision(student: dict, cached: dict, dry_run: bool = True) -> dict:
+    """
+    Carry out a cached agent decision for a student, without calling Claude.
+    Returns the decision record, or None if the agent should decide after all.
+    """
+    student_id = student['student_id']
+    reasoning = f"Cached agent decision for the same situation: {cached['reasoning'] or ''}".strip()
+    
+    if cached['action'] == 'schedule':
+        result = schedule_for_later_impl(student_id, cached['days_to_wait'] or 1, cached['reasoning'] or '', dry_run)
+        if not result.get('success'):
+            return None
+        return {
+            'student_id': student_id,
+            'action': 'schedule',
+            'scheduled_for': result['scheduled_for'],
+            'reasoning': reasoning,
+            'source': 'decision_cache'
+        }
+    
+    email = student.get('email')
+    if not isinstance(email, str) or not email.strip():
+        return None
+    draft = draft_message_impl(student.get('student_name', 'Student'), student,
+                               cached['tone'], cached['urgency'], cached['reasoning'] or '')
+    if not draft.get('success'):
+        return None
+    sent = send_email_impl(email, draft['subject'], draft['message_body'], student_id, dry_run)
+    if not sent.get('success'):
+        return None
+    return {
+        'student_id': student_id,
+        'action': 'send',
+        'tone': cached['tone'],
+        'urgency': cached['urgency'],
+        'reasoning': reasoning,
+        'subject': draft['subject'],
+        'email': email,
+        'sent': sent.get('sent', False),
+        'source': 'decision_cache'
+    }
+
+
+def apply_cached_decisions(students: List[dict], dry_run: bool, keys: Dict[str, str]) -> dict:
+    """
+    Resolve students whose situation matches a cached agent decision.
+    The rest are forwarded; `keys` receives their situation keys, so the
+    agent's decisions for them can be cached after the run.
+    """
+    days_remaining = days_to_deadline()
+    with cached_io(CONFIG['tracking_db'], CONFIG['schedule_file']) as cache:
+        histories = cache.histories([s['student_id'] for s in students])
+    
+    now = datetime.now()
+    student_keys = {}
+    for student in students:
+        analysis = analyze_profile_status_impl(student, days_remaining)
+        history = summarize_history(histories[student['student_id']], now)
+        contacted_recently = (history['contacted_before'] and
+                              history['hours_since_last_contact'] < PRETRIAGE_RULES['min_hours_between_contacts'])
+        student_keys[student['student_id']] = decision_key(
+            student.get('completion_percentage', 0),
+            student.get('missing_fields', []),
+            analysis.get('deadline_status'),
+            history['contact_count'],
+            contacted_recently,
+            dry_run,
+            CONFIG['decision_cache_bucket']
+        )
+    hits = _decision_cache().lookup(list(student_keys.values()))
+    
+    decisions = []
+    communications = []
+    forwarded = []
+    hit_count = 0
+    for student in students:
+        key = student_keys[student['student_id']]
+        cached = hits.get(key)
+        hit_count += cached is not None
+        decision = apply_cached_decision(student, cached, dry_run) if cached else None
+        if decision is None:
+            keys[student['student_id']] = key
+            forwarded.append(student)
+            continue
+        
+        decisions.append(decision)
+        emit_decision_events(decision)
+        if decision['action'] == 'send':
+            communications.append({
+                'student_id': decision['student_id'],
+                'email': decision['email'],
+                'subject': decision['subject'],
+                'sent': decision['sent'],
+                'source': 'decision_cache'
+            })
+    
+    run_metrics.count('decision_cache', 'lookups', len(students))
+    run_metrics.count('decision_cache', 'hits', hit_count)
+    return {
+        'decisions': decisions,
+        'communications_sent': communications,
+        'forwarded': forwarded,
+        'resolved_count': len(decisions),
+        'forwarded_count': len(forwarded),
+        'llm_calls_saved': sum(LLM_CALLS_PER_ACTION[d['action']] for d in decisions),
+        'hits': hit_count,
+        'lookups': len(students),
+        'hit_ratio': hit_count / len(students) if students else 0.0
+    }
+
+
+def remember_agent_decisions(decisions: List[dict], keys: Dict[str, str]) -> int:
+    """Cache the agent's send/schedule decisions by situation. Returns the number stored."""
+    entries = {}
+    today = datetime.now().date()
+    for decision in decisions:
+        key = keys.get(decision.get('student_id'))
+        if key is None or decision.get('source') != 'agent':
+            continue
+        if decision['action'] == 'send' and decision.get('tone') and decision.get('urgency'):
+            entries[key] = {'action': 'send', 'tone': decision['tone'], 'urgency': decision['urgency'],
+                            'reasoning': decision.get('reasoning', '')}
+        elif decision['action'] == 'schedule' and decision.get('scheduled_for'):
+            scheduled = datetime.fromisoformat(decision['scheduled_for']).date()
+            entries[key] = {'action': 'schedule', 'days_to_wait': max(1, (scheduled - today).days),
+                            'reasoning': decision.get('reasoning', '')}
+    if entries:
+        _decision_cache().store_many(entries)
+    return len(entries)
+
+
+def merge_resolutions(first: dict, second: dict) -> dict:
+    """Combine two local resolution passes (pre-triage, decision cache) into one."""
+    if not first:
+        return second
+    return {
+        'decisions': first['decisions'] + second['decisions'],
+        'communications_sent': first['communications_sent'] + second['communications_sent'],
+        'forwarded': second['forwarded'],
+        'resolved_count': first['resolved_count'] + second['resolved_count'],
+        'forwarded_count': second['forwarded_count'],
+        'llm_calls_saved': first['llm_calls_saved'] + second['llm_calls_saved'],
+    }
+
+
+# ============================================================================
+# PROMPT CACHING
+# ============================================================================
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+_static_prefix = {}
+
+
+def get_system_prompt() -> str:
+    """The formatted system prompt, built once per configuration."""
+    key = ('system', CONFIG['deadline'], CONFIG['form_url'], CONFIG['institute_name'])
+    if key not in _static_prefix:
+        _static_prefix[key] = AGENT_SYSTEM_PROMPT.format(
+            deadline=CONFIG['deadline'],
+            form_url=CONFIG['form_url'],
+            institute=CONFIG['institute_name']
+        )
+    return _static_prefix[key]
+
+
+def get_cacheable_prefix() -> tuple:
+    """
+    System prompt and tool schemas with cache breakpoints.
+    The cache covers tools -> system, so both stay out of per-call input cost.
+    """
+    key = ('cached', get_system_prompt(), len(TOOLS))
+    if key not in _static_prefix:
+        system = [{"type": "text", "text": get_system_prompt(), "cache_control": CACHE_CONTROL}]
+        tools = [dict(tool) for tool in TOOLS]
+        tools[-1]["cache_control"] = CACHE_CONTROL
+        _static_prefix[key] = (system, tools)
+    return _static_prefix[key]
+
+
+def _with_breakpoint(message: dict) -> dict:
+    """Copy of a user message with a cache breakpoint on its last block."""
+    content = message["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [dict(block) if isinstance(block, dict) else block for block in content]
+    if not blocks or not isinstance(blocks[-1], dict):
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+    return {**message, "content": blocks}
+
+
+def with_cache_breakpoints(messages: List[dict]) -> List[dict]:
+    """
+    Mark the stable early turn (the initial task) and the newest user turn.
+    The next call then reads the whole history up to that turn from cache.
+    The stored conversation is left untouched.
+    """
+    marked = list(messages)
+    if marked and marked[0]["role"] == "user":
+        marked[0] = _with_breakpoint(marked[0])
+    if len(marked) > 1 and marked[-1]["role"] == "user":
+        marked[-1] = _with_breakpoint(marked[-1])
+    return marked
+
+
+def usage_stats(response) -> dict:
+    """Token and cache-hit statistics from one Claude response."""
+    usage = getattr(response, 'usage', None)
+    return {
+        'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+        'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+        'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0,
+        'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+    }
+
+
+def summarize_token_usage(token_usage: List[dict]) -> dict:
+    """Totals and cache hit ratio over a run's Claude calls."""
+    totals = {
+        'calls': len(token_usage),
+        'input_tokens': sum(u['input_tokens'] for u in token_usage),
+        'output_tokens': sum(u['output_tokens'] for u in token_usage),
+        'cache_creation_input_tokens': sum(u['cache_creation_input_tokens'] for u in token_usage),
+        'cache_read_input_tokens': sum(u['cache_read_input_tokens'] for u in token_usage),
+    }
+    prompt_tokens = (totals['input_tokens'] + totals['cache_creation_input_tokens']
+                     + totals['cache_read_input_tokens'])
+    totals['cache_hit_ratio'] = round(totals['cache_read_input_tokens'] / prompt_tokens, 3) if prompt_tokens else 0.0
+    return totals
+
+
+# ============================================================================
+# AGENT NODE - THE BRAIN
+# ============================================================================
+
+def build_agent_request(state: AgenticState) -> dict:
+    """Arguments for the Claude call made by the agent node."""
+    if CONFIG['prompt_caching']:
+        system, tools = get_cacheable_prefix()
+        messages = with_cache_breakpoints(state["messages"])
+    else:
+        system, tools, messages = get_system_prompt(), TOOLS, state["messages"]
+    
+    return dict(
+        model="claude-sonnet-4-20250514",
+        max_tokens=8000,
+        system=system,
+        tools=tools,
+        messages=messages
+    )
+
+
+def record_agent_response(state: AgenticState, response, elapsed: float = None) -> AgenticState:
+    """Append Claude's response to the conversation and collect its reasoning."""
+    
+    # Add response to messages
+    state["messages"].append({
+        "role": "assistant",
+        "content": response.content
+    })
+    
+    # Extract any reasoning from the response
+    for content in response.content:
+        if hasattr(content, 'type') and content.type == 'text':
+            state["agent_reasoning"].append(content.text)
+            agent_events.emit('agent_reasoning', text=content.text)
+        elif hasattr(content, 'type') and content.type == 'tool_use' and agent_events.enabled():
+            agent_events.emit('tool_call', id=content.id, name=content.name,
+                              input=agent_events.summarize(content.input))
+    
+    usage = usage_stats(response)
+    state.setdefault("token_usage", []).append(usage)
+    run_metrics.record_tokens(usage)
+    agent_events.emit('token_usage', **usage)
+    if elapsed is not None:
+        run_metrics.record('agent', 'agent_node', elapsed)
+        agent_events.emit('timing', node='agent', elapsed_ms=round(elapsed * 1000, 1))
+    
+    return state
+
+
+def agent_node(state: AgenticState) -> AgenticState:
+    """
+    The agent reasoning node - where Claude makes decisions.
+    This is where the REAL agentic behavior happens!
+    """
+    
+    # Call Claude with tools
+    started = time.perf_counter()
+    response = get_client().messages.create(**build_agent_request(state))
+    
+    return record_agent_response(state, response, time.perf_counter() - started)
+
+
+_client_lock = threading.Lock()
+
+
+def get_client() -> "Anthropic":
+    """The sync Claude client, created on first use (or `client` if already set)."""
+    global client
+    
+    with _client_lock:
+        if client is None:
+            from anthropic import Anthropic
+            client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        return client
+
+
+# ============================================================================
+# ASYNC AGENT NODE
+# ============================================================================
+
+_async_client = None
+_async_client_loop = None
+
+
+def get_async_client() -> "AsyncAnthropic":
+    """
+    Shared async Claude client backed by one pooled HTTP connection.
+    Connections belong to an event loop, so a new client is made per loop.
+    """
+    global _async_client, _async_client_loop
+    
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        import httpx
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+        
+        _async_client = AsyncAnthropic(
+            api_key=os.getenv('ANTHROPIC_API_KEY'),
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=CONFIG['http_max_connections'],
+                    max_keepalive_connections=CONFIG['http_max_connections']
+                )
+            )
+        )
+        _async_client_loop = loop
+    
+    return _async_client
+
+
+async def agent_node_async(state: AgenticState) -> AgenticState:
+    """
+    Async variant of agent_node.
+    Awaits Claude so other conversations can run while this one waits.
+    """
+    started = time.perf_counter()
+    response = await get_async_client().messages.create(**build_agent_request(state))
+    
+    return record_agent_response(state, response, time.perf_counter() - started)
+
+
+async def tool_execution_node_async(state: AgenticState) -> AgenticState:
+    """Run the (blocking) tool node off the event loop."""
+    return await asyncio.to_thread(tool_execution_node, state)
+
+
+# ============================================================================
+# TOOL EXECUTION NODE
+# ============================================================================
+
+# Tools that change shared state: run one at a time, in the order Claude asked
+SERIAL_TOOLS = {'send_email', 'schedule_for_later'}
+
+# Maximum concurrent calls per tool (others default to CONFIG['tool_workers'])
+TOOL_CONCURRENCY = {
+    'read_student_data': 1,
+    'draft_messages_bulk': 2,
+    'analyze_profiles_bulk': 2,
+    'check_histories_bulk': 2,
+}
+
+_tool_pool = None
+_tool_pool_lock = threading.Lock()
+_tool_semaphores = {}
+
+
+def _get_tool_pool() -> ThreadPoolExecutor:
+    """Shared thread pool for tool calls, created on first use."""
+    global _tool_pool
+    with _tool_pool_lock:
+        if _tool_pool is None:
+            _tool_pool = ThreadPoolExecutor(max_workers=CONFIG['tool_workers'], thread_name_prefix='tool')
+        return _tool_pool
+
+
+def _tool_semaphore(tool_name: str) -> threading.BoundedSemaphore:
+    with _tool_pool_lock:
+        if tool_name not in _tool_semaphores:
+            limit = TOOL_CONCURRENCY.get(tool_name, CONFIG['tool_workers'])
+            _tool_semaphores[tool_name] = threading.BoundedSemaphore(limit)
+        return _tool_semaphores[tool_name]
+
+
+def log_tool_call(tool_name: str, tool_input: dict, result: dict, elapsed: float):
+    """Print a tool call according to CONFIG['tool_log']."""
+    mode = CONFIG['tool_log']
+    if mode == 'off':
+        return
+    if mode == 'full':
+        print(f"\n🔧 Agent using tool: {tool_name}")
+        print(f"   Input: {json.dumps(tool_input, indent=2)}")
+        print(f"   Result: {json.dumps(result, indent=2)[:200]}...")
+        return
+    status = 'error' if 'error' in result else 'ok'
+    print(f"🔧 Agent using tool: {tool_name} ({elapsed * 1000:.0f} ms, {status})")
+
+
+def _run_tool_call(tool_call: tuple, tool_use_id: str = None) -> dict:
+    """Execute one tool call under its concurrency limit and log it."""
+    tool_name, tool_input = tool_call
+    with _tool_semaphore(tool_name):
+        started = time.perf_counter()
+        result = execute_tool(tool_name, tool_input)
+        elapsed = time.perf_counter() - started
+    _report_tool_call(tool_name, tool_input, tool_use_id, result, elapsed)
+    return result
+
+
+def _report_tool_call(tool_name: str, tool_input: dict, tool_use_id: str, result: dict, elapsed: float):
+    run_metrics.record('tool', tool_name, elapsed)
+    log_tool_call(tool_name, tool_input, result, elapsed)
+    if agent_events.enabled():
+        agent_events.emit('tool_result', id=tool_use_id, name=tool_name, success='error' not in result,
+                          elapsed_ms=round(elapsed * 1000, 1), result=agent_events.summarize(result))
+
+
+def _run_send_batch(tool_calls: List[tuple], tool_use_ids: List[str]) -> List[dict]:
+    """Deliver consecutive send_email calls together (send_emails_impl); each call is charged an equal share of the time."""
+    with _tool_semaphore('send_email'):
+        started = time.perf_counter()
+        results = send_emails_impl([tool_input for _, tool_input in tool_calls])
+        elapsed = (time.perf_counter() - started) / len(tool_calls)
+    for (tool_name, tool_input), tool_use_id, result in zip(tool_calls, tool_use_ids, results):
+        _report_tool_call(tool_name, tool_input, tool_use_id, result, elapsed)
+    return results
+
+
+def _run_serial_calls(tool_calls: List[tuple], tool_use_ids: List[str]) -> List[dict]:
+    """
+    Run stateful calls in order. A run of consecutive send_email calls is
+    delivered as one batch, so its emails go out concurrently on the
+    mailer's workers instead of one round trip at a time.
+    """
+    results = []
+    start = 0
+    while start < len(tool_calls):
+        end = start
+        while end < len(tool_calls) and tool_calls[end][0] == 'send_email':
+            end += 1
+        if end - start > 1:
+            results.extend(_run_send_batch(tool_calls[start:end], tool_use_ids[start:end]))
+        else:
+            end = start + 1
+            results.append(_run_tool_call(tool_calls[start], tool_use_ids[start]))
+        start = end
+    return results
+
+
+def emit_decision_events(decision: dict):
+    """Stream a decision, and the email it sent if any."""
+    agent_events.emit('decisions', **decision)
+    if decision['action'] == 'send':
+        agent_events.emit('communications_sent', student_id=decision['student_id'], email=decision['email'],
+                          subject=decision['subject'], sent=decision['sent'], source=decision['source'])
+
+
+def record_tool_decisions(state: AgenticState, calls: List[tuple], results: List[dict]):
+    """
+    Record a decision for every send/schedule call that succeeded this turn,
+    so `decisions` and `communications_sent` are filled whether or not the
+    history is compacted.
+    """
+    completed = [
+        (name, tool_input, result) for (name, tool_input), result in zip(calls, results)
+        if name in COMPLETING_TOOLS and result.get('success')
+    ]
+    if not completed:
+        return
+    
+    by_student = _index_tool_calls(state["messages"])[2]
+    recorded = {d['student_id'] for d in state["decisions"] if d.get('source') == 'agent'}
+    for name, tool_input, result in completed:
+        decision = _decision_record(name, tool_input, result, by_student)
+        if decision['student_id'] in recorded:
+            continue
+        recorded.add(decision['student_id'])
+        state["decisions"].append(decision)
+        if decision['action'] == 'send':
+            state["communications_sent"].append({
+                'student_id': decision['student_id'],
+                'email': decision['email'],
+                'subject': decision['subject'],
+                'sent': decision['sent'],
+                'source': 'agent'
+            })
+        emit_decision_events(decision)
+
+
+def mark_students_done(run_id: str, calls: List[tuple], results: List[dict]):
+    """Record students whose send/schedule succeeded in the run's done ledger."""
+    actions = {'send_email': 'send', 'schedule_for_later': 'schedule'}
+    done = [
+        (_tool_student_id(tool_input), actions[name])
+        for (name, tool_input), result in zip(calls, results)
+        if name in actions and result.get('success') and _tool_student_id(tool_input)
+    ]
+    if done:
+        get_run_ledger(CONFIG['checkpoint_db']).mark_done(run_id, done)
+
+
+def tool_execution_node(state: AgenticState) -> AgenticState:
+    """
+    Execute the tools that the agent decided to use.
+    
+    Independent calls from the same turn run concurrently on a thread pool.
+    Stateful calls (SERIAL_TOOLS) run one after another in their original
+    order, and results are returned in the order Claude issued the calls.
+    """
+    
+    last_message = state["messages"][-1]
+    
+    # Collect all tool calls in the last message
+    tool_uses = [
+        content for content in last_message["content"]
+        if hasattr(content, 'type') and content.type == 'tool_use'
+    ]
+    calls = [(content.name, content.input) for content in tool_uses]
+    ids = [content.id for content in tool_uses]
+    started = time.perf_counter()
+    
+    if len(calls) <= 1:
+        results = _run_serial_calls(calls, ids)
+    else:
+        pool = _get_tool_pool()
+        serial = [i for i, (name, _) in enumerate(calls) if name in SERIAL_TOOLS]
+        futures = {
+            i: pool.submit(_run_tool_call, call, ids[i])
+            for i, call in enumerate(calls) if calls[i][0] not in SERIAL_TOOLS
+        }
+        serial_future = (
+            pool.submit(_run_serial_calls, [calls[i] for i in serial], [ids[i] for i in serial])
+            if serial else None
+        )
+        
+        results = [None] * len(calls)
+        for i, future in futures.items():
+            results[i] = future.result()
+        if serial_future:
+            for i, result in zip(serial, serial_future.result()):
+                results[i] = result
+    
+    tool_results = [
+        {
+            "type": "tool_result",
+            "tool_use_id": content.id,
+            "content": json.dumps(result)
+        }
+        for content, result in zip(tool_uses, results)
+    ]
+    
+    agent_events.emit('timing', node='tools', calls=len(calls),
+                      elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+    record_tool_decisions(state, calls, results)
+    
+    if state.get('run_id'):
+        mark_students_done(state['run_id'], calls, results)
+    
+    # Add tool results to messages
+    if tool_results:
+        state["messages"].append({
+            "role": "user",
+            "content": tool_results
+        })
+    
+    return state
+
+
+# ============================================================================
+# CONVERSATION COMPACTION
+# ============================================================================
+
+# Tools whose successful result means the agent is done with a student
+COMPLETING_TOOLS = {'send_email', 'schedule_for_later'}
+
+LEDGER_HEADER = "STUDENTS ALREADY HANDLED (history compacted, do not process again):"
+
+
+def _block_field(block, name: str, default=None):
+    """Read a field from a content block (SDK object or plain dict)."""
+    if isinstance(block, dict):
+        return block.get(name, default)
+    return getattr(block, name, default)
+
+
+def _tool_student_id(tool_input: dict):
+    """The student a tool call is about, if any."""
+    if 'student_id' in tool_input:
+        return tool_input['student_id']
+    student_data = tool_input.get('student_data')
+    if isinstance(student_data, dict):
+        return student_data.get('student_id')
+    return None
+
+
+def _per_student_inputs(tool_name: str, tool_input: dict) -> list:
+    """
+    (student_id, input) for each student a tool call is about: one for a
+    single-student tool, one per list entry for the bulk tools.
+    """
+    if tool_name == 'analyze_profiles_bulk':
+        entries = [(s.get('student_id'), s) for s in tool_input.get('students') or [] if isinstance(s, dict)]
+    elif tool_name == 'check_histories_bulk':
+        entries = [(sid, {'student_id': sid}) for sid in tool_input.get('student_ids') or []]
+    elif tool_name == 'draft_messages_bulk':
+        entries = [(_tool_student_id(d), d) for d in tool_input.get('drafts') or [] if isinstance(d, dict)]
+    else:
+        entries = [(_tool_student_id(tool_input), tool_input)]
+    return [(student_id, inp) for student_id, inp in entries if student_id is not None]
+
+
+def _parse_tool_result(content) -> dict:
+    """Decode a tool_result payload written by tool_execution_node."""
+    try:
+        parsed = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _index_tool_calls(messages: List[dict]) -> tuple:
+    """
+    Map tool_use ids to their calls and results, with message positions,
+    and students to the calls about them: {student_id: [(name, input, position)]},
+    with one entry per student of a bulk call (input is that student's entry).
+    """
+    calls = {}
+    results = {}
+    by_student = {}
+    for i, message in enumerate(messages):
+        if not isinstance(message["content"], list):
+            continue
+        for block in message["content"]:
+            block_type = _block_field(block, 'type')
+            if block_type == 'tool_use':
+                name, tool_input = _block_field(block, 'name'), _block_field(block, 'input') or {}
+                calls[_block_field(block, 'id')] = (name, tool_input, i)
+                for student_id, student_input in _per_student_inputs(name, tool_input):
+                    by_student.setdefault(student_id, []).append((name, student_input, i))
+            elif block_type == 'tool_result':
+                results[_block_field(block, 'tool_use_id')] = (_parse_tool_result(_block_field(block, 'content')), i)
+    return calls, results, by_student
+
+
+def _decision_record(tool_name: str, tool_input: dict, result: dict, by_student: dict) -> dict:
+    """Compact record of what the agent decided for one student."""
+    student_id = _tool_student_id(tool_input)
+    
+    if tool_name == 'schedule_for_later':
+        return {
+            'student_id': student_id,
+            'action': 'schedule',
+            'scheduled_for': result.get('scheduled_for'),
+            'reasoning': tool_input.get('reason', ''),
+            'source': 'agent'
+        }
+    
+    # Tone and urgency come from the draft that preceded the send, single or bulk
+    drafts = [inp for name, inp, _ in by_student.get(student_id, [])
+              if name in ('draft_message', 'draft_messages_bulk')]
+    draft = drafts[-1] if drafts else {}
+    return {
+        'student_id': student_id,
+        'action': 'send',
+        'tone': draft.get('tone'),
+        'urgency': draft.get('urgency'),
+        'reasoning': draft.get('reasoning', ''),
+        'subject': tool_input.get('subject'),
+        'email': tool_input.get('student_email'),
+        'sent': result.get('sent', False),
+        'source': 'agent'
+    }
+
+
+def _is_ledger_message(message: dict) -> bool:
+    """True for the handled-students message compact_history inserts after the task."""
+    content = message["content"]
+    return (
+        message["role"] == "user" and isinstance(content, list) and len(content) == 1
+        and str(_block_field(content[0], 'text', '')).startswith(LEDGER_HEADER)
+    )
+
+
+def _is_completed_exchange(assistant: dict, user: dict, completed: set, calls: dict) -> bool:
+    """True if an assistant turn and its tool results only concern completed students."""
+    if assistant["role"] != "assistant" or user["role"] != "user" or not isinstance(user["content"], list):
+        return False
+    
+    tool_ids = [_block_field(b, 'id') for b in assistant["content"] if _block_field(b, 'type') == 'tool_use']
+    if not tool_ids:
+        return False
+    # Every call must be about students, all of them completed (bulk calls included)
+    for tool_id in tool_ids:
+        students = [student_id for student_id, _ in _per_student_inputs(*calls[tool_id][:2])]
+        if not students or any(student_id not in completed for student_id in students):
+            return False
+    
+    result_ids = [_block_field(b, 'tool_use_id') for b in user["content"]]
+    return sorted(result_ids, key=str) == sorted(tool_ids, key=str)
+
+
+def compact_history(state: AgenticState) -> AgenticState:
+    """
+    Keep the per-call payload roughly constant as students are processed.
+    
+    Once a student has been emailed or scheduled, their tool_use/tool_result
+    exchanges are replaced by a one-line decision record in a ledger message
+    right after the task, and consumed roster results only keep unhandled
+    students. The task itself is never rewritten, so its cache breakpoint
+    stays valid across compactions. The newest exchange is left alone until
+    the agent has seen it.
+    """
+    messages = state["messages"]
+    protected = len(messages) - 2
+    calls, results, by_student = _index_tool_calls(messages)
+    
+    # Students the agent has finished with
+    recorded = {d['student_id'] for d in state["decisions"] if d.get('source') == 'agent'}
+    completed = set()
+    for tool_id, (tool_name, tool_input, _) in calls.items():
+        if tool_name not in COMPLETING_TOOLS or tool_id not in results:
+            continue
+        result, position = results[tool_id]
+        if position >= protected or not result.get('success'):
+            continue
+        
+        student_id = _tool_student_id(tool_input)
+        completed.add(student_id)
+        if student_id not in recorded:
+            decision = _decision_record(tool_name, tool_input, result, by_student)
+            state["decisions"].append(decision)
+            recorded.add(student_id)
+            if decision['action'] == 'send':
+                state["communications_sent"].append({
+                    'student_id': student_id,
+                    'email': decision['email'],
+                    'subject': decision['subject'],
+                    'sent': decision['sent'],
+                    'source': 'agent'
+                })
+    
+    if not completed:
+        return state
+    
+    # Drop exchanges that only concern completed students, and the previous ledger
+    compacted = [messages[0]]
+    i = 1
+    while i < len(messages):
+        if _is_ledger_message(messages[i]):
+            i += 1
+            continue
+        if i + 1 < protected and _is_completed_exchange(messages[i], messages[i + 1], completed, calls):
+            i += 2
+            continue
+        compacted.append(messages[i])
+        i += 1
+    
+    # Trim consumed roster results down to the students still to process
+    for position, message in enumerate(compacted[:-1]):
+        if message["role"] != "user" or not isinstance(message["content"], list):
+            continue
+        blocks = []
+        for block in message["content"]:
+            call = calls.get(_block_field(block, 'tool_use_id'))
+            if call and call[0] == 'read_student_data':
+                roster = _parse_tool_result(_block_field(block, 'content'))
+                if 'students' in roster:
+                    remaining = [s for s in roster['students'] if s.get('student_id') not in completed]
+                    roster['handled_students_removed'] = roster.get('handled_students_removed', 0) + len(roster['students']) - len(remaining)
+                    roster['students'] = remaining
+                    block = {**block, "content": json.dumps(roster, default=str)}
+            blocks.append(block)
+        compacted[position] = {**message, "content": blocks}
+    
+    # Decision ledger follows the task as its own user turn (merged with the
+    # task by the API), after the task's cache breakpoint
+    ledger = '\n'.join(
+        json.dumps({k: v for k, v in d.items() if k not in ('email', 'source')}, default=str)
+        for d in state["decisions"] if d.get('source') == 'agent'
+    )
+    compacted.insert(1, {
+        "role": "user",
+        "content": [{"type": "text", "text": f"{LEDGER_HEADER}\n{ledger}"}]
+    })
+    
+    state["messages"] = compacted
+    return state
+
+
+# ============================================================================
+# DECISION ROUTER
+# ============================================================================
+
+def should_continue(state: AgenticState) -> Literal["tools", "end"]:
     """
     Let the AGENT decide if it needs to use more tools or if it's done.
     This is agent-driven flow control!
@@ -781,7 +1992,7 @@ def should_continue(state: AgenticState) -> Literal["tools", "end"]:
 # BUILD AGENTIC WORKFLOW
 # ============================================================================
 
-def build_agentic_workflow():
+def build_agentic_workflow(use_async: bool = False, checkpointer=None):
     """
     Build a workflow where the AGENT controls the flow.
     
@@ -790,13 +2001,24 @@ def build_agentic_workflow():
     2. Agent decides when to stop
     3. Conditional edges based on agent decisions
     4. No predetermined path!
+    
+    With use_async=True the graph uses the async nodes and must be run
+    with `await workflow.ainvoke(...)`.
+    
+    With a checkpointer the state is saved after every node, keyed by the
+    thread_id in the run config, so an interrupted run can be resumed.
     """
+    from langgraph.graph import StateGraph, START, END
     
     workflow = StateGraph(AgenticState)
     
     # Add nodes
-    workflow.add_node("agent", agent_node)
-    workflow.add_node("tools", tool_execution_node)
+    if use_async:
+        workflow.add_node("agent", agent_node_async)
+        workflow.add_node("tools", tool_execution_node_async)
+    else:
+        workflow.add_node("agent", agent_node)
+        workflow.add_node("tools", tool_execution_node)
     
     # Start with agent reasoning
     workflow.add_edge(START, "agent")
@@ -812,36 +2034,36 @@ def build_agentic_workflow():
     )
     
     # After tools, let agent reason again
-    workflow.add_edge("tools", "agent")
+    if CONFIG['compact_history']:
+        workflow.add_node("compact", compact_history)
+        workflow.add_edge("tools", "compact")
+        workflow.add_edge("compact", "agent")
+    else:
+        workflow.add_edge("tools", "agent")
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
 
-def run_agentic_agent(excel_file: str, dry_run: bool = True):
+def build_initial_task(excel_file: str, dry_run: bool, students: List[dict] = None) -> str:
     """
-    Run the truly agentic profile completion agent.
-    
-    Args:
-        excel_file: Path to Excel file with student data
-        dry_run: If True, simulate sending emails
+    Build the opening instruction for the agent.
+    If `students` is given, the roster is embedded so the agent can skip read_student_data.
     """
     
-    print("\n" + "="*80)
-    print("🤖 TRULY AGENTIC PROFILE COMPLETION AGENT")
-    print("="*80)
-    print(f"\n📊 Configuration:")
-    print(f"   Excel File: {excel_file}")
-    print(f"   Deadline: {CONFIG['deadline']}")
-    print(f"   Mode: {'DRY RUN (simulation)' if dry_run else 'LIVE (actual sending)'}")
-    print(f"   Agent: Claude Sonnet 4")
-    print("\n" + "="*80)
+    if students is None:
+        source = f"Process students from the Excel file: {excel_file}"
+    else:
+        source = f"""Process the following students from the Excel file: {excel_file}
+The student data has already been loaded for you - do NOT call read_student_data.
+
+STUDENTS:
+{json.dumps(students, default=str)}"""
     
-    # Initial task for the agent
-    initial_task = f"""Process students from the Excel file: {excel_file}
+    return f"""{source}
 
 For EACH student with an incomplete profile:
 1. Analyze their situation thoroughly
@@ -856,36 +2078,297 @@ Execute your decisions using the available tools.
 IMPORTANT: 
 - Be strategic, not mechanical
 - Explain your reasoning for each decision
-- Dry run mode: {'ENABLED' if dry_run else 'DISABLED'}
+- Dry run mode: {'ENABLED' if dry_run else 'DISABLED'} (pass dry_run={'true' if dry_run else 'false'} to send_email and schedule_for_later)
 - After processing ALL students, provide a summary and STOP
 
 Begin!"""
+
+
+def create_initial_state(task: str, students: List[dict] = None, triage: dict = None,
+                         run_id: str = '') -> AgenticState:
+    """Create the starting state for one agent conversation."""
     
-    # Initialize state
-    initial_state = AgenticState(
+    return AgenticState(
         messages=[{
             "role": "user",
-            "content": initial_task
+            "content": task
         }],
-        students_data=[],
+        students_data=students or [],
         current_student_index=0,
-        decisions=[],
-        communications_sent=[],
+        decisions=list(triage['decisions']) if triage else [],
+        communications_sent=list(triage['communications_sent']) if triage else [],
         agent_reasoning=[],
         should_continue=True,
-        error_log=[]
+        error_log=[],
+        pretriage_summary={
+            'resolved_count': triage['resolved_count'],
+            'forwarded_count': triage['forwarded_count'],
+            'llm_calls_saved': triage['llm_calls_saved']
+        } if triage else {},
+        token_usage=[],
+        run_id=run_id or ''
+    )
+
+
+# ============================================================================
+# CHECKPOINTED EXECUTION
+# ============================================================================
+
+def run_config(run_id: str = None, students: List[dict] = None) -> dict:
+    """LangGraph run config; checkpointed runs get a thread per conversation."""
+    config = {"recursion_limit": 100}
+    if run_id:
+        config["configurable"] = {"thread_id": thread_key(run_id, students)}
+    return config
+
+
+def _recursion_stopped(state: dict, config: dict) -> dict:
+    state = dict(state)
+    message = (f"Recursion limit reached in {config['configurable']['thread_id']} - "
+               f"continue with --resume {state.get('run_id')}")
+    state['error_log'] = list(state.get('error_log', [])) + [message]
+    agent_events.emit('error_log', message=message)
+    return state
+
+
+def _ended_by_agent(state: dict) -> bool:
+    """True if the agent ended the conversation itself, not a recursion or iteration limit."""
+    messages = state.get('messages') or []
+    if not messages or messages[-1]["role"] != "assistant":
+        return False
+    return not any(_block_field(block, 'type') == 'tool_use' for block in messages[-1]["content"])
+
+
+def mark_conversation_done(state: dict):
+    """
+    Once the agent has ended a checkpointed conversation, every student it
+    was given is done: those it neither emailed nor scheduled were skipped
+    on purpose (e.g. no email address) and are recorded as 'skip', so a
+    resumed run does not hand them to Claude again.
+    """
+    run_id = state.get('run_id')
+    students = state.get('students_data') or []
+    if not run_id or not students or not _ended_by_agent(state):
+        return
+    # INSERT OR IGNORE: students already marked send/schedule keep their action
+    get_run_ledger(CONFIG['checkpoint_db']).mark_done(run_id, [(s['student_id'], 'skip') for s in students])
+
+
+def invoke_workflow(workflow, initial_state: AgenticState, config: dict) -> AgenticState:
+    """
+    Run a workflow; with a checkpointed thread, pick up where it left off.
+    A thread interrupted mid-run continues from its last checkpoint and a
+    finished thread returns its saved final state without calling Claude.
+    """
+    from langgraph.errors import GraphRecursionError
+    
+    if "configurable" not in config:
+        return workflow.invoke(initial_state, config)
+    
+    snapshot = workflow.get_state(config)
+    if snapshot.values and not snapshot.next:
+        state = snapshot.values
+    else:
+        try:
+            state = workflow.invoke(None if snapshot.next else initial_state, config)
+        except GraphRecursionError:
+            return _recursion_stopped(workflow.get_state(config).values, config)
+    mark_conversation_done(state)
+    return state
+
+
+async def invoke_workflow_async(workflow, initial_state: AgenticState, config: dict) -> AgenticState:
+    """Async variant of invoke_workflow."""
+    from langgraph.errors import GraphRecursionError
+    
+    if "configurable" not in config:
+        return await workflow.ainvoke(initial_state, config)
+    
+    snapshot = await workflow.aget_state(config)
+    if snapshot.values and not snapshot.next:
+        state = snapshot.values
+    else:
+        try:
+            state = await workflow.ainvoke(None if snapshot.next else initial_state, config)
+        except GraphRecursionError:
+            return _recursion_stopped((await workflow.aget_state(config)).values, config)
+    mark_conversation_done(state)
+    return state
+
+
+def resume_interrupted_threads(run_id: str) -> List[AgenticState]:
+    """Continue every conversation of a run that stopped before reaching END."""
+    checkpointer = get_checkpointer(CONFIG['checkpoint_db'])
+    workflow = build_agentic_workflow(checkpointer=checkpointer)
+    done = get_run_ledger(CONFIG['checkpoint_db']).done_students(run_id)
+    
+    states = []
+    for thread_id in pending_threads(checkpointer, run_id):
+        config = {"recursion_limit": 100, "configurable": {"thread_id": thread_id}}
+        snapshot = workflow.get_state(config)
+        if not snapshot.next:
+            continue
+        # Conversations whose students were all handled elsewhere are not worth continuing
+        thread_students = snapshot.values.get('students_data') or []
+        if thread_students and all(s['student_id'] in done for s in thread_students):
+            continue
+        print(f"   ↩️  Resuming interrupted conversation {thread_id}")
+        states.append(invoke_workflow(workflow, None, config))
+        checkpoint()
+    return states
+
+
+# ============================================================================
+# SHARDED EXECUTION
+# ============================================================================
+
+def shard_students(students: List[dict], shard_size: int) -> List[List[dict]]:
+    """Split the student list into batches of at most `shard_size`."""
+    shard_size = max(1, shard_size)
+    return [students[i:i + shard_size] for i in range(0, len(students), shard_size)]
+
+
+def run_shard(excel_file: str, students: List[dict], dry_run: bool = True,
+              run_id: str = None) -> AgenticState:
+    """
+    Run one small sub-conversation over a batch of students.
+    Each shard compiles its own workflow so no state is shared between them.
+    """
+    checkpointer = get_checkpointer(CONFIG['checkpoint_db']) if run_id else None
+    workflow = build_agentic_workflow(checkpointer=checkpointer)
+    initial_state = create_initial_state(
+        build_initial_task(excel_file, dry_run, students),
+        students,
+        run_id=run_id
+    )
+    return invoke_workflow(workflow, initial_state, run_config(run_id, students))
+
+
+def merge_shard_states(base_state: AgenticState, shard_states: List[AgenticState]) -> AgenticState:
+    """Merge shard results back into a single AgenticState-style summary."""
+    
+    merged = AgenticState(
+        messages=list(base_state['messages']),
+        students_data=list(base_state['students_data']),
+        current_student_index=base_state['current_student_index'],
+        decisions=list(base_state['decisions']),
+        communications_sent=list(base_state['communications_sent']),
+        agent_reasoning=list(base_state['agent_reasoning']),
+        should_continue=False,
+        error_log=list(base_state['error_log']),
+        pretriage_summary=base_state['pretriage_summary'],
+        token_usage=list(base_state['token_usage']),
+        run_id=base_state.get('run_id', '')
     )
     
-    # Build and run the agentic workflow
-    print("\n🚀 Starting agentic workflow...\n")
-    workflow = build_agentic_workflow()
+    for shard_state in shard_states:
+        # Keep the initial task once; each shard's own prompt is not needed
+        merged['messages'].extend(shard_state['messages'][1:])
+        merged['current_student_index'] += len(shard_state['students_data'])
+        merged['decisions'].extend(shard_state['decisions'])
+        merged['communications_sent'].extend(shard_state['communications_sent'])
+        merged['agent_reasoning'].extend(shard_state['agent_reasoning'])
+        merged['error_log'].extend(shard_state['error_log'])
+        merged['token_usage'].extend(shard_state.get('token_usage', []))
+    
+    return merged
+
+
+def run_sharded_workflow(excel_file: str, students: List[dict], dry_run: bool = True,
+                         shard_size: int = 1, max_workers: int = None,
+                         run_id: str = None) -> List[AgenticState]:
+    """
+    Run the agent over per-student (or small-batch) shards on a bounded thread pool.
+    Shards that fail are reported as states with an error_log entry.
+    """
+    max_workers = max(1, max_workers or CONFIG['max_workers'])
+    shards = shard_students(students, shard_size)
+    
+    print(f"\n🧩 Sharded execution: {len(shards)} shards of up to {shard_size} "
+          f"students, {max_workers} workers")
     
-    final_state = workflow.invoke(
-        initial_state,
-        {"recursion_limit": 100}  # Increased limit
+    results = [None] * len(shards)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(run_shard, excel_file, shard, dry_run, run_id): i
+            for i, shard in enumerate(shards)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+                checkpoint()
+                print(f"   ✅ Shard {i + 1}/{len(shards)} completed")
+            except Exception as e:
+                print(f"   ❌ Shard {i + 1}/{len(shards)} failed: {e}")
+                failed = create_initial_state("", shards[i])
+                failed['error_log'].append(f"Shard {i + 1} failed: {e}")
+                agent_events.emit('error_log', message=failed['error_log'][-1])
+                results[i] = failed
+    
+    return results
+
+
+async def run_shard_async(excel_file: str, students: List[dict], dry_run: bool = True,
+                          run_id: str = None, checkpointer=None) -> AgenticState:
+    """Async variant of run_shard, driven by workflow.ainvoke."""
+    workflow = build_agentic_workflow(use_async=True, checkpointer=checkpointer)
+    initial_state = create_initial_state(
+        build_initial_task(excel_file, dry_run, students),
+        students,
+        run_id=run_id
     )
+    return await invoke_workflow_async(workflow, initial_state, run_config(run_id, students))
+
+
+async def run_sharded_workflow_async(excel_file: str, students: List[dict], dry_run: bool = True,
+                                     shard_size: int = 1, max_workers: int = None,
+                                     run_id: str = None) -> List[AgenticState]:
+    """
+    Run shards as overlapping coroutines in one event loop.
+    At most `max_workers` conversations are in flight at any time.
+    """
+    max_workers = max(1, max_workers or CONFIG['max_workers'])
+    shards = shard_students(students, shard_size)
+    semaphore = asyncio.Semaphore(max_workers)
+    
+    print(f"\n🧩 Async sharded execution: {len(shards)} shards of up to {shard_size} "
+          f"students, {max_workers} concurrent conversations")
+    
+    async def run_one(i: int, shard: List[dict], checkpointer) -> AgenticState:
+        async with semaphore:
+            try:
+                state = await run_shard_async(excel_file, shard, dry_run, run_id, checkpointer)
+                await asyncio.to_thread(checkpoint)
+                print(f"   ✅ Shard {i + 1}/{len(shards)} completed")
+                return state
+            except Exception as e:
+                print(f"   ❌ Shard {i + 1}/{len(shards)} failed: {e}")
+                failed = create_initial_state("", shard)
+                failed['error_log'].append(f"Shard {i + 1} failed: {e}")
+                agent_events.emit('error_log', message=failed['error_log'][-1])
+                return failed
+    
+    if not run_id:
+        return await asyncio.gather(*(run_one(i, shard, None) for i, shard in enumerate(shards)))
+    async with open_async_checkpointer(CONFIG['checkpoint_db']) as checkpointer:
+        return await asyncio.gather(*(run_one(i, shard, checkpointer) for i, shard in enumerate(shards)))
+
+
+async def run_workflow_async(initial_state: AgenticState, run_id: str = None,
+                             students: List[dict] = None) -> AgenticState:
+    """Run a single async conversation, checkpointed when run_id is set."""
+    config = run_config(run_id, students)
+    if not run_id:
+        return await invoke_workflow_async(build_agentic_workflow(use_async=True), initial_state, config)
+    async with open_async_checkpointer(CONFIG['checkpoint_db']) as checkpointer:
+        workflow = build_agentic_workflow(use_async=True, checkpointer=checkpointer)
+        return await invoke_workflow_async(workflow, initial_state, config)
+
+
+def print_execution_summary(final_state: AgenticState):
+    """Print the end-of-run summary."""
     
-    # Display results
     print("\n" + "="*80)
     print("📊 AGENT EXECUTION SUMMARY")
     print("="*80)
@@ -893,6 +2376,16 @@ Begin!"""
     print(f"\n💭 Agent Reasoning Blocks: {len(final_state['agent_reasoning'])}")
     print(f"📝 Decisions Made: {len(final_state['decisions'])}")
     print(f"✉️  Communications: {len(final_state['communications_sent'])}")
+    if final_state.get('pretriage_summary'):
+        print(f"⚡ LLM Calls Saved by Pre-triage (estimate): ~{final_state['pretriage_summary']['llm_calls_saved']}")
+    if final_state['error_log']:
+        print(f"⚠️  Errors: {len(final_state['error_log'])}")
+    if final_state.get('token_usage'):
+        usage = summarize_token_usage(final_state['token_usage'])
+        print(f"🪙 Tokens: {usage['input_tokens']} in / {usage['output_tokens']} out over {usage['calls']} calls")
+        print(f"   Cache: {usage['cache_read_input_tokens']} read, "
+              f"{usage['cache_creation_input_tokens']} written "
+              f"({usage['cache_hit_ratio']:.0%} of prompt tokens from cache)")
     
     if final_state['agent_reasoning']:
         print("\n🧠 Agent's Final Thoughts:")
@@ -903,10 +2396,302 @@ Begin!"""
     print("\n" + "="*80)
     print("✅ AGENTIC WORKFLOW COMPLETED")
     print("="*80)
+
+
+def print_metrics_report(report: dict):
+    """Print where the run's time and money went."""
+    print("\n⏱️  Run Metrics")
+    print("─" * 80)
+    print(f"   Wall time: {report['wall_time_s']:.2f}s")
+    for category, timers in report['timings'].items():
+        for name, stats in timers.items():
+            print(f"   {category:<6} {name:<26} {stats['count']:>5}x  total {stats['total_ms']:>9.1f} ms  "
+                  f"p50 {stats['p50_ms']:>8.1f}  p95 {stats['p95_ms']:>8.1f}")
+    tokens = report['tokens']
+    print(f"   Tokens: {tokens['input_tokens']} in, {tokens['output_tokens']} out, "
+          f"{tokens['cache_read_input_tokens']} cache read, {tokens['cache_creation_input_tokens']} cache write")
+    cache = report.get('counters', {}).get('decision_cache')
+    if cache and cache.get('lookups'):
+        print(f"   Decision cache: {cache.get('hits', 0)}/{cache['lookups']} hits "
+              f"({cache.get('hits', 0) / cache['lookups']:.0%})")
+    print(f"   Estimated cost: ${report['cost_usd']['total']:.4f}")
+
+
+def execute_run(excel_file: str, dry_run: bool, pretriage: bool, shard_size: int,
+                max_workers: int, use_async: bool, run_id: str = None,
+                student_ids: List[str] = None, incremental: bool = False,
+                decision_cache: bool = False) -> AgenticState:
+    """Pre-triage, then run the workflow (plain, sharded or async)."""
+    from roster_stream import RosterStream
+    
+    # A checkpointed run first finishes any conversation that was cut off
+    resumed_states = resume_interrupted_threads(run_id) if run_id else []
+    
+    # Sharding, pre-triage, the done ledger, a student filter, incremental mode
+    # and the decision cache all need the roster up front. It is streamed, so
+    # pre-triage works on the first rows while later ones are parsed.
+    students = None
+    triage = None
+    changed_students = {}
+    incremental_stats = {}
+    cached = None
+    cache_keys = {}
+    if pretriage or shard_size or run_id or student_ids is not None or incremental or decision_cache:
+        roster = iter(RosterStream(excel_file))
+        
+        if student_ids is not None:
+            wanted = set(student_ids)
+            roster = (s for s in roster if s['student_id'] in wanted)
+        
+        # Skip students an earlier invocation of this run already handled
+        if run_id:
+            done = get_run_ledger(CONFIG['checkpoint_db']).done_students(run_id)
+            if done:
+                roster = (s for s in roster if s['student_id'] not in done)
+                print(f"\n⏭️  Skipping {len(done)} students already handled in run {run_id}")
+        
+        # Only students whose profile or contact history changed since their last decision
+        if incremental:
+            roster = skip_unchanged_students(roster, dry_run, changed_students, incremental_stats)
+        
+        try:
+            if pretriage:
+                # Resolve clear-cut students locally before involving the agent
+                triage = pretriage_students(roster, dry_run)
+                students = triage['forwarded']
+            else:
+                students = list(roster)
+            if decision_cache and students:
+                # Students in a situation the agent already decided are handled the same way
+                cached = apply_cached_decisions(students, dry_run, cache_keys)
+                students = cached['forwarded']
+        except Exception as e:
+            print(f"\n⚠️  Could not pre-load student data: {e}")
+        
+        if incremental:
+            if run_id and incremental_stats.get('unchanged'):
+                # Nothing to do for them in this run, so they do not hold up its completion
+                get_run_ledger(CONFIG['checkpoint_db']).mark_done(
+                    run_id, [(student_id, 'unchanged') for student_id in incremental_stats['unchanged']]
+                )
+            print(f"\n⏭️  Incremental: {incremental_stats.get('skipped', 0)} unchanged students skipped, "
+                  f"{len(changed_students)} new or changed")
+        
+        if triage:
+            if run_id:
+                get_run_ledger(CONFIG['checkpoint_db']).mark_done(
+                    run_id, [(d['student_id'], d['action']) for d in triage['decisions']]
+                )
+            print(f"\n⚡ Pre-triage: {triage['resolved_count']} students resolved by rules, "
+                  f"{triage['forwarded_count']} forwarded to agent")
+            print(f"   LLM calls saved (estimate, {LLM_CALLS_PER_ACTION['send']} per email): ~{triage['llm_calls_saved']}")
+        
+        if cached:
+            if run_id:
+                get_run_ledger(CONFIG['checkpoint_db']).mark_done(
+                    run_id, [(d['student_id'], d['action']) for d in cached['decisions']]
+                )
+            print(f"\n🧠 Decision cache: {cached['hits']} of {cached['lookups']} students matched "
+                  f"({cached['hit_ratio']:.0%} hit ratio), {cached['resolved_count']} resolved without the agent")
+            print(f"   LLM calls saved (estimate, {LLM_CALLS_PER_ACTION['send']} per email): ~{cached['llm_calls_saved']}")
+            triage = merge_resolutions(triage, cached)
+    
+    # Initialize state
+    initial_state = create_initial_state(
+        build_initial_task(excel_file, dry_run, students),
+        students,
+        triage,
+        run_id
+    )
+    
+    if students is not None and not students:
+        # Nothing left for the agent - no need to start it at all
+        print("\n✅ No students left for the agent")
+        final_state = initial_state
+    elif shard_size and students is not None:
+        print("\n🚀 Starting sharded agentic workflow...\n")
+        if use_async:
+            shard_states = asyncio.run(
+                run_sharded_workflow_async(excel_file, students, dry_run, shard_size, max_workers, run_id)
+            )
+        else:
+            shard_states = run_sharded_workflow(excel_file, students, dry_run, shard_size, max_workers, run_id)
+        final_state = merge_shard_states(initial_state, shard_states)
+    else:
+        # Build and run the agentic workflow
+        print("\n🚀 Starting agentic workflow...\n")
+        
+        if use_async:
+            final_state = asyncio.run(run_workflow_async(initial_state, run_id, students))
+        else:
+            checkpointer = get_checkpointer(CONFIG['checkpoint_db']) if run_id else None
+            workflow = build_agentic_workflow(checkpointer=checkpointer)
+            final_state = invoke_workflow(
+                workflow,
+                initial_state,
+                run_config(run_id, students)
+            )
+    
+    if resumed_states:
+        final_state = merge_shard_states(final_state, resumed_states)
+    
+    if incremental:
+        record_student_fingerprints(final_state['decisions'], changed_students, dry_run)
+    if decision_cache:
+        remember_agent_decisions(final_state['decisions'], cache_keys)
+    
+    return final_state
+
+
+def finish_checkpointed_run(run_id: str, excel_file: str, student_ids: List[str] = None):
+    """
+    Mark the run completed once every incomplete profile it covers (all of
+    them, or those in `student_ids`) is in the done ledger: emailed,
+    scheduled, resolved without the agent, unchanged (incremental runs) or
+    skipped by the agent in a conversation it finished.
+    """
+    ledger = get_run_ledger(CONFIG['checkpoint_db'])
+    data = read_student_data_impl(excel_file)
+    if not data['success']:
+        return
+    
+    done = ledger.done_students(run_id)
+    wanted = set(student_ids) if student_ids is not None else None
+    remaining = [s for s in data['students']
+                 if s['student_id'] not in done and (wanted is None or s['student_id'] in wanted)]
+    if remaining:
+        ledger.set_status(run_id, 'incomplete')
+        print(f"\n↩️  {len(remaining)} students not handled yet - continue with: --resume {run_id}")
+    else:
+        ledger.set_status(run_id, 'completed')
+
+
+def run_agentic_agent(excel_file: str, dry_run: bool = True, pretriage: bool = False,
+                      shard_size: int = None, max_workers: int = None, use_async: bool = False,
+                      checkpoint_run: bool = False, run_id: str = None, metrics_report: str = None,
+                      student_ids: List[str] = None, incremental: bool = False,
+                      decision_cache: bool = False):
+    """
+    Run the truly agentic profile completion agent.
+    
+    Args:
+        excel_file: Path to Excel file with student data
+        dry_run: If True, simulate sending emails
+        pretriage: If True, resolve clear-cut students with local rules
+                   and only forward the ambiguous ones to the agent
+        shard_size: If set, process students in independent sub-conversations
+                    of this many students each, run concurrently
+        max_workers: Concurrency limit for sharded execution
+                     (default: CONFIG['max_workers'])
+        use_async: If True, drive the workflow with the async Claude client
+                   so shards overlap their network waits in one event loop
+        checkpoint_run: If True, save state after every node to
+                        CONFIG['checkpoint_db'] under a new run id
+        run_id: Checkpoint under this run id; an existing id continues that run
+        metrics_report: Write the run's latency/token/cost report to this
+                        JSON file (default: CONFIG['metrics_report'])
+        student_ids: If set, only these students of the roster are handled
+                     (e.g. the contacts due in the schedule store)
+        incremental: If True, skip students whose missing fields, completion
+                     and last contact are unchanged since a still-valid decision
+        decision_cache: If True, reuse the agent's earlier decision for students
+                        in the same situation (completion bucket, missing fields,
+                        deadline status, contact count) instead of asking Claude
+    """
+    
+    if checkpoint_run and not run_id:
+        run_id = new_run_id()
+    options = {
+        'dry_run': dry_run,
+        'pretriage': pretriage,
+        'shard_size': shard_size,
+        'max_workers': max_workers,
+        'use_async': use_async,
+        'student_ids': sorted(student_ids) if student_ids is not None else None,
+        'incremental': incremental,
+        'decision_cache': decision_cache,
+    }
+    if run_id:
+        get_run_ledger(CONFIG['checkpoint_db']).register_run(run_id, excel_file, options)
+    agent_events.emit('run_started', excel_file=excel_file, options=options, run_id=run_id)
+    
+    print("\n" + "="*80)
+    print("🤖 TRULY AGENTIC PROFILE COMPLETION AGENT")
+    print("="*80)
+    print(f"\n📊 Configuration:")
+    print(f"   Excel File: {excel_file}")
+    print(f"   Deadline: {CONFIG['deadline']}")
+    print(f"   Mode: {'DRY RUN (simulation)' if dry_run else 'LIVE (actual sending)'}")
+    print(f"   Pre-triage: {'ENABLED' if pretriage else 'DISABLED'}")
+    print(f"   Sharding: {f'{shard_size} students per shard' if shard_size else 'DISABLED'}")
+    print(f"   Client: {'ASYNC' if use_async else 'SYNC'}")
+    print(f"   Checkpoints: {f'run {run_id}' if run_id else 'DISABLED'}")
+    print(f"   Incremental: {'ENABLED' if incremental else 'DISABLED'}")
+    print(f"   Decision cache: {'ENABLED' if decision_cache else 'DISABLED'}")
+    if student_ids is not None:
+        print(f"   Students: {len(options['student_ids'])} selected")
+    print(f"   Agent: Claude Sonnet 4")
+    print("\n" + "="*80)
+    
+    # Tracking history is cached in memory for the whole run, writes
+    # are flushed at checkpoints and on exit
+    with run_metrics.metrics_scope() as metrics:
+        with run_cache_scope(CONFIG['tracking_db'], CONFIG['schedule_file'], CONFIG['cache_flush_every']):
+            final_state = execute_run(excel_file, dry_run, pretriage, shard_size, max_workers, use_async, run_id,
+                                      student_ids, incremental, decision_cache)
+        report = dict(metrics.report(), run_id=run_id, excel_file=excel_file)
+    
+    # Display results
+    print_execution_summary(final_state)
+    print_metrics_report(report)
+    agent_events.emit('metrics', **report)
+    
+    metrics_report = metrics_report or CONFIG['metrics_report']
+    if metrics_report:
+        atomic_write_json(metrics_report, report)
+        print(f"📈 Metrics report written to {metrics_report}")
+    agent_events.emit(
+        'run_completed',
+        run_id=run_id,
+        agent_reasoning=len(final_state['agent_reasoning']),
+        decisions=len(final_state['decisions']),
+        communications_sent=len(final_state['communications_sent']),
+        errors=len(final_state['error_log']),
+        token_usage=summarize_token_usage(final_state.get('token_usage', []))
+    )
+    
+    if run_id:
+        finish_checkpointed_run(run_id, excel_file, student_ids)
     
     return final_state
 
 
+def load_google_sheets_roster(reader=None) -> str:
+    """Read the Google Sheet straight into memory and return its source name."""
+    from roster_stream import GOOGLE_SHEETS_SOURCE, register_roster
+    
+    if reader is None:
+        from google_sheets_reader import GoogleSheetsReader
+        reader = GoogleSheetsReader()
+    
+    return register_roster(GOOGLE_SHEETS_SOURCE, reader.get_sheet_as_dataframe())
+
+
+def resume_agentic_agent(run_id: str, metrics_report: str = None):
+    """Continue a checkpointed run with the settings it was started with."""
+    from roster_stream import GOOGLE_SHEETS_SOURCE, is_registered_roster
+    
+    run = get_run_ledger(CONFIG['checkpoint_db']).get_run(run_id)
+    if run is None:
+        raise ValueError(f"Unknown run id: {run_id} (not found in {CONFIG['checkpoint_db']})")
+    
+    if run['excel_file'] == GOOGLE_SHEETS_SOURCE and not is_registered_roster(GOOGLE_SHEETS_SOURCE):
+        load_google_sheets_roster()
+    
+    print(f"\n↩️  Resuming run {run_id} (started {run['created_at']}, status: {run['status']})")
+    return run_agentic_agent(run['excel_file'], run_id=run_id, metrics_report=metrics_report, **run['options'])
+
+
 if __name__ == "__main__":
     import sys
     import argparse
@@ -916,21 +2701,38 @@ if __name__ == "__main__":
     parser.add_argument('--source', type=str, choices=['file', 'google-sheets'], default='file')
     parser.add_argument('--dry-run', action='store_true', help='Dry run mode')
     parser.add_argument('--send', action='store_true', help='Live send mode')
+    parser.add_argument('--pretriage', action='store_true', help='Resolve clear-cut students with rules before the agent')
+    parser.add_argument('--shard-size', type=int, help='Students per concurrent sub-conversation')
+    parser.add_argument('--workers', type=int, help='Concurrency limit for sharded execution')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Use the async Claude client')
+    parser.add_argument('--checkpoint', action='store_true', help='Save state after every step so the run can be resumed')
+    parser.add_argument('--incremental', action='store_true', help='Skip students unchanged since their last decision')
+    parser.add_argument('--decision-cache', action='store_true', help='Reuse cached agent decisions for students in the same situation')
+    parser.add_argument('--resume', metavar='RUN_ID', help='Continue a checkpointed run')
+    parser.add_argument('--metrics-report', metavar='PATH', help='Write the run\'s latency/token/cost report as JSON')
+    parser.add_argument('--events', choices=['jsonl'], help='Write typed JSON-lines events to stdout (console output goes to stderr)')
     
     args = parser.parse_args()
     
+    if args.events:
+        agent_events.enable(sys.stdout)
+        sys.stdout = sys.stderr
+    
+    if args.resume:
+        resume_agentic_agent(args.resume, args.metrics_report)
+        sys.exit(0)
+    
     # Determine dry run mode
     dry_run = not args.send if args.send else True
     
     # Determine data source
     if args.source == 'google-sheets':
         print("\n📊 Using Google Sheets as data source")
-        from google_sheets_reader import GoogleSheetsReader
         
         try:
-            reader = GoogleSheetsReader()
-            excel_file = reader.export_to_excel('temp_student_data.xlsx')
-            print(f"✅ Downloaded data from Google Sheets: {excel_file}")
+            # Handed to the agent in memory - no temporary Excel file
+            excel_file = load_google_sheets_roster()
+            print("✅ Loaded data from Google Sheets")
         except Exception as e:
             print(f"❌ Failed to read from Google Sheets: {e}")
             sys.exit(1)
@@ -942,4 +2744,15 @@ if __name__ == "__main__":
     print(f"   Mode: {'DRY RUN' if dry_run else 'LIVE'}")
     print(f"   Source: {args.source}")
     
-    run_agentic_agent(excel_file=excel_file, dry_run=dry_run)
\ No newline at end of file
+    run_agentic_agent(
+        excel_file=excel_file,
+        dry_run=dry_run,
+        pretriage=args.pretriage,
+        shard_size=args.shard_size,
+        max_workers=args.workers,
+        use_async=args.use_async,
+        checkpoint_run=args.checkpoint,
+        metrics_report=args.metrics_report,
+        incremental=args.incremental,
+        decision_cache=args.decision_cache
+    )
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Profile Field Analysis
+----------------------
+Columnar missing-field detection shared by the agent and the dashboard API.
+
+Instead of walking the DataFrame row by row, a boolean missing-mask is built
+for all mandatory columns at once and missing_fields / completion_percentage
+are derived from it in bulk.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Mandatory profile fields, in the order they are reported
+MANDATORY_FIELDS = [
+    'student_name', 'roll_number', 'institute_name',
+    'enrolled_program', 'stream', 'date_of_birth',
+    'gender', 'email', 'previous_education',
+    'primary_language', 'nationality'
+]
+
+# Spreadsheet headers -> internal field names
+COLUMN_MAP = {
+    'Student Name': 'student_name',
+    'Roll Number': 'roll_number',
+    'Institute Name': 'institute_name',
+    'Enrolled program': 'enrolled_program',
+    'Stream': 'stream',
+    'Date of birth': 'date_of_birth',
+    'Gender': 'gender',
+    'email address': 'email',
+    'Email': 'email',
+    'previous education qualification': 'previous_education',
+    'primary language': 'primary_language',
+    'Nationality': 'nationality',
+}
+
+# Values used in student records when a column is absent
+RECORD_DEFAULTS = {
+    'student_name': 'Unknown',
+    'roll_number': 'N/A',
+    'email': '',
+    'institute_name': '',
+    'enrolled_program': '',
+    'stream': '',
+}
+
+
+def _blank_string_mask(column: pd.Series) -> np.ndarray:
+    """Mark whitespace-only string values in a column."""
+    if not (pd.api.types.is_object_dtype(column) or pd.api.types.is_string_dtype(column)):
+        return np.zeros(len(column), dtype=bool)
+
+    try:
+        stripped = column.str.strip()
+    except AttributeError:
+        # Object column without any strings (e.g. all numbers)
+        return np.zeros(len(column), dtype=bool)
+
+    return stripped.eq('').fillna(False).to_numpy(dtype=bool)
+
+
+def missing_field_mask(df: pd.DataFrame, fields: list = MANDATORY_FIELDS) -> np.ndarray:
+    """
+    Build a (rows x fields) boolean mask of missing values.
+    A value is missing if it is NaN/None, a whitespace-only string,
+    or its column is absent from the DataFrame.
+    """
+    mask = np.ones((len(df), len(fields)), dtype=bool)
+
+    for j, field in enumerate(fields):
+        if field not in df.columns:
+            continue
+        column = df[field]
+        mask[:, j] = column.isna().to_numpy(dtype=bool) | _blank_string_mask(column)
+
+    return mask
+
+
+def completion_summary(df: pd.DataFrame, fields: list = MANDATORY_FIELDS) -> dict:
+    """
+    Derive per-row missing fields and completion percentage from the mask.
+
+    Returns:
+        dict with 'missing_count' (ndarray), 'missing_fields' (list of lists)
+        and 'completion_percentage' (list of floats), aligned with df rows
+    """
+    total = len(fields)
+    mask = missing_field_mask(df, fields)
+    missing_count = mask.sum(axis=1)
+
+    # Encode each row's mask as a bit pattern so the field lists are only
+    # built once per distinct pattern rather than once per row
+    weights = np.left_shift(1, np.arange(total, dtype=np.int64))
+    codes = mask.astype(np.int64) @ weights
+    patterns, inverse = np.unique(codes, return_inverse=True)
+    pattern_fields = [
+        [field for j, field in enumerate(fields) if (int(code) >> j) & 1]
+        for code in patterns
+    ]
+
+    # Same rounding as the scalar formula, evaluated once per possible count
+    pct_by_count = [round((total - k) / total * 100, 1) for k in range(total + 1)]
+
+    return {
+        'missing_count': missing_count,
+        'missing_fields': [list(pattern_fields[i]) for i in inverse.ravel()],
+        'completion_percentage': [pct_by_count[k] for k in missing_count.tolist()],
+    }
+
+
+def row_values(df: pd.DataFrame, positions, defaults: dict) -> dict:
+    """
+    Extract fields for the rows at `positions`.
+
+    Values are taken from the row-wise interleaved array (as df.iterrows()
+    would see them), so types match what a per-row lookup returns.
+    `defaults` maps each field to the value used when its column is absent.
+    """
+    values = df.iloc[positions].to_numpy()
+    columns = list(df.columns)
+
+    extracted = {}
+    for field, default in defaults.items():
+        if field in columns:
+            extracted[field] = values[:, columns.index(field)].tolist()
+        else:
+            extracted[field] = [default] * len(values)
+    return extracted
+
+
+def incomplete_student_records(df: pd.DataFrame) -> list:
+    """
+    Student records (as returned by read_student_data) for every row of an
+    already-renamed DataFrame that has at least one missing mandatory field.
+    Row labels become student ids, so chunks must keep their file row index.
+    """
+    summary = completion_summary(df, MANDATORY_FIELDS)
+    incomplete = np.flatnonzero(summary['missing_count'] > 0)
+
+    values = row_values(df, incomplete, RECORD_DEFAULTS)
+    row_labels = df.index[incomplete].tolist()
+
+    return [
+        {
+            'student_id': f"student_{idx}",
+            'student_name': values['student_name'][i],
+            'roll_number': values['roll_number'][i],
+            'email': values['email'][i],
+            'institute_name': values['institute_name'][i],
+            'enrolled_program': values['enrolled_program'][i],
+            'stream': values['stream'][i],
+            'missing_fields': summary['missing_fields'][pos],
+            'completion_percentage': summary['completion_percentage'][pos],
+            'total_fields': len(MANDATORY_FIELDS),
+            'row_index': idx
+        }
+        for i, (pos, idx) in enumerate(zip(incomplete.tolist(), row_labels))
+    ]
@@ -0,0 +1,216 @@
+"""
+Roster Snapshots
+----------------
+Cached copies of parsed roster DataFrames, so repeat runs on an unchanged
+roster skip openpyxl (or the Google Sheets download) entirely.
+
+Snapshots are Parquet files (pyarrow), written one row group per parsed
+chunk so a large roster never has to be held in memory to be cached, and
+read back one row group at a time. Each one has a small JSON sidecar with
+the version it was built from:
+- Local files: mtime, size and SHA-256 of the file contents. A file whose
+  mtime changed but whose contents did not is still served from the cache.
+- Google Sheets: the spreadsheet's Drive modifiedTime.
+
+File snapshots live in a .roster_cache directory beside the input file.
+A roster whose chunks cannot share one Parquet schema (e.g. a column
+mixing numbers and text) is not snapshotted and is parsed on every run.
+"""
+
+import os
+import json
+import hashlib
+
+import pandas as pd
+
+from run_cache import atomic_write_json
+
+
+SNAPSHOT_DIR = '.roster_cache'
+SNAPSHOTS_ENABLED = os.getenv('ROSTER_SNAPSHOTS', 'true').lower() != 'false'
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def content_hash(file_path: str) -> str:
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _snapshot_base(cache_dir: str, key: str) -> str:
+    name = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, name)
+
+
+def _read_meta(base: str) -> dict:
+    try:
+        with open(base + '.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _open_parquet(base: str, meta: dict):
+    """The snapshot's ParquetFile, or None if there is no readable Parquet snapshot."""
+    if meta.get('format') != 'parquet' or not _parquet_available():
+        return None
+    import pyarrow.parquet as pq
+    try:
+        return pq.ParquetFile(f"{base}.parquet")
+    except Exception:
+        return None
+
+
+def _iter_row_groups(parquet_file):
+    for i in range(parquet_file.num_row_groups):
+        yield parquet_file.read_row_group(i).to_pandas()
+
+
+class SnapshotWriter:
+    """
+    Builds a snapshot chunk by chunk, one Parquet row group per chunk, so
+    only the chunk being written is in memory. The schema is taken from the
+    first chunk; a later chunk that cannot be cast to it abandons the
+    snapshot. Nothing is visible to readers until commit().
+    """
+
+    def __init__(self, cache_dir: str, key: str, version: dict):
+        self.cache_dir = cache_dir
+        self.key = key
+        self.version = version
+        self.base = _snapshot_base(cache_dir, key)
+        self.tmp_path = f"{self.base}.parquet.tmp"
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self._failed = not _parquet_available()
+
+    def write(self, chunk: pd.DataFrame):
+        if self._failed:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        try:
+            table = pa.Table.from_pandas(chunk, preserve_index=True)
+            if self._writer is None:
+                # All-empty columns of the first chunk may hold text later on
+                self._schema = pa.schema(
+                    [field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                     for field in table.schema],
+                    metadata=table.schema.metadata,
+                )
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            self._writer.write_table(table.cast(self._schema))
+            self.rows += len(chunk)
+        except Exception:
+            # Mixed-type object columns, or a chunk whose types differ from the first
+            self.abort()
+
+    def abort(self):
+        """Drop the partial snapshot."""
+        self._failed = True
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    def commit(self) -> bool:
+        """Publish the snapshot; the sidecar is written last, so readers never see a partial one."""
+        if self._failed or self._writer is None:
+            self.abort()
+            return False
+        self._writer.close()
+        self._writer = None
+        os.replace(self.tmp_path, f"{self.base}.parquet")
+        atomic_write_json(self.base + '.json', {'key': self.key, 'version': self.version,
+                                                'format': 'parquet', 'rows': self.rows})
+        # Earlier versions left pickled snapshots; they are never read
+        if os.path.exists(f"{self.base}.pickle"):
+            os.remove(f"{self.base}.pickle")
+        return True
+
+
+def load_snapshot(cache_dir: str, key: str, version: dict) -> pd.DataFrame:
+    """The cached DataFrame for `key` if it was built from `version`, else None."""
+    base = _snapshot_base(cache_dir, key)
+    meta = _read_meta(base)
+    if not meta or meta.get('key') != key or meta.get('version') != version:
+        return None
+    parquet_file = _open_parquet(base, meta)
+    if parquet_file is None:
+        return None
+    try:
+        return parquet_file.read().to_pandas()
+    except Exception:
+        return None
+
+
+def save_snapshot(cache_dir: str, key: str, version: dict, df: pd.DataFrame):
+    """Store a DataFrame snapshot."""
+    writer = SnapshotWriter(cache_dir, key, version)
+    writer.write(df)
+    writer.commit()
+
+
+# Local roster files -------------------------------------------------------
+
+def _file_cache_dir(file_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(file_path)), SNAPSHOT_DIR)
+
+
+def open_file_snapshot(file_path: str):
+    """
+    The snapshot for a roster file as an iterator of DataFrame chunks (one
+    per row group), if the file has not changed since it was taken, else None.
+    mtime and size are checked first; the content hash only when they differ.
+    """
+    key = os.path.abspath(file_path)
+    cache_dir = _file_cache_dir(file_path)
+    base = _snapshot_base(cache_dir, key)
+    meta = _read_meta(base)
+    if not meta or meta.get('key') != key:
+        return None
+    parquet_file = _open_parquet(base, meta)
+    if parquet_file is None:
+        return None
+
+    stat = os.stat(file_path)
+    version = meta['version']
+    if (version['mtime_ns'], version['size']) != (stat.st_mtime_ns, stat.st_size):
+        if version['size'] != stat.st_size or version['sha256'] != content_hash(file_path):
+            return None
+        # Touched but unchanged: keep the snapshot and remember the new mtime
+        meta['version'] = dict(version, mtime_ns=stat.st_mtime_ns)
+        atomic_write_json(base + '.json', meta)
+
+    return _iter_row_groups(parquet_file)
+
+
+def file_version(file_path: str) -> dict:
+    """Version of a roster file; take it before parsing so later edits invalidate the snapshot."""
+    stat = os.stat(file_path)
+    return {
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': content_hash(file_path),
+    }
+
+
+def file_snapshot_writer(file_path: str) -> SnapshotWriter:
+    """A writer for the snapshot of a roster file, versioned as the file is now."""
+    return SnapshotWriter(_file_cache_dir(file_path), os.path.abspath(file_path), file_version(file_path))
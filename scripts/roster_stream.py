@@ -0,0 +1,177 @@
+"""
+Streaming Roster Reader
+-----------------------
+Reads student rosters in fixed-size chunks and yields incomplete-profile
+records as each chunk is parsed, so triage can start before a large file
+has been read and peak memory stays bounded by the chunk size.
+
+The reader is chosen by file extension:
+- registered source    in-memory DataFrame or records (see register_roster)
+- .csv                 pandas chunked CSV reader
+- .parquet             pyarrow record batches (requires pyarrow)
+- anything else        openpyxl read-only mode, row by row
+
+Chunks keep their position in the file as the row index, so student ids
+are the same as for a full pd.read_excel of the sheet. Parsed rosters are
+snapshotted (see roster_snapshot) and reused while the file is unchanged.
+"""
+
+import os
+
+import pandas as pd
+
+from profile_fields import COLUMN_MAP, incomplete_student_records
+from roster_snapshot import SNAPSHOTS_ENABLED, file_snapshot_writer, open_file_snapshot
+
+
+ROSTER_CHUNK_ROWS = int(os.getenv('ROSTER_CHUNK_ROWS', '5000'))
+
+# Source name used for rosters read from Google Sheets
+GOOGLE_SHEETS_SOURCE = 'google-sheets'
+
+# In-memory rosters, by source name
+_in_memory_rosters = {}
+
+
+def register_roster(name: str, data) -> str:
+    """
+    Make a DataFrame or list of records readable under `name`, wherever a
+    roster file path is accepted (read_student_data, RosterStream).
+    Returns the name, so it can be passed on as the "file path".
+    """
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+    _in_memory_rosters[name] = df.reset_index(drop=True)
+    return name
+
+
+def is_registered_roster(name: str) -> bool:
+    return name in _in_memory_rosters
+
+
+def _iter_in_memory(name: str, chunk_rows: int):
+    df = _in_memory_rosters[name]
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _iter_csv(file_path: str, chunk_rows: int):
+    # The chunked reader continues the row index across chunks
+    with pd.read_csv(file_path, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+def _iter_parquet(file_path: str, chunk_rows: int):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet rosters requires pyarrow (pip install pyarrow)")
+
+    offset = 0
+    for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows):
+        chunk = batch.to_pandas()
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def _iter_excel(file_path: str, chunk_rows: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # pd.read_excel reads the first sheet by default
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [f"Unnamed: {j}" if name is None else name for j, name in enumerate(header)]
+        width = len(columns)
+
+        buffer = []
+        blank_rows = 0
+        offset = 0
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if all(value is None for value in row):
+                # Blank rows only count if data follows them (trailing ones are dropped)
+                blank_rows += 1
+                continue
+            buffer.extend([(None,) * width] * blank_rows)
+            blank_rows = 0
+            buffer.append(row)
+
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(offset, offset + len(buffer)))
+                offset += len(buffer)
+                buffer = []
+
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(offset, offset + len(buffer)))
+    finally:
+        workbook.close()
+
+
+def iter_roster_frames(file_path: str, chunk_rows: int = ROSTER_CHUNK_ROWS):
+    """Yield the roster as DataFrame chunks of at most about `chunk_rows` rows."""
+    if file_path in _in_memory_rosters:
+        return _iter_in_memory(file_path, chunk_rows)
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        return _iter_csv(file_path, chunk_rows)
+    if extension == '.parquet':
+        return _iter_parquet(file_path, chunk_rows)
+    return _iter_excel(file_path, chunk_rows)
+
+
+class RosterStream:
+    """
+    Iterable over a roster's incomplete-profile records.
+    `total_rows` and `incomplete_rows` count what has been read so far.
+
+    With `snapshot=True` an unchanged file is served from its cached
+    snapshot, and a fully parsed file leaves one behind for the next run.
+    """
+
+    def __init__(self, file_path: str, chunk_rows: int = ROSTER_CHUNK_ROWS,
+                 snapshot: bool = SNAPSHOTS_ENABLED):
+        self.file_path = file_path
+        self.chunk_rows = max(1, chunk_rows)
+        # In-memory rosters are already parsed
+        self.snapshot = snapshot and file_path not in _in_memory_rosters
+        self.from_snapshot = False
+        self.total_rows = 0
+        self.incomplete_rows = 0
+
+    def _frames(self):
+        """Renamed DataFrame chunks, from the snapshot if one is valid."""
+        cached = open_file_snapshot(self.file_path) if self.snapshot else None
+        if cached is not None:
+            self.from_snapshot = True
+            # Chunks as they were parsed when the snapshot was written
+            yield from cached
+            return
+
+        # Each chunk is appended to the snapshot as it is parsed
+        writer = file_snapshot_writer(self.file_path) if self.snapshot else None
+        finished = False
+        try:
+            for chunk in iter_roster_frames(self.file_path, self.chunk_rows):
+                chunk = chunk.rename(columns=COLUMN_MAP)
+                if writer:
+                    writer.write(chunk)
+                yield chunk
+            finished = True
+        finally:
+            if writer:
+                if finished:
+                    writer.commit()
+                else:
+                    # Only partly read: no snapshot
+                    writer.abort()
+
+    def __iter__(self):
+        for chunk in self._frames():
+            self.total_rows += len(chunk)
+            records = incomplete_student_records(chunk)
+            self.incomplete_rows += len(records)
+            yield from records
@@ -0,0 +1,175 @@
+"""
+Run-Scoped Write-Behind Cache
+-----------------------------
+Keeps the communication history in memory for the duration of one agent
+run and buffers writes to it and to the scheduled contact queue.
+
+Reads are served from memory after the first load, writes are buffered and
+flushed in one batch at checkpoints and at shutdown. JSON files are written
+to a temp file and renamed into place, so a crash mid-write never leaves a
+torn file behind.
+
+Time spent on disk is recorded as `io` timings (see run_metrics).
+"""
+
+import os
+import json
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from run_metrics import timed
+from schedule_store import get_schedule_store
+from tracking_store import get_communication_store
+
+
+_active_cache = None
+_active_lock = threading.Lock()
+_oneshot_lock = threading.Lock()
+
+
+def atomic_write_json(path: str, data, indent: int = 2):
+    """Write JSON to a temp file in the same directory, then rename it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            # dumps() uses the C encoder; dump() streams through the pure-Python one
+            f.write(json.dumps(data, indent=indent))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class RunCache:
+    """
+    In-memory view of the tracking store with batched writes.
+    Scheduled contacts go to the schedule store in the same database;
+    `schedule_file` is the legacy JSON list it imports on first use.
+    """
+
+    def __init__(self, tracking_db: str, schedule_file: str, flush_every: int = 50):
+        self.lock = threading.RLock()
+        with timed('io', 'tracking_open'):
+            self.store = get_communication_store(tracking_db)
+            self.schedule = get_schedule_store(tracking_db, schedule_file)
+        self.flush_every = flush_every
+
+        self._histories = {}
+        self._pending_communications = []
+        self._pending_scheduled = {}
+        self._unflushed_writes = 0
+
+    # Communication history -------------------------------------------------
+
+    def history(self, student_id: str) -> list:
+        """A student's communications, loaded from the store once per run."""
+        with self.lock:
+            if student_id not in self._histories:
+                with timed('io', 'tracking_read'):
+                    self._histories[student_id] = self.store.history(student_id)
+            return list(self._histories[student_id])
+
+    def histories(self, student_ids: list) -> dict:
+        """Histories for many students; those not yet cached are fetched in one query."""
+        with self.lock:
+            missing = [sid for sid in student_ids if sid not in self._histories]
+            if missing:
+                with timed('io', 'tracking_read'):
+                    self._histories.update(self.store.histories(missing))
+            return {sid: list(self._histories[sid]) for sid in student_ids}
+
+    def record_communication(self, student_id: str, entry: dict):
+        """Buffer a sent email; visible to history() immediately."""
+        with self.lock:
+            self.history(student_id)
+            self._histories[student_id].append(entry)
+            self._pending_communications.append((student_id, entry))
+            self._wrote()
+
+    # Scheduled contacts ----------------------------------------------------
+
+    def add_scheduled(self, entry: dict):
+        """Buffer a scheduled contact; it replaces the student's pending one."""
+        with self.lock:
+            self._pending_scheduled[entry['student_id']] = entry
+            self._wrote()
+
+    # Flushing --------------------------------------------------------------
+
+    def _wrote(self):
+        self._unflushed_writes += 1
+        if self.flush_every and self._unflushed_writes >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write all buffered changes, one transaction per store."""
+        with self.lock:
+            if self._pending_communications:
+                with timed('io', 'tracking_write'):
+                    self.store.append_many(self._pending_communications)
+                self._pending_communications = []
+            if self._pending_scheduled:
+                with timed('io', 'schedule_write'):
+                    self.schedule.schedule_many(list(self._pending_scheduled.values()))
+                self._pending_scheduled = {}
+            self._unflushed_writes = 0
+
+
+@contextmanager
+def run_cache_scope(tracking_db: str, schedule_file: str, flush_every: int = 50):
+    """
+    Activate a run-scoped cache for the duration of the block.
+    Nested scopes reuse the active cache; only the outermost one flushes.
+    """
+    global _active_cache
+
+    with _active_lock:
+        if _active_cache is not None:
+            owner = False
+            cache = _active_cache
+        else:
+            owner = True
+            cache = _active_cache = RunCache(tracking_db, schedule_file, flush_every)
+            atexit.register(cache.flush)
+
+    try:
+        yield cache
+    finally:
+        if owner:
+            with _active_lock:
+                _active_cache = None
+            atexit.unregister(cache.flush)
+            cache.flush()
+
+
+@contextmanager
+def cached_io(tracking_db: str, schedule_file: str):
+    """
+    Cache for a single tool call: the active run cache if there is one,
+    otherwise a one-shot cache that is flushed when the block exits.
+    """
+    with _active_lock:
+        cache = _active_cache
+
+    if cache is not None:
+        yield cache
+        return
+
+    with _oneshot_lock:
+        cache = RunCache(tracking_db, schedule_file, flush_every=0)
+        yield cache
+        cache.flush()
+
+
+def checkpoint():
+    """Flush the active run cache, if any."""
+    with _active_lock:
+        cache = _active_cache
+    if cache is not None:
+        cache.flush()
@@ -0,0 +1,184 @@
+"""
+Run Checkpoints
+---------------
+Durable LangGraph checkpoints and a per-student "done" ledger.
+
+Every node transition of a checkpointed run is saved to SQLite, so a run
+that crashes or hits the recursion limit can be resumed with its run id.
+The ledger records which students have been emailed, scheduled or otherwise
+finished (skipped by the agent, resolved without it), so a resumed run (or
+a large batch split over several invocations) skips them.
+"""
+
+import json
+import uuid
+import sqlite3
+import hashlib
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+# langgraph is imported on first use, so importing this module stays cheap
+if TYPE_CHECKING:
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+
+# Anthropic content blocks kept in AgenticState.messages
+CHECKPOINT_TYPES = [
+    ('anthropic.types.text_block', 'TextBlock'),
+    ('anthropic.types.tool_use_block', 'ToolUseBlock'),
+]
+
+_checkpointers = {}
+_ledgers = {}
+_registry_lock = threading.Lock()
+
+
+def new_run_id() -> str:
+    """Readable, unique run identifier, e.g. 20251120-143005-1a2b3c."""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def thread_key(run_id: str, students: list = None) -> str:
+    """
+    Checkpoint thread for one conversation of a run.
+    Derived from the students it covers, so a resumed run finds the same thread.
+    """
+    if students is None:
+        return f"{run_id}:all"
+    ids = ','.join(str(s.get('student_id')) for s in students)
+    return f"{run_id}:{hashlib.sha1(ids.encode()).hexdigest()[:12]}"
+
+
+def checkpoint_serializer() -> "JsonPlusSerializer":
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    return JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_TYPES)
+
+
+def get_checkpointer(db_path: str) -> "SqliteSaver":
+    """Shared SQLite checkpointer per database path."""
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    with _registry_lock:
+        if db_path not in _checkpointers:
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            saver = SqliteSaver(conn, serde=checkpoint_serializer())
+            saver.setup()
+            _checkpointers[db_path] = saver
+        return _checkpointers[db_path]
+
+
+@asynccontextmanager
+async def open_async_checkpointer(db_path: str):
+    """Async SQLite checkpointer for workflows driven by ainvoke."""
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    conn = await aiosqlite.connect(db_path)
+    try:
+        saver = AsyncSqliteSaver(conn, serde=checkpoint_serializer())
+        await saver.setup()
+        yield saver
+    finally:
+        await conn.close()
+
+
+def pending_threads(checkpointer: "SqliteSaver", run_id: str) -> list:
+    """All checkpoint threads that belong to a run."""
+    with checkpointer.lock:
+        rows = checkpointer.conn.execute(
+            "SELECT DISTINCT thread_id FROM checkpoints WHERE thread_id LIKE ?",
+            (f"{run_id}:%",)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+class RunLedger:
+    """Run registry and per-student done ledger."""
+
+    def __init__(self, db_path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                excel_file TEXT,
+                options TEXT,
+                status TEXT,
+                created_at TEXT,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS done_students (
+                run_id TEXT NOT NULL,
+                student_id TEXT NOT NULL,
+                action TEXT,
+                completed_at TEXT,
+                PRIMARY KEY (run_id, student_id)
+            );
+        """)
+        self._conn.commit()
+
+    def register_run(self, run_id: str, excel_file: str, options: dict):
+        """Record a run's settings the first time it starts."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, excel_file, options, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?, ?)",
+                (run_id, excel_file, json.dumps(options), now, now)
+            )
+
+    def get_run(self, run_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT excel_file, options, status, created_at, updated_at FROM runs WHERE run_id = ?",
+                (run_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        excel_file, options, status, created_at, updated_at = row
+        return {
+            'run_id': run_id,
+            'excel_file': excel_file,
+            'options': json.loads(options),
+            'status': status,
+            'created_at': created_at,
+            'updated_at': updated_at,
+        }
+
+    def set_status(self, run_id: str, status: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                (status, datetime.now().isoformat(), run_id)
+            )
+
+    def mark_done(self, run_id: str, entries: list):
+        """Mark (student_id, action) pairs as handled for this run."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO done_students (run_id, student_id, action, completed_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(run_id, student_id, action, now) for student_id, action in entries]
+            )
+
+    def done_students(self, run_id: str) -> set:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT student_id FROM done_students WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+
+def get_run_ledger(db_path: str) -> RunLedger:
+    """Shared ledger per database path."""
+    with _registry_lock:
+        if db_path not in _ledgers:
+            _ledgers[db_path] = RunLedger(db_path)
+        return _ledgers[db_path]
@@ -0,0 +1,159 @@
+"""
+Run Metrics
+-----------
+Latency and token instrumentation for one agent run.
+
+While a metrics scope is active, the agent records:
+- agent    wall time of every agent_node call (Claude round trip)
+- tool     latency of every execute_tool call, by tool name
+- io       time spent reading and writing the tracking and schedule stores
+- tokens   input, output and cache token counts of every Claude response
+- counters event counts, e.g. decision cache hits and lookups
+
+report() aggregates them into count / total / p50 / p95 / max per timer,
+counter totals, token totals and a cost estimate, ready to be exported as JSON.
+Recording is a no-op outside a scope.
+"""
+
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# USD per million tokens (claude-sonnet-4)
+PRICING_PER_MTOK = {
+    'input_tokens': 3.00,
+    'output_tokens': 15.00,
+    'cache_creation_input_tokens': 3.75,
+    'cache_read_input_tokens': 0.30,
+}
+
+_active_metrics = None
+_active_lock = threading.Lock()
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def estimate_cost(tokens: dict) -> dict:
+    """Cost in USD of the given token totals, per token kind and overall."""
+    cost = {kind: round(tokens.get(kind, 0) * price / 1_000_000, 6) for kind, price in PRICING_PER_MTOK.items()}
+    cost['total'] = round(sum(cost.values()), 6)
+    return cost
+
+
+class RunMetrics:
+    """Thread-safe collector of timings and token usage for one run."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._timings = defaultdict(list)
+        self._counters = defaultdict(int)
+        self._tokens = []
+
+    def record(self, category: str, name: str, seconds: float):
+        with self.lock:
+            self._timings[(category, name)].append(seconds * 1000)
+
+    def count(self, category: str, name: str, n: int = 1):
+        with self.lock:
+            self._counters[(category, name)] += n
+
+    def record_tokens(self, usage: dict):
+        with self.lock:
+            self._tokens.append(dict(usage))
+
+    def report(self) -> dict:
+        """Aggregated report; timings in milliseconds."""
+        with self.lock:
+            timings = {key: list(samples) for key, samples in self._timings.items()}
+            counts = dict(self._counters)
+            usage = list(self._tokens)
+
+        grouped = {}
+        for (category, name), samples in sorted(timings.items()):
+            grouped.setdefault(category, {})[name] = {
+                'count': len(samples),
+                'total_ms': round(sum(samples), 1),
+                'p50_ms': round(percentile(samples, 50), 1),
+                'p95_ms': round(percentile(samples, 95), 1),
+                'max_ms': round(max(samples), 1),
+            }
+
+        counters = {}
+        for (category, name), value in sorted(counts.items()):
+            counters.setdefault(category, {})[name] = value
+
+        tokens = {kind: sum(u.get(kind, 0) for u in usage) for kind in PRICING_PER_MTOK}
+        tokens['calls'] = len(usage)
+        return {
+            'started_at': self.started_at,
+            'wall_time_s': round(time.perf_counter() - self._started, 3),
+            'timings': grouped,
+            'counters': counters,
+            'tokens': tokens,
+            'cost_usd': estimate_cost(tokens),
+        }
+
+
+@contextmanager
+def metrics_scope():
+    """
+    Collect metrics for the duration of the block.
+    Nested scopes share the outer scope's collector.
+    """
+    global _active_metrics
+
+    with _active_lock:
+        owner = _active_metrics is None
+        if owner:
+            _active_metrics = RunMetrics()
+        metrics = _active_metrics
+
+    try:
+        yield metrics
+    finally:
+        if owner:
+            with _active_lock:
+                _active_metrics = None
+
+
+def record(category: str, name: str, seconds: float):
+    """Record one timing sample in the active scope, if any."""
+    metrics = _active_metrics
+    if metrics is not None:
+        metrics.record(category, name, seconds)
+
+
+def count(category: str, name: str, n: int = 1):
+    """Add `n` to a counter in the active scope, if any."""
+    metrics = _active_metrics
+    if metrics is not None:
+        metrics.count(category, name, n)
+
+
+def record_tokens(usage: dict):
+    """Record one Claude response's token usage in the active scope, if any."""
+    metrics = _active_metrics
+    if metrics is not None:
+        metrics.record_tokens(usage)
+
+
+@contextmanager
+def timed(category: str, name: str):
+    """Time the block and record it under (category, name)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(category, name, time.perf_counter() - started)
@@ -0,0 +1,158 @@
+"""
+Scheduled Contact Store
+-----------------------
+SQLite-backed queue of students to contact later, ordered by due date.
+
+Replaces the flat scheduled_contacts.json list, which was rewritten in
+full for every schedule_for_later call and never read back. Entries are
+keyed by student_id, so a student has at most one pending contact:
+scheduling them again replaces the earlier entry. The scheduled_for index
+makes "who is due now?" a range scan instead of a pass over every entry.
+The legacy JSON file is imported once, the first time a store is opened.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+
+LEGACY_SCHEDULE_FILE = 'scheduled_contacts.json'
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class ScheduleStore:
+    """Pending contacts, at most one per student, ordered by scheduled_for."""
+
+    def __init__(self, db_path: str, legacy_file: str = LEGACY_SCHEDULE_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scheduled_contacts (
+                student_id TEXT PRIMARY KEY,
+                scheduled_for TEXT NOT NULL,
+                reason TEXT,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_scheduled_contacts_due
+                ON scheduled_contacts (scheduled_for);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._conn.commit()
+        self.migrate_from_json(legacy_file)
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        One-time import of a legacy scheduled_contacts.json list.
+        Duplicate entries for a student collapse to the most recently created one.
+        Returns the number of pending contacts imported (0 if already migrated).
+        """
+        if not json_path or not os.path.exists(json_path):
+            return 0
+
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'schedule_migrated_from'"
+            ).fetchone()
+            if done:
+                return 0
+
+            with open(json_path, 'r') as f:
+                entries = json.load(f)
+
+            latest = {}
+            for entry in sorted(entries, key=lambda e: e.get('created_at') or ''):
+                latest[entry['student_id']] = entry
+            with self._conn:
+                self._upsert(latest.values())
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('schedule_migrated_from', ?)",
+                    (os.path.abspath(json_path),)
+                )
+
+        print(f"✅ Migrated {len(latest)} scheduled contacts from {json_path} to {self.db_path}")
+        return len(latest)
+
+    def _upsert(self, entries):
+        self._conn.executemany(
+            "INSERT INTO scheduled_contacts (student_id, scheduled_for, reason, created_at) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (student_id) DO UPDATE SET "
+            "scheduled_for = excluded.scheduled_for, reason = excluded.reason, created_at = excluded.created_at",
+            [
+                (entry['student_id'], entry['scheduled_for'], entry.get('reason'),
+                 entry.get('created_at') or datetime.now().isoformat())
+                for entry in entries
+            ]
+        )
+
+    def schedule_many(self, entries: list):
+        """Add or replace the pending contact of each entry's student, in one transaction."""
+        with self._lock, self._conn:
+            self._upsert(entries)
+
+    def due(self, now: datetime = None, limit: int = None) -> list:
+        """Pending contacts whose date has passed, earliest first."""
+        now = now or datetime.now()
+        query = ("SELECT student_id, scheduled_for, reason, created_at FROM scheduled_contacts "
+                 "WHERE scheduled_for <= ? ORDER BY scheduled_for, student_id")
+        params = [now.isoformat()]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {'student_id': student_id, 'scheduled_for': scheduled_for, 'reason': reason, 'created_at': created_at}
+            for student_id, scheduled_for, reason, created_at in rows
+        ]
+
+    def pending(self) -> list:
+        """All pending contacts, earliest first."""
+        return self.due(datetime.max)
+
+    def next_due(self) -> str:
+        """When the earliest pending contact is due, or None if the queue is empty."""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(scheduled_for) FROM scheduled_contacts").fetchone()
+        return row[0]
+
+    def complete(self, student_ids: list, due_before: datetime) -> int:
+        """
+        Remove the students' contacts that were due at `due_before`.
+        A contact re-scheduled in the meantime (a later date) is kept.
+        Returns the number of entries removed.
+        """
+        with self._lock, self._conn:
+            removed = 0
+            ids = list(student_ids)
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                removed += self._conn.execute(
+                    f"DELETE FROM scheduled_contacts WHERE student_id IN ({','.join('?' * len(chunk))}) "
+                    "AND scheduled_for <= ?",
+                    chunk + [due_before.isoformat()]
+                ).rowcount
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_schedule_store(db_path: str, legacy_file: str = LEGACY_SCHEDULE_FILE) -> ScheduleStore:
+    """Shared store per database path, opened (and migrated) on first use."""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ScheduleStore(db_path, legacy_file)
+        return _stores[key]
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Scheduled Contact Runner
+------------------------
+Works off the schedule_for_later queue (see schedule_store.py).
+
+    list       show pending contacts, earliest first, and how many are due
+    run-due    run the agent on only the students whose contact is due
+
+run-due pops the due entries in date order, hands just those students to
+the agent, and removes an entry once its student was handled (emailed,
+re-scheduled or skipped) or no longer has an incomplete profile. Entries
+of students the agent did not get to stay due for the next run, and a dry
+run (the default) leaves the whole queue as it was. Run it
+from cron to follow up on scheduled contacts without reprocessing the
+whole roster.
+
+Usage:
+    python scheduler.py list
+    python scheduler.py run-due --file students.xlsx --dry-run
+    python scheduler.py run-due --source google-sheets --send --limit 200
+"""
+
+import sys
+import argparse
+from datetime import datetime
+
+import profile_agent_agentic as agent
+from schedule_store import get_schedule_store
+
+
+def schedule_store():
+    return get_schedule_store(agent.CONFIG['tracking_db'], agent.CONFIG['schedule_file'])
+
+
+def list_contacts(limit: int = None):
+    store = schedule_store()
+    now = datetime.now().isoformat()
+    pending = store.pending()
+    due_count = sum(1 for entry in pending if entry['scheduled_for'] <= now)
+
+    print(f"\n📅 {len(pending)} scheduled contacts, {due_count} due now")
+    for entry in pending[:limit] if limit else pending:
+        marker = '⏰' if entry['scheduled_for'] <= now else '  '
+        print(f"   {marker} {entry['scheduled_for'][:16]}  {entry['student_id']:<24} {entry['reason'] or ''}")
+
+
+def run_due(excel_file: str, dry_run: bool = True, limit: int = None, **options) -> dict:
+    """
+    Run the agent on the students whose scheduled contact is due.
+    Returns the due, handled and still-pending counts.
+    """
+    store = schedule_store()
+    started = datetime.now()
+    due = store.due(started, limit)
+    if not due:
+        next_due = store.next_due()
+        print(f"\n✅ No scheduled contacts due{f' (next: {next_due[:16]})' if next_due else ''}")
+        return {'due': 0, 'handled': 0, 'pending': 0}
+
+    due_ids = [entry['student_id'] for entry in due]
+    print(f"\n⏰ {len(due_ids)} scheduled contacts due")
+    final_state = agent.run_agentic_agent(excel_file, dry_run=dry_run, student_ids=due_ids, **options)
+
+    # A dry run only previews the queue; nothing was sent, so nothing is completed
+    if dry_run:
+        print(f"\n📅 Dry run: {len(due_ids)} scheduled contacts left in the queue")
+        return {'due': len(due_ids), 'handled': 0, 'pending': len(due_ids)}
+
+    # Handled by the agent, or gone from the roster's incomplete profiles
+    data = agent.read_student_data_impl(excel_file)
+    if not data['success']:
+        print(f"\n⚠️  Could not re-read the roster, keeping all due contacts: {data['error']}")
+        return {'due': len(due_ids), 'handled': 0, 'pending': len(due_ids)}
+    incomplete = {s['student_id'] for s in data['students']}
+    handled = {d['student_id'] for d in final_state['decisions']}
+    finished = [sid for sid in due_ids if sid in handled or sid not in incomplete]
+
+    # Entries re-scheduled during the run have a later date and are kept
+    store.complete(finished, due_before=started)
+    pending = len(due_ids) - len(finished)
+    print(f"\n📅 {len(finished)} scheduled contacts completed"
+          f"{f', {pending} still due' if pending else ''}")
+    return {'due': len(due_ids), 'handled': len(finished), 'pending': pending}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Process scheduled contacts')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help='Show pending scheduled contacts')
+    list_parser.add_argument('--limit', type=int, help='Show at most this many entries')
+
+    run_parser = commands.add_parser('run-due', help='Run the agent on the contacts that are due')
+    run_parser.add_argument('--file', type=str, default=agent.CONFIG['excel_file'], help='Excel file path')
+    run_parser.add_argument('--source', type=str, choices=['file', 'google-sheets'], default='file')
+    run_parser.add_argument('--dry-run', action='store_true', help='Dry run mode (default)')
+    run_parser.add_argument('--send', action='store_true', help='Live send mode')
+    run_parser.add_argument('--limit', type=int, help='Handle at most this many due contacts (earliest first)')
+    run_parser.add_argument('--pretriage', action='store_true', help='Resolve clear-cut students with rules before the agent')
+    run_parser.add_argument('--shard-size', type=int, help='Students per concurrent sub-conversation')
+    run_parser.add_argument('--workers', type=int, help='Concurrency limit for sharded execution')
+    run_parser.add_argument('--metrics-report', metavar='PATH', help='Write the run\'s latency/token/cost report as JSON')
+
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        list_contacts(args.limit)
+        return
+
+    excel_file = args.file
+    if args.source == 'google-sheets':
+        try:
+            excel_file = agent.load_google_sheets_roster()
+        except Exception as e:
+            print(f"❌ Error loading from Google Sheets: {e}")
+            sys.exit(1)
+
+    run_due(
+        excel_file,
+        dry_run=not args.send,
+        limit=args.limit,
+        pretriage=args.pretriage,
+        shard_size=args.shard_size,
+        max_workers=args.workers,
+        metrics_report=args.metrics_report
+    )
+
+
+if __name__ == "__main__":
+    main()
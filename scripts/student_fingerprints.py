@@ -0,0 +1,115 @@
+"""
+Student Fingerprint Store
+-------------------------
+Remembers, per student, what the profile looked like when the agent last
+decided about them, so incremental runs can skip students nothing changed for.
+
+A fingerprint hashes the fields a decision depends on: the missing fields,
+the completion percentage and the time of the last contact. It is stored
+with the decision and how long that decision stays valid:
+
+    send / skip     a fixed number of days (AGENT_INCREMENTAL_VALID_DAYS)
+    schedule        until the scheduled contact date
+
+A student is handled again when their fingerprint changes or their last
+decision expired. Decisions made in dry runs only count for later dry runs.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def student_fingerprint(student: dict, last_contact: str = None) -> str:
+    """Stable hash of the decision inputs of a student."""
+    payload = json.dumps({
+        'missing_fields': sorted(student.get('missing_fields', [])),
+        'completion_percentage': student.get('completion_percentage'),
+        'last_contact': last_contact,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+class FingerprintStore:
+    """Last decision and fingerprint per student."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS student_fingerprints (
+                student_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                action TEXT NOT NULL,
+                decided_at TEXT NOT NULL,
+                valid_until TEXT NOT NULL,
+                dry_run INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def unchanged(self, fingerprints: dict, dry_run: bool, now: datetime = None) -> set:
+        """
+        Students of `fingerprints` ({student_id: fingerprint}) whose stored
+        fingerprint matches and whose decision is still valid.
+        """
+        now = (now or datetime.now()).isoformat()
+        ids = list(fingerprints)
+        matched = set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT student_id, fingerprint, dry_run FROM student_fingerprints "
+                    f"WHERE student_id IN ({','.join('?' * len(chunk))}) AND valid_until > ?",
+                    chunk + [now]
+                ).fetchall()
+                matched.update(
+                    student_id for student_id, fingerprint, was_dry_run in rows
+                    if fingerprint == fingerprints[student_id] and (dry_run or not was_dry_run)
+                )
+        return matched
+
+    def record_many(self, entries: list):
+        """
+        Store (student_id, fingerprint, action, valid_until, dry_run) tuples
+        in one transaction, replacing earlier entries of the same students.
+        """
+        decided_at = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO student_fingerprints "
+                "(student_id, fingerprint, action, decided_at, valid_until, dry_run) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (student_id) DO UPDATE SET "
+                "fingerprint = excluded.fingerprint, action = excluded.action, "
+                "decided_at = excluded.decided_at, valid_until = excluded.valid_until, "
+                "dry_run = excluded.dry_run",
+                [
+                    (student_id, fingerprint, action, decided_at, valid_until, int(dry_run))
+                    for student_id, fingerprint, action, valid_until, dry_run in entries
+                ]
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_fingerprint_store(db_path: str) -> FingerprintStore:
+    """Shared store per database path, opened on first use."""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = FingerprintStore(db_path)
+        return _stores[key]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Synthetic Roster Generator
+--------------------------
+Writes student rosters in the Excel/CSV format the agent reads, with a
+configurable size and share of missing fields. The same seed always
+produces the same file, so benchmark runs are comparable.
+
+Usage:
+    python synthetic_roster.py --rows 5000 --missing-rate 0.2 --output roster.xlsx
+    python synthetic_roster.py --rows 100000 --output roster.csv --seed 7
+"""
+
+import os
+import random
+import argparse
+
+
+# Column headers in the order of the documented Excel format
+ROSTER_COLUMNS = [
+    'Student Name', 'Roll Number', 'Institute Name', 'Enrolled program', 'Stream',
+    'Date of birth', 'Gender', 'email address', 'previous education qualification',
+    'primary language', 'Nationality'
+]
+
+# Identity columns are only left blank at a tenth of the missing rate
+IDENTITY_COLUMNS = {'Student Name', 'Roll Number', 'email address'}
+
+_VALUES = {
+    'Institute Name': ['IIIT Dharwad', 'IIIT Raichur'],
+    'Enrolled program': ['B.Tech', 'M.Tech', 'PhD'],
+    'Stream': ['CSE', 'ECE', 'DSAI'],
+    'Gender': ['Female', 'Male'],
+    'previous education qualification': ['12th CBSE', '12th State Board', 'Diploma'],
+    'primary language': ['English', 'Hindi', 'Kannada', 'Telugu'],
+    'Nationality': ['Indian'],
+}
+
+
+def roster_rows(count: int, missing_rate: float = 0.2, seed: int = 42) -> list:
+    """`count` roster rows as dicts; each field is blank with probability `missing_rate`."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {
+            'Student Name': f"Student {i}",
+            'Roll Number': f"BT{i:07d}",
+            'Date of birth': f"{2000 + i % 6}-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            'email address': f"student{i}@example.edu",
+        }
+        for column, choices in _VALUES.items():
+            row[column] = choices[i % len(choices)]
+
+        for column in ROSTER_COLUMNS:
+            rate = missing_rate / 10 if column in IDENTITY_COLUMNS else missing_rate
+            if rng.random() < rate:
+                row[column] = None
+        rows.append({column: row[column] for column in ROSTER_COLUMNS})
+    return rows
+
+
+def write_roster(path: str, count: int, missing_rate: float = 0.2, seed: int = 42) -> str:
+    """Write a synthetic roster to `path` (.xlsx or .csv) and return the path."""
+    import pandas as pd
+
+    df = pd.DataFrame(roster_rows(count, missing_rate, seed), columns=ROSTER_COLUMNS)
+    if os.path.splitext(path)[1].lower() == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic student roster')
+    parser.add_argument('--rows', type=int, default=1000, help='Number of students')
+    parser.add_argument('--missing-rate', type=float, default=0.2, help='Probability that a field is blank')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--output', default='synthetic_roster.xlsx', help='Output file (.xlsx or .csv)')
+    args = parser.parse_args()
+
+    write_roster(args.output, args.rows, args.missing_rate, args.seed)
+    print(f"✅ Wrote {args.rows} students to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Communication History Store
+---------------------------
+SQLite-backed log of emails sent to students, indexed by student_id.
+
+Replaces the flat email_tracking.json file, which had to be re-read and
+rewritten in full for every lookup and every send. Appends are single
+INSERTs and lookups use the student_id index. The legacy JSON file is
+imported once, the first time a store is opened next to it.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+
+
+LEGACY_TRACKING_FILE = 'email_tracking.json'
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class CommunicationStore:
+    """Append-only communication log keyed by student_id."""
+
+    def __init__(self, db_path: str, legacy_file: str = LEGACY_TRACKING_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS communications (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                student_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                subject TEXT,
+                status TEXT,
+                recipient TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_communications_student
+                ON communications (student_id, id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self._conn.commit()
+        self.migrate_from_json(legacy_file)
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        One-time import of a legacy email_tracking.json file.
+        Returns the number of entries imported (0 if already migrated).
+        """
+        if not json_path or not os.path.exists(json_path):
+            return 0
+
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'migrated_from'"
+            ).fetchone()
+            if done:
+                return 0
+
+            with open(json_path, 'r') as f:
+                tracking_data = json.load(f)
+
+            rows = [
+                (student_id, entry.get('timestamp'), entry.get('subject'),
+                 entry.get('status'), entry.get('recipient'))
+                for student_id, history in tracking_data.items()
+                for entry in history
+            ]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO communications (student_id, timestamp, subject, status, recipient) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                    (os.path.abspath(json_path),)
+                )
+
+        print(f"✅ Migrated {len(rows)} tracking entries from {json_path} to {self.db_path}")
+        return len(rows)
+
+    def append(self, student_id: str, entry: dict):
+        """Record one communication for a student."""
+        self.append_many([(student_id, entry)])
+
+    def append_many(self, entries: list):
+        """Record a batch of (student_id, entry) pairs in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO communications (student_id, timestamp, subject, status, recipient) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (student_id, entry['timestamp'], entry.get('subject'),
+                     entry.get('status'), entry.get('recipient'))
+                    for student_id, entry in entries
+                ]
+            )
+
+    def history(self, student_id: str) -> list:
+        """All communications for a student, oldest first (same shape as the JSON file)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, subject, status, recipient FROM communications "
+                "WHERE student_id = ? ORDER BY id",
+                (student_id,)
+            ).fetchall()
+        return [
+            {'timestamp': timestamp, 'subject': subject, 'status': status, 'recipient': recipient}
+            for timestamp, subject, status, recipient in rows
+        ]
+
+    def histories(self, student_ids: list) -> dict:
+        """Histories for many students with one indexed query per 500 ids."""
+        result = {student_id: [] for student_id in student_ids}
+        unique_ids = list(result)
+        with self._lock:
+            for start in range(0, len(unique_ids), 500):
+                chunk = unique_ids[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT student_id, timestamp, subject, status, recipient FROM communications "
+                    f"WHERE student_id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk
+                ).fetchall()
+                for student_id, timestamp, subject, status, recipient in rows:
+                    result[student_id].append(
+                        {'timestamp': timestamp, 'subject': subject, 'status': status, 'recipient': recipient}
+                    )
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def get_communication_store(db_path: str) -> CommunicationStore:
+    """Shared store per database path, opened (and migrated) on first use."""
+    key = os.path.abspath(db_path)
+    with _stores_lock:
+        if key not in _stores:
+            legacy_file = os.path.join(os.path.dirname(key), LEGACY_TRACKING_FILE)
+            _stores[key] = CommunicationStore(db_path, legacy_file)
+        return _stores[key]